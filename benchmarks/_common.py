@@ -0,0 +1,133 @@
+"""
+Utilidades compartidas por los scripts de benchmarks/. Cada script se corre desde la raíz
+del repo (python benchmarks/<script>.py --help) y arma su propia base: SQLite temporal por
+defecto, o la de --database-url, que se vacía (usar una base de prueba).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "password123"
+
+
+def parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--database-url", help="base de prueba (se vacía); por defecto SQLite temporal")
+    return parser
+
+
+def configure(database_url: str | None = None, **env) -> str:
+    """Entorno de la app; tiene que correr antes de importar core.config."""
+    tmp = tempfile.mkdtemp(prefix="petlink-bench-")
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ["DATABASE_URL"] = database_url or f"sqlite:///{tmp}/bench.db"
+    os.environ.setdefault("MEDIA_STORAGE_BACKEND", "local")
+    os.environ.setdefault("MEDIA_LOCAL_DIR", os.path.join(tmp, "media"))
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    return os.environ["DATABASE_URL"]
+
+
+def seed(engine, users: int = 2, posts: int = 0, likes_per_post: int = 0, media: bool = False) -> None:
+    """
+    Catálogos, `users` usuarios (user{i}@example.com, admin el 1) y `posts` posts repartidos
+    entre categorías, con coordenadas alrededor de Buenos Aires.
+    """
+    from sqlalchemy import insert
+    from sqlmodel import Session, SQLModel
+
+    from models import (
+        AgreementStatusEnum, Like, Post, PostMultimedia, PostType, PostTypeEnum, Role, RoleEnum,
+        StatusAgreement, StatusUser, StatusUserEnum, User,
+    )
+    from services import auth_service
+
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        for role in RoleEnum:
+            session.add(Role(id=role, name=role.name.lower()))
+        for user_status in StatusUserEnum:
+            session.add(StatusUser(id=user_status, name=user_status.name.lower()))
+        for post_type in PostTypeEnum:
+            session.add(PostType(id=post_type, name=post_type.name.lower()))
+        for agreement_status in AgreementStatusEnum:
+            session.add(StatusAgreement(id=agreement_status, name=agreement_status.name.lower()))
+        session.commit()
+
+        password_hash = auth_service.encrypt_password(PASSWORD)
+        session.execute(insert(User), [
+            {
+                "email": f"user{i}@example.com", "password_hash": password_hash,
+                "role_id": RoleEnum.ADMIN if i == 1 else RoleEnum.USER,
+                "status_id": StatusUserEnum.ACTIVE, "help_count": 0, "created_at": now,
+            }
+            for i in range(1, users + 1)
+        ])
+        if posts:
+            session.execute(insert(Post), [
+                {
+                    "user_id": 1 + i % users, "title": f"Perro perdido {i}",
+                    "message": "Collar rojo, responde a Toby. Visto por última vez cerca de la plaza.",
+                    "category": ("perros", "gatos", "otros")[i % 3], "post_type_id": 1 + i % 2,
+                    "is_active": True, "latitude": -34.6 + (i % 100) * 0.002,
+                    "longitude": -58.4 + (i % 50) * 0.002, "location_text": "Buenos Aires",
+                    "created_at": now - timedelta(minutes=i),
+                }
+                for i in range(posts)
+            ])
+        if posts and likes_per_post:
+            session.execute(insert(Like), [
+                {"post_id": post_id, "user_id": user_id, "created_at": now}
+                for post_id in range(1, posts + 1)
+                for user_id in range(1, min(likes_per_post, users) + 1)
+            ])
+        if posts and media:
+            session.execute(insert(PostMultimedia), [
+                {
+                    "post_id": post_id, "url": f"https://files.example.com/{post_id}.jpg",
+                    "thumb_url": f"https://files.example.com/{post_id}_thumb.webp", "created_at": now,
+                }
+                for post_id in range(1, posts + 1)
+            ])
+        session.commit()
+
+
+def measure(function: Callable[[], object], repeat: int = 5, number: int = 20) -> float:
+    """Mejor promedio por llamada (ms) de `repeat` tandas de `number` llamadas, como timeit."""
+    function()  # calentamiento
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        runs.append((time.perf_counter() - start) / number * 1000)
+    return min(runs)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def median(values: list[float]) -> float:
+    return statistics.median(values)
+
+
+def table(headers: tuple[str, ...], rows: list[tuple]) -> None:
+    cells = [tuple(str(c) for c in headers)] + [tuple(f"{c:.2f}" if isinstance(c, float) else str(c) for c in row) for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
@@ -0,0 +1,52 @@
+"""
+Tamaño y costo de comprimir el feed (user-024): cuerpos reales de GET /posts/ con
+limit 10/20/50, comprimidos con los mismos compresores que CompressionMiddleware y los
+niveles de COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY. brotli es opcional.
+
+    python benchmarks/compression.py --limits 10 20 50
+
+Los posts sembrados repiten texto, así que las tasas reales van a ser menores.
+"""
+import _common
+
+
+def main() -> None:
+    parser = _common.parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 20, 50])
+    args = parser.parse_args()
+
+    _common.configure(args.database_url)
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from core import compression
+    from core.config import settings
+    from core.database import engine
+
+    _common.seed(engine, users=20, posts=200, likes_per_post=3, media=True)
+    compressors = {"gzip": lambda: compression._GzipCompressor(settings.COMPRESSION_GZIP_LEVEL)}
+    if compression.brotli is not None:
+        compressors["br"] = lambda: compression._BrotliCompressor(settings.COMPRESSION_BROTLI_QUALITY)
+    else:
+        print("brotli no está instalado: solo gzip")
+
+    def compress(make_compressor, body: bytes) -> bytes:
+        compressor = make_compressor()
+        return compressor.compress(body) + compressor.flush()
+
+    rows = []
+    with TestClient(app_main.app) as client:
+        response = client.post("/auth/login", data={"username": "user1@example.com", "password": _common.PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}", "Accept-Encoding": "identity"}
+        for limit in args.limits:
+            body = client.get("/posts/", params={"limit": limit}, headers=headers).content
+            for name, make_compressor in compressors.items():
+                size = len(compress(make_compressor, body))
+                elapsed_us = _common.measure(lambda: compress(make_compressor, body), number=200) * 1000
+                rows.append((limit, name, len(body) / 1024, size / 1024, len(body) / size, elapsed_us))
+    print("Cuerpo del feed, mejor promedio por compresión")
+    _common.table(("limit", "codificación", "original KB", "comprimido KB", "x", "tiempo us"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Serialización de una lista de PostRead (user-025): el camino por defecto de FastAPI
+(serialize_response contra response_model + JSONResponse) contra PydanticJSONResponse
+(pydantic_core.to_json directo desde los modelos).
+
+    python benchmarks/json_response.py --limit 100
+"""
+import asyncio
+import json
+import time
+
+import _common
+
+
+async def _measure_async(function, repeat: int = 5, number: int = 50) -> float:
+    # Como _common.measure, para funciones async (serialize_response lo es)
+    await function()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await function()
+        runs.append((time.perf_counter() - start) / number * 1000)
+    return min(runs)
+
+
+async def main() -> None:
+    parser = _common.parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    _common.configure(args.database_url)
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+    from sqlmodel import Session
+
+    from core.database import engine
+    from schemas import PostFilters, PostRead
+    from services import post_service
+    from utils.responses import PydanticJSONResponse
+
+    _common.seed(engine, users=20, posts=args.limit, likes_per_post=3, media=True)
+    with Session(engine) as session:
+        items = post_service.get_posts(session, PostFilters(limit=args.limit), None).posts  # type: ignore[arg-type]
+    field = create_model_field(name="Response_bench", type_=list[PostRead], mode="serialization")
+
+    async def default_path():
+        return JSONResponse(await serialize_response(field=field, response_content=items))
+
+    async def pydantic_path():
+        return PydanticJSONResponse(items)
+
+    assert json.loads((await default_path()).body) == json.loads((await pydantic_path()).body)
+
+    rows = [
+        ("FastAPI por defecto", await _measure_async(default_path)),
+        ("PydanticJSONResponse", await _measure_async(pydantic_path)),
+    ]
+    print(f"Página de {len(items)} PostRead, mejor promedio por respuesta")
+    _common.table(("camino", "ms", "páginas/s"), [(name, ms, 1000 / ms) for name, ms in rows])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
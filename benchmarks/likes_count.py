@@ -0,0 +1,56 @@
+"""
+likes_count de una página del feed (user-002): cargar las filas Like de cada post
+(selectinload + len, el camino anterior) contra la subconsulta COUNT correlacionada de
+post_service. Se repite con distintas cantidades de likes por post.
+
+    python benchmarks/likes_count.py --likes 10 100 500
+"""
+import _common
+
+
+def main() -> None:
+    parser = _common.parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--likes", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    _common.configure(args.database_url)
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import Session, select
+
+    from core.database import engine
+    from models import Post
+    from services.post_service import _likes_count_expr
+
+    newest = (Post.created_at.desc(), Post.id.desc())  # type: ignore
+
+    def load_rows(session):
+        posts = session.exec(
+            select(Post).options(selectinload(Post.likes)).order_by(*newest).limit(args.limit)  # type: ignore
+        ).all()
+        return [(post.id, len(post.likes)) for post in posts]
+
+    def count_in_sql(session):
+        return [tuple(row) for row in session.exec(
+            select(Post.id, _likes_count_expr()).order_by(*newest).limit(args.limit)
+        ).all()]
+
+    rows = []
+    for likes in args.likes:
+        _common.seed(engine, users=likes, posts=args.posts, likes_per_post=likes)
+        with Session(engine) as session:
+            assert load_rows(session) == count_in_sql(session)
+        timings = []
+        for strategy in (load_rows, count_in_sql):
+            def run():
+                with Session(engine) as session:
+                    strategy(session)
+            timings.append(_common.measure(run))
+        rows.append((likes, *timings, timings[0] / timings[1]))
+    print(f"Página de {args.limit} posts ({engine.dialect.name}), mejor promedio por página")
+    _common.table(("likes/post", "filas Like ms", "COUNT ms", "x"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Ráfaga de logins con distintos PASSWORD_HASH_MAX_WORKERS (user-015). Para cada tamaño del
+pool de Argon2 mide el tiempo total de --logins logins concurrentes, el retraso máximo del
+event loop y la latencia de GET /users/me (handler sync, usa el threadpool de FastAPI)
+mientras dura la ráfaga.
+
+    python benchmarks/password_hashing.py --logins 8 --workers 1 2 4
+"""
+import asyncio
+import os
+import time
+
+import _common
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        worst = max(worst, time.perf_counter() - start - 0.005)
+    return worst * 1000
+
+
+async def _probe(client, headers: dict, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/users/me", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def _burst(client, logins: int) -> float:
+    async def login(i: int):
+        response = await client.post(
+            "/auth/login", data={"username": f"user{i}@example.com", "password": _common.PASSWORD},
+        )
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(2, logins + 2)))
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = _common.parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    _common.configure(args.database_url)
+    import httpx
+
+    import main as app_main
+    from core import password_hashing
+    from core.config import settings
+    from core.database import engine
+
+    _common.seed(engine, users=args.logins + 1)
+    transport = httpx.ASGITransport(app=app_main.app)
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/auth/login", data={"username": "user1@example.com", "password": _common.PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        for workers in args.workers:
+            settings.PASSWORD_HASH_MAX_WORKERS = workers
+            password_hashing.shutdown_executor()
+            await _burst(client, args.logins)  # calentamiento
+
+            stop = asyncio.Event()
+            lag = asyncio.create_task(_loop_lag(stop))
+            probe = asyncio.create_task(_probe(client, headers, stop))
+            elapsed = await _burst(client, args.logins)
+            stop.set()
+            probes = await probe
+            rows.append((
+                workers, elapsed, await lag, _common.median(probes), max(probes), len(probes),
+            ))
+    password_hashing.shutdown_executor()
+    print(f"{args.logins} logins concurrentes, {os.cpu_count()} CPU")
+    _common.table(
+        ("workers Argon2", "ráfaga s", "lag loop máx ms", "/users/me p50 ms", "/users/me máx ms", "sondas"), rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Armado de una página de PostRead (user-022): el camino anterior (Post/User/UserProfiles
+con joinedload + selectinload y PostRead.model_validate + model_copy por post) contra la
+proyección de columnas de post_service (una consulta de filas, una de multimedia y un solo
+TypeAdapter para la página). Se mide la página completa y solo la validación.
+
+    python benchmarks/post_projection.py --limit 100
+"""
+import _common
+
+
+def main() -> None:
+    parser = _common.parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    _common.configure(args.database_url)
+    from sqlalchemy.orm import joinedload, selectinload
+    from sqlmodel import Session, select
+
+    from core.database import engine
+    from models import Post, User
+    from schemas import PostRead
+    from services import post_service
+
+    _common.seed(engine, users=20, posts=args.posts, likes_per_post=3, media=True)
+    newest = (Post.created_at.desc(), Post.id.desc())  # type: ignore
+
+    # Copia del armado anterior a user-022
+    def previous_rows(session):
+        return session.exec(
+            select(Post, post_service._likes_count_expr())
+            .options(
+                joinedload(Post.user).joinedload(User.user_info),  # type: ignore
+                selectinload(Post.multimedia),  # type: ignore
+            )
+            .join(User, User.id == Post.user_id)  # type: ignore
+            .order_by(*newest)
+            .limit(args.limit)
+        ).all()
+
+    def previous_build(rows):
+        result = []
+        for post, likes_count in rows:
+            validated = PostRead.model_validate(post)
+            result.append(validated.model_copy(update={
+                "likes_count": likes_count,
+                "city_name": post.location_text or "Sin ubicación",
+                "username": (
+                    getattr(getattr(getattr(post, "user", None), "user_info", None), "username", None)
+                    or getattr(getattr(post, "user", None), "email", "Usuario eliminado")
+                ),
+            }))
+        return result
+
+    def projection_rows(session):
+        rows = session.exec(post_service._select_post_rows().order_by(*newest).limit(args.limit)).all()
+        return rows, post_service._multimedia_by_post(session, [row.id for row in rows])
+
+    def previous_page():
+        with Session(engine) as session:
+            return previous_build(previous_rows(session))
+
+    def projection_page():
+        with Session(engine) as session:
+            return post_service._post_reads(*projection_rows(session))
+
+    assert previous_page() == projection_page()
+
+    with Session(engine) as session:
+        loaded = previous_rows(session)
+        projected = projection_rows(session)
+        rows = [
+            ("página completa", _common.measure(previous_page), _common.measure(projection_page)),
+            ("solo validación", _common.measure(lambda: previous_build(loaded)),
+             _common.measure(lambda: post_service._post_reads(*projected))),
+        ]
+    print(f"{args.limit} posts con una imagen cada uno ({engine.dialect.name}), mejor promedio por página")
+    _common.table(("", "ORM + model_validate ms", "proyección ms", "x"), [(*row, row[1] / row[2]) for row in rows])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Selección de destinatarios al publicar un post (user-007):
+
+1. Solo el filtro por distancia: haversine_m en un loop de Python contra haversine_m_many.
+2. La carga completa: el camino anterior (suscripciones, luego tokens con IN de todos los ids
+   y loop de Python) contra push_notification_service._load_subscriber_tokens (un join, caja
+   lat/lon en SQL y una pasada NumPy).
+
+Los suscriptores se reparten por todo el país (10% sin ubicación) y el post está en CABA.
+
+    python benchmarks/subscriber_targeting.py --subscribers 1000 10000 20000
+"""
+import random
+
+import _common
+
+POST_LAT, POST_LON, RADIUS_M = -34.6037, -58.3816, 50_000.0
+
+
+def _seed_subscribers(engine, subscribers: int) -> None:
+    from sqlalchemy import insert
+    from sqlmodel import Session
+
+    from models.notification.push_token import UserPushToken
+    from models.notification.subscription import NotificationSubscription
+
+    _common.seed(engine, users=subscribers + 1)
+    rng = random.Random(7)
+    with Session(engine) as session:
+        session.execute(insert(NotificationSubscription), [
+            {"user_id": user_id, "post_type_id": 1, "category": category}
+            for user_id in range(2, subscribers + 2)
+            for category in ("perros", "gatos")
+        ])
+        located = [rng.random() >= 0.1 for _ in range(subscribers)]
+        session.execute(insert(UserPushToken), [
+            {
+                "user_id": user_id, "token": f"ExponentPushToken[{user_id}]",
+                "latitude": rng.uniform(-55, -22) if has_location else None,
+                "longitude": rng.uniform(-73, -53) if has_location else None,
+            }
+            for user_id, has_location in zip(range(2, subscribers + 2), located)
+        ])
+        session.commit()
+
+
+def _previous_load(engine, post_type_id, category, post_author_id, post_lat, post_lon, radius_m) -> list[str]:
+    # Copia de _load_subscriber_tokens antes de user-007
+    from sqlmodel import Session, select
+
+    from models.notification.push_token import UserPushToken
+    from models.notification.subscription import NotificationSubscription
+    from utils.geo import haversine_m
+
+    with Session(engine) as session:
+        subscriber_ids = session.exec(
+            select(NotificationSubscription.user_id).where(
+                NotificationSubscription.post_type_id == post_type_id,
+                NotificationSubscription.category == category,
+                NotificationSubscription.user_id != post_author_id,
+            )
+        ).all()
+        if not subscriber_ids:
+            return []
+        token_rows = session.exec(
+            select(UserPushToken).where(UserPushToken.user_id.in_(subscriber_ids))  # type: ignore
+        ).all()
+
+    return [
+        row.token for row in token_rows
+        if row.latitude is None or row.longitude is None
+        or haversine_m(post_lat, post_lon, row.latitude, row.longitude) <= radius_m
+    ]
+
+
+def main() -> None:
+    parser = _common.parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 10000, 20000])
+    args = parser.parse_args()
+
+    _common.configure(args.database_url)
+    import numpy as np
+
+    from core.database import engine
+    from services.push_notification_service import _load_subscriber_tokens
+    from utils.geo import haversine_m, haversine_m_many
+
+    rng = np.random.default_rng(7)
+    distance_rows = []
+    for count in args.subscribers:
+        lats, lons = rng.uniform(-55, -22, count), rng.uniform(-73, -53, count)
+        points = list(zip(lats.tolist(), lons.tolist()))
+        python_loop = _common.measure(
+            lambda: [haversine_m(POST_LAT, POST_LON, lat, lon) <= RADIUS_M for lat, lon in points], number=5,
+        )
+        vectorized = _common.measure(lambda: haversine_m_many(POST_LAT, POST_LON, lats, lons) <= RADIUS_M, number=5)
+        distance_rows.append((count, python_loop, vectorized, python_loop / vectorized))
+    print("Filtro por distancia, mejor promedio por pasada")
+    _common.table(("puntos", "loop ms", "NumPy ms", "x"), distance_rows)
+
+    load_rows = []
+    call = (1, "perros", 1, POST_LAT, POST_LON, RADIUS_M)
+    for count in args.subscribers:
+        _seed_subscribers(engine, count)
+        expected = sorted(_previous_load(engine, *call))
+        assert sorted(_load_subscriber_tokens(*call)) == expected
+        previous = _common.measure(lambda: _previous_load(engine, *call), number=5)
+        current = _common.measure(lambda: _load_subscriber_tokens(*call), number=5)
+        load_rows.append((count, len(expected), previous, current, previous / current))
+    print(f"\nCarga de destinatarios ({engine.dialect.name}), mejor promedio por post")
+    _common.table(("suscriptores", "notificados", "anterior ms", "actual ms", "x"), load_rows)
+
+
+if __name__ == "__main__":
+    main()
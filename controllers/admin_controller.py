@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from core import auth_cache, post_cache
+from core.database import engine, async_engine
+from core.db_pool import pool_stats
+from dependencies.permissions_dependencies import require_role
+from models.enums import RoleEnum
+from models.user.user import User
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/auth-cache", description="Hit/miss counters of the in-process auth cache.")
+def get_auth_cache_stats(current_user: User = require_role(RoleEnum.ADMIN)):
+    return auth_cache.stats()
+
+
+@router.get("/db-pool", description="Connection pool usage and checkout wait histogram.")
+def get_db_pool_stats(current_user: User = require_role(RoleEnum.ADMIN)):
+    stats = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.sync_engine)
+    return stats
+
+
+@router.get("/post-cache", description="Hit/miss counters and size of the feed/post response cache.")
+def get_post_cache_stats(current_user: User = require_role(RoleEnum.ADMIN)):
+    return post_cache.stats()
@@ -14,9 +14,9 @@ from dependencies.auth_dependencies import get_current_user, oauth2_scheme
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @router.post("/login")
-def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], session: SessionDep):
+async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], session: SessionDep):
     data = LoginData(email=form_data.username, password=form_data.password)
-    return auth_service.login(data, session)
+    return await auth_service.login(data, session)
 
 @router.get("/is_admin")
 def is_admin(current_user: User = Depends(get_current_user)):
@@ -31,8 +31,8 @@ def logout(session: SessionDep, token: Annotated[str, Depends(oauth2_scheme)]):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already loggued out")
     
 @router.post("/register", response_model=UserRead)
-def register(user_data: UserCreate, session: SessionDep):
-    return auth_service.register_user(user_data, session)
+async def register(user_data: UserCreate, session: SessionDep):
+    return await auth_service.register_user(user_data, session)
 
 def refresh_token():
     pass
\ No newline at end of file
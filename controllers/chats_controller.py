@@ -1,21 +1,29 @@
 from typing import Annotated
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Path, Query
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Path, Query, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
 
-from core.database import SessionDep
-from dependencies.auth_dependencies import get_current_user
+from core.config import settings
+from core.database import SessionDep, AsyncSessionDep, engine
+from core.pubsub import broker, user_channel
+from dependencies.auth_dependencies import get_current_user, get_current_user_async
+from dependencies.read_session_dependencies import ReadSessionDep
 from models.user.user import User
 from models.chat.chat import Chat
 from models.post.post import Post
 from schemas.chats_schemas import (
     ChatCreate, ChatReadWithUser, ChatResolve, ChatRead, ChatDetailRead,
-    ChatMessageCreate, ChatMessageRead, ChatFilters
+    ChatMessageCreate, ChatMessageRead, ChatFilters,
+    ChatMarkRead, ChatReadState, ChatUnreadSummary
 )
 from services import chat_service
-from services import push_notification_service
+from utils.conditional import etag_for, is_fresh, not_modified, set_etag
+from utils.responses import PydanticJSONResponse
 from exceptions.exceptions import (
     NotOwnerError, PostNotFoundException,
     ChatNotFoundException, ChatAlreadyExistsException,
-    ChatClosedException
+    ChatClosedException, InvalidCursorException
 )
 
 router = APIRouter(prefix="/chats", tags=["chats"])
@@ -49,30 +57,75 @@ def create_chat(
 # ------------------------------------------------------------------
 @router.get("/me", response_model=list[ChatReadWithUser])
 def get_my_chats(
-    session: SessionDep,
+    session: ReadSessionDep,
     filters: Annotated[ChatFilters, Query()],
     current_user: User = Depends(get_current_user)
 ):
     """
     Devuelve todos los chats donde el usuario es initiator o receiver.
+    El otro participante viene en `receiver`, junto con el último mensaje.
     """
-    chats = chat_service.get_user_chats(
+    return PydanticJSONResponse(chat_service.get_user_chats(
         session=session,
         user_id=current_user.id, # type: ignore
         filters=filters
+    ))
+
+
+@router.get("/unread-count", response_model=ChatUnreadSummary)
+def get_unread_count(
+    session: ReadSessionDep,
+    current_user: User = Depends(get_current_user)
+):
+    """Cantidad de chats con mensajes sin leer (badge de la app)."""
+    return ChatUnreadSummary(
+        unread_chats=chat_service.count_unread_chats(session, current_user.id)  # type: ignore
     )
-    chats_with_users = []
-    for chat in chats:
-        counterpart = session.get(User, chat.receiver_id if chat.initiator_id == current_user.id else chat.initiator_id)
-        if(counterpart):
-            chat_data = ChatReadWithUser(
-                **chat.model_dump(),
-                initiator=None,
-                receiver=counterpart # type: ignore
-                )
-            chats_with_users.append(chat_data)
-        
-    return chats_with_users
+
+
+# ------------------------------------------------------------------
+# 2b. Mensajes en tiempo real
+# ------------------------------------------------------------------
+def _authenticate_socket(token: str) -> int:
+    # Mismas validaciones que los endpoints HTTP (firma, blacklist, sesión activa, usuario)
+    with Session(engine) as session:
+        return get_current_user(session, token).id  # type: ignore
+
+
+@router.websocket("/ws")
+async def chat_updates(websocket: WebSocket, token: str | None = Query(None)):
+    """
+    Recibe los mensajes nuevos de todos los chats del usuario apenas se envían.
+    El token va en ?token= (los navegadores no permiten headers en WebSocket)
+    o en el header Authorization: Bearer.
+    Cada evento: {"type": "chat_message", "message": ChatMessageRead}.
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" and credentials else None
+    try:
+        if token is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        user_id = await run_in_threadpool(_authenticate_socket, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    async with broker.subscribe(user_channel(user_id)) as queue, anyio.create_task_group() as tg:
+
+        async def forward() -> None:
+            try:
+                while True:
+                    await websocket.send_json(await queue.get())
+            except WebSocketDisconnect:
+                tg.cancel_scope.cancel()
+
+        tg.start_soon(forward)
+        # Lo que mande el cliente (texto o binario) se ignora; solo sirve para detectar la desconexión
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+        tg.cancel_scope.cancel()
 
 
 # ------------------------------------------------------------------
@@ -81,18 +134,40 @@ def get_my_chats(
 @router.get("/{chat_id}", response_model=ChatDetailRead)
 def get_chat_detail(
     session: SessionDep,
+    request: Request,
+    response: Response,
     chat_id: int = Path(..., gt=0),
+    after_id: int | None = Query(None, gt=0, description="Solo mensajes posteriores a este id"),
+    before_id: int | None = Query(None, gt=0, description="Solo mensajes anteriores a este id"),
+    limit: int = Query(100, ge=1, le=500),
     current_user: User = Depends(get_current_user)
 ):
     """
     Solo los participantes del chat pueden verlo.
+    Sin cursores devuelve los últimos `limit` mensajes; con after_id el cliente
+    trae solo lo nuevo desde su último poll.
+    Con If-None-Match responde 304 si el chat no cambió, sin cargar los mensajes.
     """
     try:
+        # El validador se calcula antes que el detalle: si entra un mensaje en el medio,
+        # el ETag queda viejo y el próximo GET trae todo (nunca un 304 falso)
+        etag = etag_for(
+            chat_service.get_chat_detail_validators(session, chat_id, current_user.id),  # type: ignore
+            after_id, before_id, limit,
+        )
+        if is_fresh(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         return chat_service.get_chat_detail(
             session=session,
             chat_id=chat_id,
-            requesting_user_id=current_user.id # type: ignore
+            requesting_user_id=current_user.id, # type: ignore
+            after_id=after_id,
+            before_id=before_id,
+            limit=limit,
         )
+    except (ValueError, InvalidCursorException) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ChatNotFoundException:
         raise HTTPException(status_code=404, detail="Chat no encontrado")
     except PermissionError:
@@ -102,28 +177,33 @@ def get_chat_detail(
 # ------------------------------------------------------------------
 # 4. Enviar mensaje
 # ------------------------------------------------------------------
+# DATABASE_ASYNC solo elige la sesión y la autenticación; el handler es uno solo para los dos modos
+MessageSessionDep = AsyncSessionDep if settings.DATABASE_ASYNC else SessionDep
+_message_user = get_current_user_async if settings.DATABASE_ASYNC else get_current_user
+
+
 @router.post("/{chat_id}/messages", response_model=ChatMessageRead)
-def send_message(
-    session: SessionDep,
+async def send_message(
+    session: MessageSessionDep,
     message_data: ChatMessageCreate,
-    background_tasks: BackgroundTasks,
     chat_id: int = Path(..., gt=0),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(_message_user)
 ):
     try:
-        msg = chat_service.send_message(
+        if settings.DATABASE_ASYNC:
+            return await chat_service.send_message_async(
+                session=session,
+                chat_id=chat_id,
+                sender_user_id=current_user.id, # type: ignore
+                message_text=message_data.message
+            )
+        return await run_in_threadpool(
+            chat_service.send_message,
             session=session,
             chat_id=chat_id,
             sender_user_id=current_user.id, # type: ignore
             message_text=message_data.message
         )
-        background_tasks.add_task(
-            push_notification_service.notify_chat_recipient,
-            chat_id=chat_id,
-            sender_id=current_user.id,
-            message_preview=message_data.message.strip()[:100],
-        )
-        return msg
     except ChatNotFoundException:
         raise HTTPException(status_code=404, detail="Chat no encontrado")
     except ChatClosedException:
@@ -132,6 +212,32 @@ def send_message(
         raise HTTPException(status_code=403, detail="No participás en este chat")
 
 
+# ------------------------------------------------------------------
+# 4b. Marcar como leído
+# ------------------------------------------------------------------
+@router.post("/{chat_id}/read", response_model=ChatReadState)
+def mark_chat_read(
+    session: SessionDep,
+    read_data: ChatMarkRead | None = None,
+    chat_id: int = Path(..., gt=0),
+    current_user: User = Depends(get_current_user)
+):
+    """Sin body marca todo el chat como leído; con message_id, hasta ese mensaje."""
+    try:
+        return chat_service.mark_chat_read(
+            session=session,
+            chat_id=chat_id,
+            user_id=current_user.id, # type: ignore
+            message_id=read_data.message_id if read_data else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ChatNotFoundException:
+        raise HTTPException(status_code=404, detail="Chat no encontrado")
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="No participás en este chat")
+
+
 # ------------------------------------------------------------------
 # 5. Resolver chat: concretar o rechazar (solo el dueño del post)
 # ------------------------------------------------------------------
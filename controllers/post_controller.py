@@ -1,20 +1,26 @@
 from typing import Annotated
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 import json
 
+from core import post_cache
+from core.config import settings
 from core.database import SessionDep
-from dependencies.auth_dependencies import get_current_user
+from dependencies.auth_dependencies import get_current_user, get_current_user_async
 from dependencies.permissions_dependencies import require_role
+from dependencies.read_session_dependencies import ReadSessionDep, AsyncReadSessionDep
 from models import Post, User, RoleEnum
 
-from schemas import PostCreate, PostPatch, PostFilters, PostRead
+from schemas import PostCreate, PostPatch, PostFilters, PostRead, PostFeedRead
 
 from services import post_service
-from services import push_notification_service
 
-from utils.catbox_service import upload_to_catbox
+from utils.media_storage import upload_media
+from utils.image_processing import build_image_variants
 from utils.generics import count_rows
-from exceptions.exceptions import NotOwnerError, PostNotFoundException
+from utils.conditional import json_response
+from utils.responses import PydanticJSONResponse
+from exceptions.exceptions import NotOwnerError, PostNotFoundException, InvalidCursorException
 
 
 router = APIRouter(prefix="/posts", tags=["posts"])
@@ -53,7 +59,7 @@ async def validate_file(file: UploadFile | None):
 
 
 @router.get("/count")
-def get_posts_count(session: SessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
+def get_posts_count(session: ReadSessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
     filters = {
         "is_active": 1
     }
@@ -62,7 +68,6 @@ def get_posts_count(session: SessionDep, current_user: User = require_role(RoleE
 @router.post("/")
 async def create_post(
     session: SessionDep,
-    background_tasks: BackgroundTasks,
     post_data: str = Form(...),  # recibe el JSON como string
     file: UploadFile | None = File(None),
     user: User = Depends(get_current_user),
@@ -72,49 +77,67 @@ async def create_post(
 
     validated_file = await validate_file(file)
     file_url = None
+    variants = {}
     if validated_file:
-        file_url = await upload_to_catbox(validated_file)  # tu función de Catbox
-
-    post = post_service.create_post(session, payload, user.id, file_url) # type: ignore
-
-    background_tasks.add_task(
-        push_notification_service.notify_post_subscribers,
-        post_id=post.id,
-        post_type_id=post.post_type_id,
-        category=post.category,
-        post_author_id=user.id,
-        post_title=post.title,
-        post_lat=payload.latitude,
-        post_lon=payload.longitude,
-    )
-    return post
+        variants = await build_image_variants(validated_file)
+        file_url = await upload_media(validated_file)
+
+    return post_service.create_post(session, payload, user.id, file_url, variants) # type: ignore
 
 
 @router.get("/liked")
 def is_liked_by_user(session: SessionDep, post_id: int, current_user: User = Depends(get_current_user)):
     return post_service.is_liked_by_user(session = session, post_id = post_id, user_id = current_user.id) # type: ignore
 
-@router.get("/", description="Retrieves a paginated list of posts, with optional skip and limit parameters.")
-def get_posts(session: SessionDep, filters: Annotated[PostFilters, Query()], current_user: User =Depends(get_current_user)):
-    posts = post_service.get_posts(session=session, filters=filters, user = current_user)
-    
-    return {"posts": posts,
-            "limit_reached": True if len(posts) < filters.limit else False}
+_GET_POSTS_DESCRIPTION = "Retrieves a paginated list of posts, paged with skip/limit or with the opaque next_cursor of the previous page."
+
+# Feed y detalle se sirven desde core.post_cache (JSON ya serializado), con ETag del cuerpo:
+# un GET repetido con If-None-Match recibe 304 sin cuerpo.
+# DATABASE_ASYNC solo elige la sesión y la autenticación; el handler es uno solo para los dos modos.
+FeedSessionDep = AsyncReadSessionDep if settings.DATABASE_ASYNC else ReadSessionDep
+_feed_user = get_current_user_async if settings.DATABASE_ASYNC else get_current_user
+
+
+async def _feed_body(session, filters: PostFilters, user: User) -> bytes:
+    fresh = session.info.get("read_your_writes", False)
+    if settings.DATABASE_ASYNC:
+        return await post_cache.cached_feed_async(
+            filters, lambda: post_service.get_posts_async(session=session, filters=filters, user = user), fresh
+        )
+    # Driver sync: la cache y la consulta bloquean, van juntas al threadpool
+    return await run_in_threadpool(
+        post_cache.cached_feed,
+        filters,
+        lambda: post_service.get_posts(session=session, filters=filters, user = user),
+        fresh,
+    )
+
+
+@router.get("/", description=_GET_POSTS_DESCRIPTION, response_model=PostFeedRead)
+async def get_posts(session: FeedSessionDep, request: Request, filters: Annotated[PostFilters, Query()], current_user: User = Depends(_feed_user)):
+    try:
+        body = await _feed_body(session, filters, current_user)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return json_response(request, body)
 
 @router.get("/search", response_model=list[PostRead])
 def search_post(keyword: str, session: SessionDep, current_user: User = Depends(get_current_user)):
-    return post_service.search_post(session=session, keyword= keyword)
+    return PydanticJSONResponse(post_service.search_post(session=session, keyword= keyword))
 
 @router.get("/user/{user_id}", description="Retrives a list of post by his owner", response_model=list[PostRead])
 def get_post_by_user(session: SessionDep, user_id: int, current_user: User = Depends(get_current_user)):
 
-    return post_service.get_posts_by_user(session=session, user_id=user_id)
+    return PydanticJSONResponse(post_service.get_posts_by_user(session=session, user_id=user_id))
 
 
 @router.get("/{post_id}", description="Retrieves a post by its ID.", response_model=PostRead)
-def get_post_by_id(session: SessionDep, post_id: int, current_user: User = Depends(get_current_user)):
+def get_post_by_id(session: ReadSessionDep, request: Request, post_id: int, current_user: User = Depends(get_current_user)):
     try:
-        return post_service.get_post_by_id(session, post_id)
+        body = post_cache.cached_post(
+            post_id, lambda: post_service.get_post_by_id(session, post_id), session.info.get("read_your_writes", False)
+        )
+        return json_response(request, body)
     except(PostNotFoundException):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post no encontrado")
 
@@ -137,14 +160,16 @@ async def edit_post(
 
         # Handle file upload
         file_url = None
+        variants = {}
         if file:
-            # Validate and upload the new file (e.g., to Catbox)
+            # Validate and upload the new file to the configured media storage
             validated_file = await validate_file(file)
             if validated_file:
-                file_url = await upload_to_catbox(validated_file)  # Upload the file and get the URL
+                variants = await build_image_variants(validated_file)  # Resized WebP copies (images only)
+                file_url = await upload_media(validated_file)  # Upload the file and get the URL
 
         # Call the service method to update the post
-        updated_post = post_service.patch_post(session, post_id, validated_post_data, current_user.id, file_url) # type: ignore
+        updated_post = post_service.patch_post(session, post_id, validated_post_data, current_user.id, file_url, variants) # type: ignore
 
         return updated_post
 
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 
 from core.database import SessionDep
 from dependencies.auth_dependencies import get_current_user
+from dependencies.read_session_dependencies import ReadSessionDep
 from exceptions import ReportNotFoundException, ReportAlreadyReviewedException
 from models.post.report import Report
 from models.user.user import User
@@ -11,11 +12,12 @@ from dependencies.permissions_dependencies import require_role
 from models.enums import RoleEnum
 from schemas import ReportCreate, ReportRead
 from utils.generics import count_rows
+from utils.responses import PydanticJSONResponse
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 @router.get("/count")
-def reports_count(session: SessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
+def reports_count(session: ReadSessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
     filters = {
         "is_reviewed": False
     }
@@ -30,7 +32,7 @@ def create_report(session: SessionDep, report_data: ReportCreate, current_user:
 @router.get("/", response_model=list[ReportRead])
 def list_reports(session: SessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
     try:
-        return report_service.get_all_reports(session= session)
+        return PydanticJSONResponse(report_service.get_all_reports(session= session))
     except ReportNotFoundException as e:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail=str(e))
 
@@ -1,17 +1,21 @@
 from datetime import date
+from typing import Literal
 from fastapi import APIRouter, Body, Depends, HTTPException, Request, status, Query
 from fastapi.responses import StreamingResponse
 from core.database import SessionDep
 from dependencies.auth_dependencies import get_current_user
+from dependencies.read_session_dependencies import ReadSessionDep
 from dependencies.permissions_dependencies import require_role
 from exceptions.exceptions import UserNotFoundException
 from models.enums import RoleEnum, StatusUserEnum
 from models.user.user import User
-from schemas.user_schemas import UserPatch, UserRead
-from services import user_service
+from schemas.user_schemas import UserPatch, UserRead, LeaderboardEntry
+from services import user_service, leaderboard_service
 from sqlalchemy.orm import joinedload
 
 from utils.generics import count_rows
+from utils.conditional import json_response
+from utils.responses import PydanticJSONResponse
 
 #TODO: gestionar excepciones y respuestas http
 
@@ -34,25 +38,40 @@ def _check_user_is_active(user: User | None = None, user_id: int | None = None,
         return True if user_service.get_user_by_id(user_id = user_id, session = session).status_id == StatusUserEnum.ACTIVE else False 
         
 
-@router.get("/")
+@router.get("/", response_model=list[UserRead])
 def get_all_users(session: SessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
-    return user_service.get_all_users(session=session, user = current_user)
+    return PydanticJSONResponse(user_service.get_all_users(session=session, user = current_user))
+
+
+_EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+}
 
 
 @router.get("/export/excel")
 def export_users_to_excel(
-    session: SessionDep,
+    session: ReadSessionDep,
     request: Request,  # ← AÑADIMOS ESTO
     date_from: date = Query(..., description="Fecha desde (YYYY-MM-DD)"),
     date_to: date = Query(..., description="Fecha hasta (YYYY-MM-DD)"),
+    format: Literal["xlsx", "csv"] = Query("xlsx", description="csv se envía a medida que se genera"),
     current_user: User = require_role(RoleEnum.ADMIN),
 ):
     if date_from > date_to:
         raise HTTPException(status_code=400, detail="La fecha inicial no puede ser mayor que la final")
 
-    excel_file = user_service.export_users_excel_service(date_from, date_to, session)
+    user_service.ensure_users_to_export(session, date_from, date_to)
 
-    filename = f"usuarios_{date_from}_a_{date_to}.xlsx"
+    # El archivo se genera mientras se envía, con su propia sesión sobre el mismo engine
+    engine = session.get_bind()
+    if format == "csv":
+        export_file = user_service.stream_users_csv(engine, date_from, date_to)  # type: ignore[arg-type]
+    else:
+        export_file = user_service.stream_users_xlsx(engine, date_from, date_to)  # type: ignore[arg-type]
+
+    filename = f"usuarios_{date_from}_a_{date_to}.{format}"
+    media_type = _EXPORT_MEDIA_TYPES[format]
 
     # TRUCO MÁGICO para que descargue en el navegador real
     user_agent = request.headers.get("user-agent", "").lower()
@@ -60,8 +79,8 @@ def export_users_to_excel(
     if "mozilla" in user_agent or "chrome" in user_agent or "safari" in user_agent:
         # Es un navegador → forzamos descarga
         return StreamingResponse(
-            excel_file,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            export_file,
+            media_type=media_type,
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"',
                 "Access-Control-Expose-Headers": "Content-Disposition",  # importante para CORS si usas frontend
@@ -70,8 +89,8 @@ def export_users_to_excel(
     else:
         # Es Swagger/Postman → devolvemos normal (para que no se quebre)
         return StreamingResponse(
-            excel_file,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            export_file,
+            media_type=media_type,
             headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
 
@@ -80,34 +99,44 @@ def export_users_to_excel(
 def get_user_rank(session: SessionDep,current_user: User = Depends(get_current_user)):
     return user_service.get_user_rank(session = session, user_id = current_user.id)
 
+@router.get("/leaderboard", response_model=list[LeaderboardEntry])
+def get_leaderboard(
+    session: ReadSessionDep,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    return PydanticJSONResponse(leaderboard_service.get_top(session=session, limit=limit))
+
 @router.get("/role")
 def get_user_by_role(role: str ,session: SessionDep, current_user: User = require_role(RoleEnum.MODERATOR) ):
     return user_service.get_user_by_role(session=session, role = role)
 
 @router.get("/count")
-def get_users_count(session: SessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
+def get_users_count(session: ReadSessionDep, current_user: User = require_role(RoleEnum.MODERATOR)):
     filters = {
         "status_id": StatusUserEnum.ACTIVE
     }
     return count_rows(session=session, model = User, filter_conditions=filters)
 
 @router.get("/me", response_model=UserRead)
-def me(session: SessionDep,current_user: User = Depends(get_current_user)):
+def me(session: SessionDep, request: Request, current_user: User = Depends(get_current_user)):
     if(_check_user_is_active(current_user)):
-        return session.get(User, current_user.id, options=[joinedload(User.user_info)]) # type: ignore
+        user = session.get(User, current_user.id, options=[joinedload(User.user_info)]) # type: ignore
+        # UserProfiles no tiene updated_at: el ETag sale del cuerpo (un solo usuario, es barato)
+        return json_response(request, UserRead.model_validate(user).model_dump_json().encode())
             
     else:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
 @router.patch("/me", response_model=UserRead)
-def update_me(
+async def update_me(
     session: SessionDep, 
     current_user: User = Depends(get_current_user), 
     user_data: UserPatch = Body(...)
 ):
     if(_check_user_is_active(current_user)):
         assert current_user.id is not None
-        return user_service.patch_self(user_id=current_user.id, session=session, user_data=user_data)
+        return await user_service.patch_self(user_id=current_user.id, session=session, user_data=user_data)
     else:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
  
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from anyio import to_thread
+from cachetools import TLRUCache
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache en proceso de tokens ya validados: jti -> snapshot de las columnas del usuario.
+# Cada worker tiene su propia copia; por eso el TTL es corto y las operaciones que
+# invalidan sesiones (logout, baja, cambio de rol) desalojan la entrada explícitamente.
+# El desalojo local solo alcanza al worker que atendió la operación: con AUTH_CACHE_REDIS_URL
+# además se deja una marca de revocación que los demás workers consultan en cada hit.
+
+
+def _time_to_use(jti: str, entry: dict, now: float) -> float:
+    return min(now + settings.AUTH_CACHE_TTL_SECONDS, entry["expires_at"])
+
+
+class RedisRevocations:
+    """Marcas de revocación compartidas. Usa el paquete `redis` de requirements.txt."""
+
+    def __init__(self, url: str, prefix: str = "petlink:auth-revoked:"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        # Ninguna entrada de la cache vive más que el TTL: la marca tampoco necesita más
+        self._ttl = settings.AUTH_CACHE_TTL_SECONDS + 1
+
+    def revoke_token(self, jti: str) -> None:
+        self._redis.set(f"{self._prefix}jti:{jti}", 1, ex=self._ttl)
+
+    def revoke_user(self, user_id: int) -> None:
+        self._redis.set(f"{self._prefix}user:{user_id}", time.time(), ex=self._ttl)
+
+    def is_revoked(self, jti: str, user_id: int, validated_at: float) -> bool:
+        token_mark, user_mark = self._redis.mget(
+            f"{self._prefix}jti:{jti}", f"{self._prefix}user:{user_id}"
+        )
+        return token_mark is not None or (user_mark is not None and float(user_mark) >= validated_at)
+
+
+_cache: TLRUCache = TLRUCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE,
+    ttu=_time_to_use,
+    timer=lambda: datetime.now(timezone.utc).timestamp(),
+)
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_revocations = RedisRevocations(settings.AUTH_CACHE_REDIS_URL) if settings.AUTH_CACHE_REDIS_URL else None
+
+
+def _revoked_elsewhere(jti: str, entry: dict) -> bool:
+    if _revocations is None:
+        return False
+    try:
+        return _revocations.is_revoked(jti, entry["user"]["id"], entry["validated_at"])
+    except Exception:
+        # Sin Redis no se puede descartar una revocación: se valida contra la BD
+        logger.exception("Auth cache revocation check failed")
+        return True
+
+
+def get(jti: str) -> dict | None:
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    with _lock:
+        entry = _cache.get(jti)
+    if entry is not None and _revoked_elsewhere(jti, entry):
+        with _lock:
+            _cache.pop(jti, None)
+        entry = None
+    with _lock:
+        _stats["hits" if entry else "misses"] += 1
+    return entry["user"] if entry else None
+
+
+async def get_async(jti: str) -> dict | None:
+    # Con revocaciones compartidas get consulta Redis (cliente sync): va a un hilo
+    if _revocations is None:
+        return get(jti)
+    return await to_thread.run_sync(get, jti)
+
+
+def put(jti: str, user: dict, expires_at: float, validated_at: float | None = None) -> None:
+    if not settings.AUTH_CACHE_ENABLED:
+        return
+    with _lock:
+        _cache[jti] = {
+            "user": user,
+            "expires_at": expires_at,
+            "validated_at": validated_at if validated_at is not None else time.time(),
+        }
+
+
+def _publish(revoke, *args) -> None:
+    if _revocations is None:
+        return
+    try:
+        revoke(*args)
+    except Exception:
+        logger.exception("Could not publish auth cache revocation")
+
+
+def evict_token(jti: str) -> None:
+    with _lock:
+        if _cache.pop(jti, None) is not None:
+            _stats["evictions"] += 1
+    if _revocations is not None:
+        _publish(_revocations.revoke_token, jti)
+
+
+def evict_user(user_id: int) -> None:
+    with _lock:
+        stale = [jti for jti, entry in _cache.items() if entry["user"]["id"] == user_id]
+        for jti in stale:
+            del _cache[jti]
+        _stats["evictions"] += len(stale)
+    if _revocations is not None:
+        _publish(_revocations.revoke_user, user_id)
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "enabled": settings.AUTH_CACHE_ENABLED,
+            "shared_revocations": _revocations is not None,
+            "size": len(_cache),
+            "maxsize": _cache.maxsize,
+            "ttl_seconds": settings.AUTH_CACHE_TTL_SECONDS,
+            **_stats,
+            "hit_ratio": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
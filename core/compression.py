@@ -0,0 +1,165 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # opcional: `pip install brotli` (no incluido en requirements.txt)
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Compresión de respuestas HTTP en streaming: cada chunk del cuerpo se comprime y se
+# envía al llegar, sin juntar el cuerpo entero (el export de usuarios también pasa por acá).
+# Solo se comprimen los tipos de COMPRESSIBLE_TYPES; imágenes, xlsx, etc. ya vienen comprimidos.
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)  # type: ignore[union-attr]
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli según Accept-Encoding (brotli tiene prioridad si está instalado).
+    Respuestas de un solo chunk por debajo de minimum_size salen sin comprimir.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: tuple[str, ...] = COMPRESSIBLE_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = content_types
+
+    def _choose_encoding(self, accept_encoding: str) -> str | None:
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip") if brotli is not None else ("gzip",):
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    def new_compressor(self, encoding: str) -> _GzipCompressor | _BrotliCompressor:
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    def is_compressible(self, status: int, headers: Headers) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return any(
+            media_type.startswith(allowed) if allowed.endswith("/") else media_type == allowed
+            for allowed in self.content_types
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self, send, encoding))
+
+
+class _CompressingSend:
+    def __init__(self, middleware: CompressionMiddleware, send: Send, encoding: str):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.start_message: Message | None = None
+        self.passthrough = False
+        self.compressor: _GzipCompressor | _BrotliCompressor | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Se retiene hasta ver el primer chunk: ahí se decide si conviene comprimir
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = not self.middleware.is_compressible(message["status"], headers)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            assert self.start_message is not None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.compressor = self.middleware.new_compressor(self.encoding)
+            headers = MutableHeaders(raw=list(self.start_message["headers"]))
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            # Un ETag fuerte ya no describe estos bytes; los de utils/conditional ya son débiles
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            self.start_message["headers"] = headers.raw
+            await self.send(self.start_message)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
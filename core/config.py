@@ -9,6 +9,85 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
 
     DATABASE_URL: str
+    # Engine async para las rutas calientes (feed, envío de mensajes, auth).
+    # Sin ASYNC_DATABASE_URL se deriva de DATABASE_URL (pymysql→aiomysql, sqlite→aiosqlite).
+    DATABASE_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Pool de conexiones (no aplica a SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # segundos; menor que wait_timeout de MySQL
+    DB_POOL_PRE_PING: bool = True
+
+    # Réplica de lectura. Sin URL, las lecturas van al primario.
+    # Tras escribir, las lecturas de ese usuario siguen en el primario REPLICA_STICKY_SECONDS
+    # (debe superar el lag de replicación). El registro es por proceso salvo que
+    # REPLICA_STICKY_REDIS_URL esté configurada (un EXISTS a Redis por lectura a la réplica).
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_STICKY_SECONDS: int = 5
+    REPLICA_STICKY_REDIS_URL: str | None = None
+    # Réplica para DATABASE_ASYNC; sin valor se deriva de DATABASE_REPLICA_URL como ASYNC_DATABASE_URL
+    ASYNC_DATABASE_REPLICA_URL: str | None = None
+
+    # Cache de autenticación (jti validado -> usuario), una por worker.
+    # Logout, baja y cambio de rol desalojan al instante solo en el worker que los atendió;
+    # en los demás tardan hasta AUTH_CACHE_TTL_SECONDS salvo que AUTH_CACHE_REDIS_URL esté
+    # configurada (marca de revocación compartida, un GET a Redis por request cacheado).
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAXSIZE: int = 10000
+    AUTH_CACHE_REDIS_URL: str | None = None
+
+    # Búsqueda de posts con el índice FULLTEXT de MySQL (posts.ft_title_message)
+    FULLTEXT_SEARCH: bool = True
+
+    # Notificaciones push (Expo)
+    EXPO_PUSH_URL: str = "https://exp.host/--/api/v2/push/send"
+    PUSH_MAX_CONCURRENCY: int = 4
+    PUSH_MAX_RETRIES: int = 3
+    PUSH_RETRY_BACKOFF_SECONDS: float = 0.5
+
+    # Outbox de notificaciones (outbox_worker.py)
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_PARALLELISM: int = 10
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_LEASE_SECONDS: int = 120
+    OUTBOX_MAX_ATTEMPTS: int = 5
+
+    # Almacenamiento de archivos subidos: "catbox", "local" o "s3"
+    MEDIA_STORAGE_BACKEND: str = "catbox"
+    MEDIA_LOCAL_DIR: str = "media"
+    MEDIA_PUBLIC_BASE_URL: str = "http://localhost:8000/media"  # URL absoluta: PostMultimediaRead.url es HttpUrl
+    S3_BUCKET: str | None = None
+    S3_ENDPOINT_URL: str | None = None
+    S3_REGION: str | None = None
+    S3_ACCESS_KEY_ID: str | None = None
+    S3_SECRET_ACCESS_KEY: str | None = None
+
+    # Procesos para generar variantes de imágenes (thumb/medium/full)
+    IMAGE_PROCESS_WORKERS: int = 2
+
+    # Mensajes de chat en tiempo real (WebSocket): "memory" (un solo worker) o "redis"
+    CHAT_BROKER_BACKEND: str = "memory"
+    CHAT_BROKER_URL: str | None = None
+
+    # Cache de respuestas de GET /posts/ y GET /posts/{id}: "memory" o "redis"
+    POST_CACHE_ENABLED: bool = True
+    POST_CACHE_BACKEND: str = "memory"
+    POST_CACHE_REDIS_URL: str | None = None
+    POST_CACHE_TTL_SECONDS: int = 30
+    POST_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Hilos dedicados a Argon2 (hash/verify de contraseñas)
+    PASSWORD_HASH_MAX_WORKERS: int = 2
+
+    # Compresión de respuestas (core/compression.py); brotli solo si el paquete está instalado
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; por debajo el overhead no compensa
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
 
     class Config:
         env_file = ".env"
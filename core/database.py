@@ -1,12 +1,147 @@
+import logging
 import os
+import threading
 from typing import Annotated
+from anyio import to_thread
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.orm import Session as OrmSession, ORMExecuteState
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models import *
 from core.config import settings
+from core.db_pool import pool_options
+from utils.geo import register_sqlite_functions
 
-engine = create_engine(settings.DATABASE_URL, echo=False)  # echo=True solo para debug
+logger = logging.getLogger(__name__)
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=False,  # echo=True solo para debug
+    **pool_options(settings.DATABASE_URL),
+)
+
+# SQLite (dev/tests) no tiene ST_Distance_Sphere: se registra haversine_m en Python
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", register_sqlite_functions)
+
+# Réplica de lectura (DATABASE_REPLICA_URL). Sin réplica, replica_engine es el primario.
+replica_engine = engine
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        echo=False,
+        **pool_options(settings.DATABASE_REPLICA_URL),
+    )
+    if replica_engine.dialect.name == "sqlite":
+        event.listen(replica_engine, "connect", register_sqlite_functions)
+
+# Read-your-writes: usuarios que escribieron hace poco leen del primario.
+# get_current_user deja el id en session.info["user_id"]; al confirmar una transacción
+# con escrituras se registra el usuario. _recent_writers es por proceso: con
+# REPLICA_STICKY_REDIS_URL la marca también se deja en Redis y la ven los demás workers.
+_recent_writers: TTLCache = TTLCache(maxsize=100_000, ttl=settings.REPLICA_STICKY_SECONDS)
+_recent_writers_lock = threading.Lock()
+
+
+class RedisRecentWriters:
+    """Marcas de escritura compartidas entre workers. Usa el paquete `redis` de requirements.txt."""
+
+    def __init__(self, url: str, prefix: str = "petlink:recent-writer:"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def mark(self, user_id: int) -> None:
+        self._redis.set(f"{self._prefix}{user_id}", 1, ex=settings.REPLICA_STICKY_SECONDS)
+
+    def is_recent(self, user_id: int) -> bool:
+        return bool(self._redis.exists(f"{self._prefix}{user_id}"))
+
+
+_shared_writers = RedisRecentWriters(settings.REPLICA_STICKY_REDIS_URL) if settings.REPLICA_STICKY_REDIS_URL else None
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _flag_flush(session: OrmSession, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(OrmSession, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state: ORMExecuteState) -> None:
+    # UPDATE/DELETE/INSERT ejecutados con session.exec() no pasan por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _remember_writer(session: OrmSession) -> None:
+    user_id = session.info.get("user_id")
+    if session.info.pop("has_writes", False) and user_id is not None:
+        with _recent_writers_lock:
+            _recent_writers[user_id] = True
+        if _shared_writers is not None:
+            try:
+                _shared_writers.mark(user_id)
+            except Exception:
+                logger.exception("Could not publish recent writer mark")
+
+
+def read_engine_for(user_id: int | None) -> Engine:
+    if replica_engine is engine or user_id is None:
+        return replica_engine
+    with _recent_writers_lock:
+        sticky = user_id in _recent_writers
+    if not sticky and _shared_writers is not None:
+        try:
+            sticky = _shared_writers.is_recent(user_id)
+        except Exception:
+            # Sin Redis no se sabe si escribió en otro worker: se lee del primario
+            logger.exception("Recent writer check failed")
+            sticky = True
+    return engine if sticky else replica_engine
+
+# Modo async (DATABASE_ASYNC): las rutas calientes usan AsyncSession sobre aiomysql/aiosqlite
+# y no ocupan un hilo del threadpool mientras esperan a la BD.
+_ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+
+def _async_url(url: str) -> URL:
+    parsed = make_url(url)
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+
+
+def _create_async_engine(url: str | URL) -> AsyncEngine:
+    async_engine = create_async_engine(url, echo=False, **pool_options(str(url), is_async=True))
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", register_sqlite_functions)
+    return async_engine
+
+
+async_engine: AsyncEngine | None = None
+async_replica_engine: AsyncEngine | None = None
+if settings.DATABASE_ASYNC:
+    async_engine = _create_async_engine(settings.ASYNC_DATABASE_URL or _async_url(settings.DATABASE_URL))
+    # La réplica también tiene su engine async: el modo async no saltea el ruteo de lecturas
+    async_replica_engine = async_engine
+    if settings.DATABASE_REPLICA_URL:
+        async_replica_engine = _create_async_engine(
+            settings.ASYNC_DATABASE_REPLICA_URL or _async_url(settings.DATABASE_REPLICA_URL)
+        )
+
+
+async def async_read_engine_for(user_id: int | None) -> AsyncEngine:
+    """Como read_engine_for, para el engine async. La consulta a Redis (si hay) va a un hilo."""
+    if _shared_writers is None:
+        read_engine = read_engine_for(user_id)
+    else:
+        read_engine = await to_thread.run_sync(read_engine_for, user_id)
+    return async_engine if read_engine is engine else async_replica_engine  # type: ignore[return-value]
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -16,3 +151,11 @@ def get_session():
         yield session
 
 SessionDep = Annotated[Session, Depends(get_session)]
+
+async def get_async_session():
+    if async_engine is None:
+        raise RuntimeError("AsyncSessionDep requiere DATABASE_ASYNC=true")
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
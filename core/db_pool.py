@@ -0,0 +1,105 @@
+import bisect
+import threading
+import time
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from core.config import settings
+
+# Límites (ms) del histograma de espera al pedir una conexión al pool
+_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _WaitHistogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(_WAIT_BUCKETS_MS) + 1)
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, elapsed_ms: float, timed_out: bool) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(_WAIT_BUCKETS_MS, elapsed_ms)] += 1
+            self._sum_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+            self.timeouts += timed_out
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = sum(self._counts)
+            return {
+                "count": total,
+                "timeouts": self.timeouts,
+                "avg_ms": round(self._sum_ms / total, 3) if total else 0.0,
+                "max_ms": round(self._max_ms, 3),
+                # Acumulado por límite, como los histogramas de Prometheus
+                "buckets_ms": {
+                    **{f"le_{bound}": sum(self._counts[: i + 1]) for i, bound in enumerate(_WAIT_BUCKETS_MS)},
+                    "le_inf": total,
+                },
+            }
+
+
+class _CheckoutTimingMixin:
+    """Mide cuánto espera cada checkout (incluye abrir conexiones nuevas y el pool_timeout)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = _WaitHistogram()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.checkout_wait.observe((time.perf_counter() - start) * 1000, timed_out)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(url: str, is_async: bool = False) -> dict:
+    """
+    kwargs de create_engine para el pool según DB_POOL_*. SQLite (dev/tests) usa el
+    pool que elige SQLAlchemy; los valores pensados para MySQL no aplican.
+    """
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        # Por debajo del wait_timeout de MySQL: no se reutilizan conexiones que el server ya cerró
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    stats: dict = {"pool_class": pool.__class__.__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+        )
+    if isinstance(pool, _CheckoutTimingMixin):
+        stats["checkout_wait"] = pool.checkout_wait.snapshot()
+    return stats
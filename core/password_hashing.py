@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from pwdlib import PasswordHash
+
+from core.config import settings
+
+# Argon2 es costoso a propósito. Se ejecuta en un pool propio y acotado para que una
+# ráfaga de logins no ocupe el threadpool de FastAPI ni bloquee el event loop.
+# argon2-cffi libera el GIL mientras calcula, así que los hilos corren en paralelo.
+password_hash = PasswordHash.recommended()
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def hash_password(password: str) -> str:
+    return password_hash.hash(password)
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), password_hash.hash, password)
+
+
+async def verify_and_update_async(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verifica la contraseña y, si el hash usa parámetros viejos de Argon2 (o otro
+    algoritmo), devuelve también el hash nuevo para guardarlo.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), password_hash.verify_and_update, password, hashed_password
+    )
@@ -0,0 +1,209 @@
+import itertools
+import json
+import threading
+import time
+from typing import Awaitable, Callable
+
+from anyio import to_thread
+from cachetools import TLRUCache, TTLCache
+from pydantic import BaseModel
+
+from core.config import settings
+
+# Cache de respuestas del feed (GET /posts/) y del detalle (GET /posts/{id}), guardadas
+# como JSON ya serializado. Invalidación:
+#   - feed: contador de generación por categoría ("*" = feeds sin filtro de categoría);
+#     un cambio en un post de la categoría X vuelve inaccesibles las claves de X y de "*"
+#   - detalle: contador de generación propio de cada post
+# En ambos casos la clave se arma antes de consultar: si el post cambia mientras tanto,
+# la entrada queda guardada con la generación vieja y nunca se lee.
+# Con réplica de lectura una entrada puede llenarse con datos con lag; POST_CACHE_TTL_SECONDS
+# acota cuánto dura, y quien acaba de escribir (lee del primario) no consulta la cache.
+#
+# Las generaciones no se acumulan: cada una vive _GENERATION_TTL desde su último incremento,
+# el doble que las entradas. Los valores salen de una secuencia global, así una generación
+# vencida (vuelve a 0) nunca coincide con la de una entrada vieja todavía viva.
+
+_ALL_CATEGORIES = "*"
+_GENERATION_TTL = 2 * settings.POST_CACHE_TTL_SECONDS
+_GENERATION_MAXSIZE = 100_000  # posts/categorías modificados dentro de _GENERATION_TTL
+
+
+class InMemoryBackend:
+    """TLRU en proceso, acotada por bytes (no por cantidad de entradas)."""
+
+    def __init__(self, max_bytes: int):
+        self._cache: TLRUCache = TLRUCache(
+            maxsize=max_bytes,
+            ttu=lambda key, value, now: now + value[0],
+            timer=time.monotonic,
+            getsizeof=lambda value: len(value[1]),
+        )
+        self._generations: TTLCache = TTLCache(maxsize=_GENERATION_MAXSIZE, ttl=_GENERATION_TTL)
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._cache.get(key)
+        return entry[1] if entry else None
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        if len(value) > self._cache.maxsize:
+            return
+        with self._lock:
+            self._cache[key] = (ttl, value)
+
+    def generation(self, name: str) -> int:
+        with self._lock:
+            return self._generations.get(name, 0)
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            self._generations[name] = next(self._sequence)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def size(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._cache), "bytes": self._cache.currsize, "max_bytes": self._cache.maxsize}
+
+
+class RedisBackend:
+    """Cache compartida entre workers. Usa el paquete `redis` de requirements.txt."""
+
+    def __init__(self, url: str, prefix: str = "petlink:post-cache:"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self._redis.get(self._prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._redis.set(self._prefix + key, value, ex=ttl)
+
+    def generation(self, name: str) -> int:
+        return int(self._redis.get(f"{self._prefix}gen:{name}") or 0)
+
+    def bump(self, name: str) -> None:
+        generation = self._redis.incr(f"{self._prefix}gen-sequence")
+        self._redis.set(f"{self._prefix}gen:{name}", generation, ex=_GENERATION_TTL)
+
+    def clear(self) -> None:
+        for key in self._redis.scan_iter(f"{self._prefix}*"):
+            self._redis.delete(key)
+
+    def size(self) -> dict:
+        return {}
+
+
+def _create_backend() -> InMemoryBackend | RedisBackend:
+    if settings.POST_CACHE_BACKEND == "redis":
+        if not settings.POST_CACHE_REDIS_URL:
+            raise RuntimeError("POST_CACHE_BACKEND=redis requiere POST_CACHE_REDIS_URL")
+        return RedisBackend(settings.POST_CACHE_REDIS_URL)
+    return InMemoryBackend(settings.POST_CACHE_MAX_BYTES)
+
+
+_backend = _create_backend()
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _count(stat: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[stat] += n
+
+
+def feed_key(filters: BaseModel) -> str:
+    # Filtros normalizados: sin valores por defecto y con las claves ordenadas, así
+    # ?category=perros&limit=10 y ?limit=10&category=perros comparten entrada
+    params = filters.model_dump(mode="json", exclude_defaults=True)
+    category = params.get("category") or _ALL_CATEGORIES
+    generation = _backend.generation(category)
+    return f"feed:{category}:{generation}:{json.dumps(params, sort_keys=True, separators=(',', ':'))}"
+
+
+def post_key(post_id: int) -> str:
+    return f"post:{post_id}:{_backend.generation(f'post:{post_id}')}"
+
+
+def lookup(key: str) -> bytes | None:
+    if not settings.POST_CACHE_ENABLED:
+        return None
+    body = _backend.get(key)
+    _count("hits" if body is not None else "misses")
+    return body
+
+
+def store(key: str, response: BaseModel) -> bytes:
+    body = response.model_dump_json().encode()
+    if settings.POST_CACHE_ENABLED:
+        _backend.set(key, body, settings.POST_CACHE_TTL_SECONDS)
+    return body
+
+
+def _cached(key: str, compute: Callable[[], BaseModel], fresh: bool) -> bytes:
+    # fresh: el llamador necesita ver sus propias escrituras; lo que calcula viene del
+    # primario y sí se guarda
+    body = None if fresh else lookup(key)
+    return body if body is not None else store(key, compute())
+
+
+def cached_feed(filters: BaseModel, compute: Callable[[], BaseModel], fresh: bool = False) -> bytes:
+    return _cached(feed_key(filters), compute, fresh)
+
+
+def cached_post(post_id: int, compute: Callable[[], BaseModel], fresh: bool = False) -> bytes:
+    return _cached(post_key(post_id), compute, fresh)
+
+
+async def _off_loop(function: Callable, *args):
+    # RedisBackend usa el cliente sync: desde el event loop sus llamadas van a un hilo
+    if isinstance(_backend, RedisBackend):
+        return await to_thread.run_sync(function, *args)
+    return function(*args)
+
+
+async def cached_feed_async(
+    filters: BaseModel, compute: Callable[[], Awaitable[BaseModel]], fresh: bool = False
+) -> bytes:
+    """cached_feed para handlers async (DATABASE_ASYNC)."""
+    key = await _off_loop(feed_key, filters)
+    body = None if fresh else await _off_loop(lookup, key)
+    if body is None:
+        body = await _off_loop(store, key, await compute())
+    return body
+
+
+def invalidate_post(post_id: int | None, *categories: str | None) -> None:
+    """Llamar después del commit de cualquier cambio que altere un post o sus likes."""
+    if not settings.POST_CACHE_ENABLED:
+        return
+    if post_id is not None:
+        _backend.bump(f"post:{post_id}")
+    _backend.bump(_ALL_CATEGORIES)
+    for category in {c for c in categories if c}:
+        _backend.bump(category)
+    _count("invalidations")
+
+
+def clear() -> None:
+    _backend.clear()
+
+
+def stats() -> dict:
+    with _stats_lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "enabled": settings.POST_CACHE_ENABLED,
+            "backend": settings.POST_CACHE_BACKEND,
+            "ttl_seconds": settings.POST_CACHE_TTL_SECONDS,
+            **_stats,
+            "hit_ratio": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+            **_backend.size(),
+        }
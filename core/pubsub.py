@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub para eventos en tiempo real (mensajes de chat por WebSocket).
+# CHAT_BROKER_BACKEND:
+#   "memory": solo entrega a los sockets conectados a este worker
+#   "redis":  publica en Redis (CHAT_BROKER_URL) y cada worker reparte a sus sockets
+
+
+class InMemoryBroker:
+    def __init__(self, queue_size: int = 100):
+        self._queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+
+    async def publish(self, channel: str, message: dict) -> None:
+        self._deliver(channel, message)
+
+    def _deliver(self, channel: str, message: dict) -> None:
+        for queue in list(self._subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Cliente lento: se descarta el evento; puede recuperarlo con GET /chats/{id}?after_id=
+                logger.warning("Dropping event for slow subscriber on %s", channel)
+
+    def publish_threadsafe(self, channel: str, message: dict) -> None:
+        """Publica desde código sync (endpoints en el threadpool) sin esperar la entrega."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # broker no iniciado (scripts, outbox_worker): no hay sockets que notificar
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(self.publish(channel, message))
+        else:
+            asyncio.run_coroutine_threadsafe(self.publish(channel, message), loop)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers[channel].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[channel].discard(queue)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+
+class RedisBroker(InMemoryBroker):
+    """
+    Reparte eventos entre workers/instancias con Redis pub/sub. Cada worker mantiene
+    una única suscripción por patrón y entrega localmente a sus sockets.
+    Usa el paquete `redis` de requirements.txt (cliente redis.asyncio).
+    """
+
+    # Si se corta la conexión, el lector se vuelve a suscribir con backoff exponencial.
+    # Los eventos publicados durante el corte se pierden; el cliente los recupera con after_id.
+    RECONNECT_MIN_SECONDS = 0.5
+    RECONNECT_MAX_SECONDS = 30.0
+
+    def __init__(self, url: str, prefix: str = "petlink:", queue_size: int = 100):
+        super().__init__(queue_size)
+        self._url = url
+        self._prefix = prefix
+        self._redis = None
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        import redis.asyncio as redis
+
+        await super().start()
+        self._redis = redis.from_url(self._url)
+        await self._subscribe()  # sin Redis al arrancar, falla el arranque
+        self._reader = asyncio.create_task(self._read_forever())
+
+    async def stop(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        await self._close_pubsub()
+        if self._redis:
+            await self._redis.aclose()
+        await super().stop()
+
+    async def _subscribe(self) -> None:
+        self._pubsub = self._redis.pubsub()  # type: ignore[union-attr]
+        await self._pubsub.psubscribe(f"{self._prefix}*")
+
+    async def _close_pubsub(self) -> None:
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.aclose()
+        except Exception:
+            logger.debug("Error closing Redis pub/sub", exc_info=True)
+        self._pubsub = None
+
+    async def _read_forever(self) -> None:
+        delay = self.RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                    logger.info("Redis pub/sub reconnected")
+                delay = self.RECONNECT_MIN_SECONDS
+                await self._read()
+                logger.warning("Redis pub/sub stream ended; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis pub/sub reader failed; reconnecting in %.1fs", delay)
+            await self._close_pubsub()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_SECONDS)
+
+    async def _read(self) -> None:
+        async for event in self._pubsub.listen():  # type: ignore[union-attr]
+            if event["type"] != "pmessage":
+                continue
+            channel = event["channel"].decode()[len(self._prefix):]
+            self._deliver(channel, json.loads(event["data"]))
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self._redis.publish(f"{self._prefix}{channel}", json.dumps(message, default=str))  # type: ignore[union-attr]
+
+
+def _create_broker() -> InMemoryBroker:
+    if settings.CHAT_BROKER_BACKEND == "redis":
+        if not settings.CHAT_BROKER_URL:
+            raise RuntimeError("CHAT_BROKER_BACKEND=redis requiere CHAT_BROKER_URL")
+        return RedisBroker(settings.CHAT_BROKER_URL)
+    return InMemoryBroker()
+
+
+broker = _create_broker()
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
@@ -1,79 +1,116 @@
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
 import jwt
-from datetime import datetime
+import time
 
 from sqlmodel import select
+from sqlalchemy.orm import make_transient_to_detached
 from models import User, TokensBlacklist, ActiveToken
-from core.database import SessionDep
+from core.database import SessionDep, AsyncSessionDep
 from core.config import settings
+from core import auth_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(session: SessionDep, token: str = Depends(oauth2_scheme)):
-    
+
+def _detached_cached_user(snapshot: dict) -> User:
+    # Reconstruye el usuario desde el snapshot sin tocar la BD. Queda fuera de la sesión:
+    # si entrara al identity map, un session.get(User, id) posterior en el mismo request
+    # devolvería el snapshot (p. ej. un help_count viejo) en vez de consultar.
+    # Solo sirve para columnas (id, role_id, ...); las relaciones hay que cargarlas aparte.
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+def _decode_token(token: str) -> dict:
     try:
-        
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        jti = payload.get("jti")
-        
-        #Checks if token has jti
-        if jti is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-            )
-        
-
-        #checks if token is not invalidated
-        blacklisted =  session.exec(
-            select(TokensBlacklist).where(TokensBlacklist.jti == jti)).first()
-
-        if blacklisted:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-            )
-        
-
-        #Checks if the token is active
-        active_token = session.exec(
-            select(ActiveToken).where(ActiveToken.jti == jti)
-        ).first()
-
-        if not active_token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token no activo o sesión finalizada",
-            )
-
-
-        #checks if token has user_id
-        user_id = payload.get("user_id")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-            )
-        
     except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expirado",
-        )
+        raise _unauthorized("Token expirado")
     except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido",
-        )
-    
-    user = session.get(User, user_id)
+        raise _unauthorized("Token inválido")
+
+    #Checks if token has jti
+    if payload.get("jti") is None:
+        raise _unauthorized("Token inválido")
+    return payload
+
+
+def _blacklisted_query(jti: str):
+    return select(TokensBlacklist.id).where(TokensBlacklist.jti == jti)
+
+
+def _active_token_query(jti: str):
+    return select(ActiveToken.user_id).where(ActiveToken.jti == jti)
+
+
+def _token_user_id(payload: dict, blacklisted: bool, active: bool) -> int:
+    #checks if token is not invalidated
+    if blacklisted:
+        raise _unauthorized("Token inválido")
+
+    #Checks if the token is active
+    if not active:
+        raise _unauthorized("Token no activo o sesión finalizada")
+
+    #checks if token has user_id
+    user_id = payload.get("user_id")
+    if user_id is None:
+        raise _unauthorized("Token inválido")
+    return user_id
+
+
+def _remember_user(session, user: User | None, payload: dict, validated_at: float) -> User:
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario no encontrado",
-        )
-    
+        raise _unauthorized("Usuario no encontrado")
+
+    session.info["user_id"] = user.id  # read-your-writes (core.database)
+    auth_cache.put(payload["jti"], user.model_dump(), expires_at=payload["exp"], validated_at=validated_at)
     return user
 
 
+def get_current_user(session: SessionDep, token: str = Depends(oauth2_scheme)):
+    validated_at = time.time()  # antes de consultar: un desalojo concurrente invalida esta entrada
+    payload = _decode_token(token)
+    jti = payload["jti"]
+
+    #Token ya validado recientemente: evita las consultas a blacklist, active_tokens y users
+    cached_user = auth_cache.get(jti)
+    if cached_user is not None:
+        session.info["user_id"] = cached_user["id"]  # read-your-writes (core.database)
+        return _detached_cached_user(cached_user)
+
+    user_id = _token_user_id(
+        payload,
+        blacklisted=session.exec(_blacklisted_query(jti)).first() is not None,
+        active=session.exec(_active_token_query(jti)).first() is not None,
+    )
+    return _remember_user(session, session.get(User, user_id), payload, validated_at)
+
+
+async def get_current_user_async(session: AsyncSessionDep, token: str = Depends(oauth2_scheme)) -> User:
+    # Mismas validaciones que get_current_user; las consultas se esperan sobre el driver async
+    validated_at = time.time()
+    payload = _decode_token(token)
+    jti = payload["jti"]
+
+    cached_user = await auth_cache.get_async(jti)
+    if cached_user is not None:
+        session.info["user_id"] = cached_user["id"]  # read-your-writes (core.database)
+        return _detached_cached_user(cached_user)
+
+    user_id = _token_user_id(
+        payload,
+        blacklisted=(await session.exec(_blacklisted_query(jti))).first() is not None,
+        active=(await session.exec(_active_token_query(jti))).first() is not None,
+    )
+    user = _remember_user(session, await session.get(User, user_id), payload, validated_at)
+    # Devuelve la conexión al pool (expire_on_commit=False: el user queda cargado); si no, la
+    # sesión de lectura del feed espera una segunda conexión y con carga el pool se agota
+    await session.commit()
+    return user
@@ -0,0 +1,32 @@
+from typing import Annotated
+from fastapi import Depends
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core import database
+from dependencies.auth_dependencies import get_current_user, get_current_user_async
+from models import User
+
+
+def get_read_session(current_user: User = Depends(get_current_user)):
+    """
+    Sesión para endpoints de solo lectura: va a la réplica (DATABASE_REPLICA_URL),
+    salvo que el usuario haya escrito hace menos de REPLICA_STICKY_SECONDS.
+    En ese caso session.info["read_your_writes"] queda en True y core.post_cache no se consulta.
+    """
+    read_engine = database.read_engine_for(current_user.id)
+    with Session(read_engine) as session:
+        session.info["read_your_writes"] = read_engine is not database.replica_engine
+        yield session
+
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+
+
+async def get_async_read_session(current_user: User = Depends(get_current_user_async)):
+    """get_read_session sobre el driver async (DATABASE_ASYNC), con el mismo ruteo a la réplica."""
+    read_engine = await database.async_read_engine_for(current_user.id)
+    async with AsyncSession(read_engine, expire_on_commit=False) as session:
+        session.info["read_your_writes"] = read_engine is not database.async_replica_engine
+        yield session
+
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_session)]
@@ -23,4 +23,9 @@ class ChatAlreadyExistsException(Exception):
     pass
 
 class ChatClosedException(Exception):
-    pass
\ No newline at end of file
+    pass
+class InvalidCursorException(Exception):
+    pass
+
+class PushDeliveryError(Exception):
+    pass
@@ -1,10 +1,18 @@
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from sqlmodel import Session, text
 from dependencies.auth_dependencies import oauth2_scheme
 from fastapi.middleware.cors import CORSMiddleware
-from controllers import auth_controller, post_controller, report_controller, users_controller, chats_controller, notifications_controller
+from controllers import auth_controller, post_controller, report_controller, users_controller, chats_controller, notifications_controller, admin_controller
 from core import database
+from core.pubsub import broker
+from core import password_hashing
+from core.compression import CompressionMiddleware
+from services import push_notification_service, leaderboard_service
+from utils import media_storage, image_processing
+from core.config import settings
+from fastapi.staticfiles import StaticFiles
 from models.seed import admingen
 from core.database import engine
 
@@ -26,12 +34,32 @@ async def lifespan(app: FastAPI):
         print(f"❌ Error conectando a la base de datos: {e}")
         raise e
 
+    # Ranking materializado: se arma desde users si la tabla está vacía
+    with Session(engine) as session:
+        leaderboard_service.rebuild_if_empty(session)
+
+    await broker.start()
     yield
     # Shutdown: runs when the app shuts down (optional cleanup)
     # e.g., close database connections, etc.
+    await broker.stop()
+    await push_notification_service.close_client()
+    await media_storage.close_storage()
+    image_processing.shutdown_pool()
+    password_hashing.shutdown_executor()
 
 app = FastAPI(lifespan=lifespan)
 
+# Se registra antes que CORS: add_middleware apila hacia afuera, así CORS queda como capa
+# externa (responde los preflight sin pasar por acá) y la compresión envuelve a la app
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 #CORS
 origins = [
     "*",
@@ -52,3 +80,9 @@ app.include_router(post_controller.router)
 app.include_router(report_controller.router)
 app.include_router(chats_controller.router)
 app.include_router(notifications_controller.router)
+app.include_router(admin_controller.router)
+
+# Con almacenamiento local los archivos se sirven desde la propia API
+if settings.MEDIA_STORAGE_BACKEND == "local":
+    os.makedirs(settings.MEDIA_LOCAL_DIR, exist_ok=True)
+    app.mount("/media", StaticFiles(directory=settings.MEDIA_LOCAL_DIR), name="media")
@@ -0,0 +1,55 @@
+-- Cambios de esquema para bases existentes (MySQL). Las bases nuevas los reciben con
+-- database.create_db_and_tables(). Correr antes de desplegar la versión que los usa.
+
+-- Outbox de notificaciones push (services/outbox_service.py, outbox_worker.py)
+CREATE TABLE notification_outbox (
+	created_at DATETIME NOT NULL,
+	updated_at DATETIME,
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	kind VARCHAR(50) NOT NULL,
+	payload TEXT,
+	attempts INTEGER NOT NULL,
+	available_at DATETIME NOT NULL,
+	locked_until DATETIME,
+	processed_at DATETIME,
+	last_error VARCHAR(500),
+	PRIMARY KEY (id)
+);
+CREATE INDEX idx_outbox_pending ON notification_outbox (processed_at, available_at);
+
+-- Cursores de lectura y no leídos por chat
+CREATE TABLE chat_read_cursors (
+	chat_id INTEGER NOT NULL,
+	user_id INTEGER NOT NULL,
+	last_read_message_id INTEGER,
+	unread_count INTEGER NOT NULL,
+	PRIMARY KEY (chat_id, user_id),
+	FOREIGN KEY(chat_id) REFERENCES chats (id) ON DELETE CASCADE,
+	FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE INDEX idx_read_cursor_unread ON chat_read_cursors (user_id, unread_count);
+-- Backfill: una fila por participante de cada chat existente, leído hasta su último mensaje
+INSERT IGNORE INTO chat_read_cursors (chat_id, user_id, last_read_message_id, unread_count)
+SELECT c.id, c.initiator_id, (SELECT MAX(m.id) FROM chat_messages m WHERE m.chat_id = c.id), 0 FROM chats c
+UNION ALL
+SELECT c.id, c.receiver_id, (SELECT MAX(m.id) FROM chat_messages m WHERE m.chat_id = c.id), 0 FROM chats c;
+
+-- Ranking materializado. Se llena desde users al arrancar (leaderboard_service.rebuild_if_empty).
+CREATE TABLE help_count_buckets (
+	help_count INTEGER NOT NULL,
+	users INTEGER NOT NULL,
+	PRIMARY KEY (help_count)
+);
+CREATE INDEX ix_users_help_count ON users (help_count);
+
+-- Variantes WebP de imágenes (utils/image_processing.py)
+ALTER TABLE post_multimedia
+	ADD COLUMN thumb_url TEXT,
+	ADD COLUMN medium_url TEXT,
+	ADD COLUMN full_url TEXT;
+
+-- Índices de consultas
+CREATE INDEX idx_initiator_updated ON chats (initiator_id, updated_at);
+CREATE INDEX idx_receiver_updated ON chats (receiver_id, updated_at);
+CREATE INDEX idx_sub_type_category ON notification_subscriptions (post_type_id, category, user_id);
+CREATE FULLTEXT INDEX ft_title_message ON posts (title, message);
@@ -10,17 +10,20 @@ from .post.like import Like
 from .post.report import Report
 from .chat.chat import Chat
 from .chat.chat_message import ChatMessage
+from .chat.chat_read_cursor import ChatReadCursor
 from .agreement.agreement import Agreement
 from .user.active_tokens import ActiveToken
+from .user.help_count_bucket import HelpCountBucket
 from .notification.push_token import UserPushToken
 from .notification.subscription import NotificationSubscription
+from .notification.outbox import NotificationOutbox
 from .enums import AgreementStatusEnum, PostTypeEnum, StatusUserEnum, RoleEnum
 
 __all__ = [
     "Role", "StatusUser", "PostType", "StatusAgreement",
     "User", "UserProfiles", "TokensBlacklist",
     "Post", "PostMultimedia", "Like", "Report",
-    "Chat", "ChatMessage", "Agreement", "ActiveToken",
-    "UserPushToken", "NotificationSubscription",
+    "Chat", "ChatMessage", "ChatReadCursor", "Agreement", "ActiveToken", "HelpCountBucket",
+    "UserPushToken", "NotificationSubscription", "NotificationOutbox",
     "AgreementStatusEnum", "PostTypeEnum", "StatusUserEnum", "RoleEnum",
 ]
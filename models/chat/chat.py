@@ -27,7 +27,6 @@ class Chat(SQLModel, TimestampMixin, table=True):
         back_populates="initiated_chats",
         sa_relationship_kwargs={
             "foreign_keys": "Chat.initiator_id",   # ← CLAVE
-            "lazy": "joined"
         }
     )
 
@@ -35,7 +34,6 @@ class Chat(SQLModel, TimestampMixin, table=True):
         back_populates="received_chats",
         sa_relationship_kwargs={
             "foreign_keys": "Chat.receiver_id",    # ← CLAVE
-            "lazy": "joined"
         }
     )
     messages: List["ChatMessage"] = Relationship(back_populates="chat")
@@ -43,4 +41,7 @@ class Chat(SQLModel, TimestampMixin, table=True):
     # Solo este si querés estar paranoico con la unicidad
     __table_args__ = (
         Index("uq_post_initiator", "post_id", "initiator_id", unique=True),
+        # Bandeja de chats: WHERE initiator_id/receiver_id = ? ORDER BY updated_at DESC
+        Index("idx_initiator_updated", "initiator_id", "updated_at"),
+        Index("idx_receiver_updated", "receiver_id", "updated_at"),
     )
@@ -0,0 +1,18 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field, Index
+
+
+class ChatReadCursor(SQLModel, table=True):
+    """
+    Estado de lectura de cada participante de un chat. unread_count se mantiene
+    en send_message y se pone en 0 al marcar el chat como leído.
+    """
+    __tablename__: str = "chat_read_cursors"
+
+    chat_id: int = Field(foreign_key="chats.id", primary_key=True, ondelete="CASCADE")
+    user_id: int = Field(foreign_key="users.id", primary_key=True, ondelete="CASCADE")
+    last_read_message_id: Optional[int] = Field(default=None)
+    unread_count: int = Field(default=0)
+
+    # Badge de chats sin leer: WHERE user_id = ? AND unread_count > 0
+    __table_args__ = (Index("idx_read_cursor_unread", "user_id", "unread_count"),)
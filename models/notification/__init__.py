@@ -1,4 +1,5 @@
 from .push_token import UserPushToken
 from .subscription import NotificationSubscription
+from .outbox import NotificationOutbox
 
-__all__ = ["UserPushToken", "NotificationSubscription"]
+__all__ = ["UserPushToken", "NotificationSubscription", "NotificationOutbox"]
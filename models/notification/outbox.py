@@ -0,0 +1,26 @@
+from typing import Optional
+from datetime import datetime, timezone
+from sqlmodel import SQLModel, Field, Column, TEXT, Index
+
+from ..base import TimestampMixin
+
+
+class NotificationOutbox(SQLModel, TimestampMixin, table=True):
+    """
+    Notificaciones pendientes de enviar. Se insertan en la misma transacción que el
+    post o mensaje que las origina y las procesa outbox_worker.py (at-least-once).
+    """
+    __tablename__ = "notification_outbox"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(max_length=50)
+    payload: str = Field(sa_column=Column(TEXT))  # JSON con los argumentos del handler
+    attempts: int = Field(default=0)
+    available_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
+    locked_until: Optional[datetime] = Field(default=None)
+    processed_at: Optional[datetime] = Field(default=None)
+    last_error: Optional[str] = Field(default=None, max_length=500)
+
+    __table_args__ = (
+        Index("idx_outbox_pending", "processed_at", "available_at"),
+    )
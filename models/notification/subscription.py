@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlmodel import SQLModel, Field, UniqueConstraint
+from sqlmodel import SQLModel, Field, UniqueConstraint, Index
 
 
 class NotificationSubscription(SQLModel, table=True):
@@ -12,4 +12,6 @@ class NotificationSubscription(SQLModel, table=True):
 
     __table_args__ = (
         UniqueConstraint("user_id", "post_type_id", "category", name="uq_sub"),
+        # Búsqueda de suscriptores al publicar un post (notify_post_subscribers)
+        Index("idx_sub_type_category", "post_type_id", "category", "user_id"),
     )
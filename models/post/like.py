@@ -15,4 +15,8 @@ class Like(SQLModel, TimestampMixin, table=True):
     post: Optional["Post"] = Relationship(back_populates="likes")
     user: Optional["User"] = Relationship(back_populates="likes")
 
-    __table_args__ = (Index('uq_user_post_like', 'user_id', 'post_id', unique=True),)
+    __table_args__ = (
+        Index('uq_user_post_like', 'user_id', 'post_id', unique=True),
+        # likes_count por post (subconsulta COUNT); MySQL ya tiene el índice implícito de la FK
+        Index('idx_like_post', 'post_id'),
+    )
@@ -44,4 +44,6 @@ class Post(SQLModel, TimestampMixin, table=True):
         Index('idx_type_date', 'post_type_id', 'created_at'),
         Index('idx_active_type_date', 'is_active', 'post_type_id', 'created_at'),
         Index('idx_coordinates', 'latitude', 'longitude'),
+        # Búsqueda por palabra clave (utils/search.py); en otros motores queda como índice común
+        Index('ft_title_message', 'title', 'message', mysql_prefix='FULLTEXT'),
     )
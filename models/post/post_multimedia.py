@@ -10,6 +10,10 @@ class PostMultimedia(SQLModel, TimestampMixin, table=True):
     id: int | None = Field(default=None, primary_key=True)
     post_id: int = Field(foreign_key="posts.id", ondelete="CASCADE")
     url: str = Field(sa_column=Column(TEXT))
+    # Variantes WebP redimensionadas (solo imágenes); url sigue siendo el original
+    thumb_url: str | None = Field(default=None, sa_column=Column(TEXT))
+    medium_url: str | None = Field(default=None, sa_column=Column(TEXT))
+    full_url: str | None = Field(default=None, sa_column=Column(TEXT))
 
     post: Optional["Post"] = Relationship(back_populates="multimedia")
 
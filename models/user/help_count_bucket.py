@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+
+
+class HelpCountBucket(SQLModel, table=True):
+    """
+    Ranking materializado: cuántos usuarios tienen cada help_count (> 0).
+    El puesto de un usuario es 1 + usuarios en buckets con help_count mayor,
+    así los empates comparten puesto (1, 2, 2, 4...).
+    """
+    __tablename__: str = "help_count_buckets"
+
+    help_count: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})  # es el valor, no un id
+    users: int = Field(default=0)
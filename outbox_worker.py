@@ -0,0 +1,80 @@
+# outbox_worker.py
+# Procesa la tabla notification_outbox fuera de los workers de la API:
+#   python outbox_worker.py
+import asyncio
+import logging
+
+from anyio import to_thread
+from sqlmodel import Session
+
+from core.config import settings
+from core.database import engine
+from services import outbox_service, push_notification_service
+from services.outbox_service import OutboxJob
+
+logger = logging.getLogger("outbox_worker")
+
+HANDLERS = {
+    outbox_service.NEW_POST: push_notification_service.notify_post_subscribers,
+    outbox_service.CHAT_MESSAGE: push_notification_service.notify_chat_recipient,
+}
+
+
+def _claim() -> list[OutboxJob]:
+    with Session(engine) as session:
+        return outbox_service.claim_batch(session, settings.OUTBOX_BATCH_SIZE)
+
+
+def _record(done: list[int], failed: list[tuple[OutboxJob, str]]) -> None:
+    with Session(engine) as session:
+        outbox_service.mark_processed(session, done)
+        for job, error in failed:
+            outbox_service.mark_failed(session, job, error)
+
+
+async def run_once() -> int:
+    """Procesa un lote; devuelve la cantidad de notificaciones tomadas."""
+    jobs = await to_thread.run_sync(_claim)
+    if not jobs:
+        return 0
+
+    semaphore = asyncio.Semaphore(settings.OUTBOX_PARALLELISM)
+
+    async def deliver(job: OutboxJob) -> str | None:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            return f"Tipo de notificación desconocido: {job.kind}"
+        async with semaphore:
+            try:
+                await handler(**job.payload)
+            except Exception as exc:
+                logger.exception("Outbox job %s failed", job.id)
+                return str(exc) or exc.__class__.__name__
+        return None
+
+    errors = await asyncio.gather(*(deliver(job) for job in jobs))
+
+    done = [job.id for job, error in zip(jobs, errors) if error is None]
+    failed = [(job, error) for job, error in zip(jobs, errors) if error is not None]
+    await to_thread.run_sync(_record, done, failed)
+    return len(jobs)
+
+
+async def main() -> None:
+    logger.info("Outbox worker started")
+    try:
+        while True:
+            try:
+                processed = await run_once()
+            except Exception:
+                logger.exception("Outbox batch failed")
+                processed = 0
+            if processed < settings.OUTBOX_BATCH_SIZE:
+                await asyncio.sleep(settings.OUTBOX_POLL_SECONDS)
+    finally:
+        await push_notification_service.close_client()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,7 +1,7 @@
-from .post_schemas import PostCreate, PostRead, PostPatch, PostFilters
+from .post_schemas import PostCreate, PostRead, PostPatch, PostFilters, PostFeedRead
 from .user_schemas import UserPatch, UserCreate, UserRead
 from .report_schemas import ReportCreate, ReportRead
 
-__all__ = ["PostCreate", "PostRead", "PostPatch", "PostFilters",
+__all__ = ["PostCreate", "PostRead", "PostPatch", "PostFilters", "PostFeedRead",
            "UserPatch", "UserCreate", "UserRead",
            "ReportCreate", "ReportRead"]
\ No newline at end of file
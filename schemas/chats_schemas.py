@@ -77,6 +77,12 @@ class ChatRead(ChatBase):
 class ChatReadWithUser(ChatRead):
     initiator: Optional[UserRead] = None
     receiver: Optional[UserRead] = None
+
+    # Vista previa del último mensaje para la bandeja (GET /chats/me)
+    last_message: Optional[str] = None
+    last_message_at: Optional[datetime] = None
+    last_message_sender_id: Optional[int] = None
+    unread_count: int = 0
 # ------------------------------------------------------------------
 # 4. Chat completo (con post, usuarios y mensajes) → para el detalle
 # ------------------------------------------------------------------
@@ -88,6 +94,8 @@ class ChatDetailRead(ChatRead):
     receiver_username: Optional[str] = None
 
     messages: List["ChatMessageRead"] = []
+    # True si hay más mensajes en la dirección pedida (ver get_chat_detail)
+    has_more: bool = False
 
     model_config = {"from_attributes": True}
 
@@ -115,6 +123,26 @@ class ChatMessageRead(ChatMessageBase):
     model_config = {"from_attributes": True}
 
 
+# ------------------------------------------------------------------
+# Estado de lectura
+# ------------------------------------------------------------------
+class ChatMarkRead(BaseModel):
+    # Último mensaje visto; None = hasta el último mensaje del chat
+    message_id: Optional[int] = PydanticField(default=None, gt=0)
+
+
+class ChatReadState(BaseModel):
+    chat_id: int
+    last_read_message_id: Optional[int] = None
+    unread_count: int
+
+    model_config = {"from_attributes": True}
+
+
+class ChatUnreadSummary(BaseModel):
+    unread_chats: int
+
+
 # ------------------------------------------------------------------
 # Filtro para listar chats del usuario logueado
 # ------------------------------------------------------------------
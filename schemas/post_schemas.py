@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import Literal, Optional
-from pydantic import BaseModel, HttpUrl, computed_field
-from sqlmodel import Field
+from pydantic import BaseModel, HttpUrl
 
 
 class PostBase(BaseModel):
@@ -21,6 +20,10 @@ class PostMultimediaInput(BaseModel):
 class PostMultimediaRead(BaseModel):
     id: int
     url: HttpUrl
+    # Variantes redimensionadas en WebP; el feed debería usar thumb_url/medium_url
+    thumb_url: HttpUrl | None = None
+    medium_url: HttpUrl | None = None
+    full_url: HttpUrl | None = None
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
@@ -60,14 +63,12 @@ class PostRead(PostBase):
     updated_at: datetime | None
     deleted_at: datetime | None
     multimedia: list[PostMultimediaRead]
-    likes: list[LikeRead] = Field(default=[], exclude=True)
 
     # Expuesto explícitamente para los clientes que aún leen city_name
     city_name: str = "Sin ubicación"
 
-    @computed_field
-    def likes_count(self) -> int:
-        return len(self.likes)
+    # Se calcula en SQL (ver post_service._likes_count_expr); nunca se cargan los Like
+    likes_count: int = 0
 
     model_config = {"from_attributes": True}
 
@@ -79,6 +80,8 @@ class PostFilters(BaseModel):
     keyword: str | None = None
     skip: int = 0
     limit: int = 10
+    # Cursor opaco devuelto en next_cursor; si se envía, se ignora skip
+    cursor: str | None = None
     most_liked: bool = False  # kept for backward compat — prefer sort_by
     sort_by: Literal['newest', 'most_liked', 'closest'] = 'newest'
     show_only_active: bool | None = None
@@ -86,3 +89,9 @@ class PostFilters(BaseModel):
     lat: float | None = None
     lon: float | None = None
     radius_km: float = 20.0
+
+
+class PostFeedRead(BaseModel):
+    posts: list[PostRead]
+    limit_reached: bool
+    next_cursor: str | None = None
@@ -62,3 +62,9 @@ class UserPatch(BaseModel):
         except EmailNotValidError as e:
             raise ValueError(str(e))
 
+
+class LeaderboardEntry(BaseModel):
+    user_id: int
+    username: str
+    help_count: int
+    rank: int
@@ -1,19 +1,19 @@
 import uuid
 import jwt
-from pwdlib import PasswordHash
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 from datetime import datetime, timedelta, timezone
 
 from exceptions import SessionAlreadyClosed
 from models import TokensBlacklist, User, ActiveToken
 from core.config import settings
+from core import auth_cache
+from core.password_hashing import hash_password, hash_password_async, verify_and_update_async
 from schemas.auth_schemas import *
 from schemas.user_schemas import UserCreate
 
 
-password_hash = PasswordHash.recommended()
-
 #Use this when you have the token to invalidate (example: user self-logout)
 def invalidate_token(session: Session, token: str) -> TokensBlacklist:
     decoded_token = decode_token(token)
@@ -38,6 +38,7 @@ def invalidate_token(session: Session, token: str) -> TokensBlacklist:
 
     session.add(disabled_token)
     session.commit()
+    auth_cache.evict_token(disabled_token.jti)
     return disabled_token
 
 #Use this when you dont have the token to to invalidate (example: user deleted by admin)
@@ -55,7 +56,8 @@ def terminate_active_session(session: Session, user_id: int):
     
     session.add(token_for_blacklist)
     session.delete(active_session)
-    session.commit
+    session.commit()
+    auth_cache.evict_user(user_id)
 
     return True
 
@@ -64,10 +66,7 @@ def _add_active_session(session: Session, user_id: int, jti, expires_at):
     session.commit()
 
 def encrypt_password(password: str) -> str:
-    return password_hash.hash(password)
-
-def verify_password(password: str, hashed_password: str) -> bool:
-    return password_hash.verify(password, hashed_password)
+    return hash_password(password)
 
 
 #Funciones referenciadas desde endpoints:
@@ -93,42 +92,46 @@ def create_token(session: Session, data: dict, expires_delta: timedelta | None =
 def decode_token(token: str):
     return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
 
-def register_user(user_data: UserCreate, session: Session) -> User:
-    new_user = User(
-        email= user_data.email, 
-        password_hash = encrypt_password(user_data.password)
-        )
-    
+def _ensure_email_available(session: Session, email: str) -> None:
     user_already_exists = session.exec(
-        select(User).where((User.email == new_user.email))
+        select(User).where((User.email == email))
     ).first()
-    
+
     if user_already_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username or email already exists"
         )
-    
-    session.add(new_user)
+
+def _insert_user(session: Session, user: User) -> User:
+    session.add(user)
     session.commit()
-    session.refresh(new_user)
+    session.refresh(user)
+    return user
 
-    return new_user
+# Los pasos de BD corren en el threadpool y el hash en el pool de Argon2 (core.password_hashing)
+async def register_user(user_data: UserCreate, session: Session) -> User:
+    # Primero el chequeo barato: un email repetido no consume un hash
+    await run_in_threadpool(_ensure_email_available, session, user_data.email)
 
-def login(form_data: LoginData, session: Session) -> Token:
+    new_user = User(
+        email= user_data.email, 
+        password_hash = await hash_password_async(user_data.password)
+        )
 
+    return await run_in_threadpool(_insert_user, session, new_user)
 
-    user: User | None = session.exec(
-        select(User).where(User.email == form_data.email)
+def _get_user_by_email(session: Session, email: str) -> User | None:
+    return session.exec(
+        select(User).where(User.email == email)
     ).first()
 
-
-    if not user or not verify_password(form_data.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+def _start_session(session: Session, user: User, new_password_hash: str | None) -> Token:
+    # Rehash transparente si cambiaron los parámetros de Argon2
+    if new_password_hash:
+        user.password_hash = new_password_hash
+        session.add(user)
+        session.commit()
 
     assert user.id is not None
     active_session = terminate_active_session(session, user.id)
@@ -151,6 +154,23 @@ def login(form_data: LoginData, session: Session) -> Token:
     expires_at = datetime.now(timezone.utc) + access_token_expires
 
     return Token(access_token=access_token, user_id = user.id, expires_at = int(expires_at.timestamp() * 1000),)
+
+async def login(form_data: LoginData, session: Session) -> Token:
+
+    user = await run_in_threadpool(_get_user_by_email, session, form_data.email)
+
+    valid, new_password_hash = (
+        await verify_and_update_async(form_data.password, user.password_hash) if user else (False, None)
+    )
+
+    if not user or not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return await run_in_threadpool(_start_session, session, user, new_password_hash)
       
 def logout(token: str, session: Session):
     
@@ -1,11 +1,16 @@
 # services/chat_service.py
 from typing import List
-from sqlmodel import Session, select, or_, desc, asc  # ← ESTOS SON LOS IMPORTS QUE FALTABAN
+from sqlmodel import Session, select, or_, desc
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone
 
 # Modelos
 from models.chat.chat import Chat
 from models.chat.chat_message import ChatMessage
+from models.chat.chat_read_cursor import ChatReadCursor
 from models.post.post import Post
 from models.user.user import User, UserProfiles
 
@@ -16,28 +21,21 @@ from exceptions.exceptions import (
     ChatAlreadyExistsException,
     ChatClosedException,
     NotOwnerError,
+    InvalidCursorException,
 )
 
 # Schemas y enums
-from schemas.chats_schemas import ChatDetailRead, ChatFilters, ChatMessageRead
+from schemas.chats_schemas import (
+    ChatDetailRead, ChatFilters, ChatMessageRead, ChatReadWithUser, ChatReadState
+)
+from schemas.user_schemas import UserRead, UserInfoRead
 from models.enums import AgreementStatusEnum
+from services import outbox_service, leaderboard_service
+from core.pubsub import broker, user_channel
+from core import post_cache
+from utils.pagination import keyset_condition
 
 
-def get_display_name(user: User | None) -> str:
-    """
-    Devuelve el nombre visible del usuario:
-    - Si tiene username → username
-    - Si no → el email completo (nico@gmail.com)
-    - Si no hay nada → "Usuario desconocido"
-    """
-    if not user:
-        return "Usuario desconocido"
-    
-    if user.user_info and user.user_info.username:
-        return user.user_info.username
-    
-    return user.email
-
 # ==================================================================
 # 1. Crear un chat cuando alguien pulsa "Estoy interesado"
 # ==================================================================
@@ -70,6 +68,10 @@ def create_chat(session: Session, post_id: int, initiator_user_id: int) -> Chat:
     )
 
     session.add(new_chat)
+    session.flush()
+    # Un cursor de lectura por participante; send_message solo tiene que actualizarlos
+    session.add(ChatReadCursor(chat_id=new_chat.id, user_id=initiator_user_id))  # type: ignore
+    session.add(ChatReadCursor(chat_id=new_chat.id, user_id=receiver_user_id))  # type: ignore
     session.commit()
     session.refresh(new_chat)
     return new_chat
@@ -78,11 +80,39 @@ def create_chat(session: Session, post_id: int, initiator_user_id: int) -> Chat:
 # ==================================================================
 # 2. Obtener todos los chats del usuario logueado
 # ==================================================================
-def get_user_chats(session: Session, user_id: int, filters: ChatFilters) -> List[Chat]:
-    query = select(Chat).where(
-        or_(
-            Chat.initiator_id == user_id,
-            Chat.receiver_id == user_id
+def get_user_chats(session: Session, user_id: int, filters: ChatFilters) -> List[ChatReadWithUser]:
+    """
+    Bandeja de chats en una sola consulta: cada chat con el perfil del otro participante
+    (en `receiver`), la vista previa del último mensaje y los mensajes sin leer.
+    """
+    counterpart_id = case((Chat.initiator_id == user_id, Chat.receiver_id), else_=Chat.initiator_id)
+
+    # Último mensaje de cada chat (idx_chat_sent: chat_id, created_at)
+    last_message_id = (
+        select(ChatMessage.id)
+        .where(ChatMessage.chat_id == Chat.id)
+        .order_by(desc(ChatMessage.created_at), desc(ChatMessage.id))
+        .limit(1)
+        .correlate(Chat)
+        .scalar_subquery()
+    )
+    LastMessage = aliased(ChatMessage)
+
+    query = (
+        select(
+            Chat, User, UserProfiles,
+            LastMessage.message, LastMessage.created_at, LastMessage.sender_id,
+            func.coalesce(ChatReadCursor.unread_count, 0),
+        )
+        .join(User, User.id == counterpart_id)  # type: ignore
+        .outerjoin(UserProfiles, UserProfiles.user_id == User.id)  # type: ignore
+        .outerjoin(LastMessage, LastMessage.id == last_message_id)  # type: ignore
+        .outerjoin(ChatReadCursor, (ChatReadCursor.chat_id == Chat.id) & (ChatReadCursor.user_id == user_id))  # type: ignore
+        .where(
+            or_(
+                Chat.initiator_id == user_id,
+                Chat.receiver_id == user_id
+            )
         )
     )
 
@@ -95,32 +125,120 @@ def get_user_chats(session: Session, user_id: int, filters: ChatFilters) -> List
     if filters.status_id is not None:
         query = query.where(Chat.status_id == filters.status_id)
 
-    # Ahora sí: desc y asc están importados
+    # idx_initiator_updated / idx_receiver_updated
     query = query.order_by(desc(Chat.updated_at))
     query = query.offset(filters.skip).limit(filters.limit)
-    # query = query.where(Chat.status_id == AgreementStatusEnum.PENDING)
-    return session.exec(query).all()   # type: ignore
+
+    return [
+        ChatReadWithUser(
+            **chat.model_dump(),
+            initiator=None,
+            receiver=UserRead(
+                **counterpart.model_dump(),
+                user_info=UserInfoRead.model_validate(profile) if profile else None,
+            ),
+            last_message=last_message,
+            last_message_at=last_message_at,
+            last_message_sender_id=last_message_sender_id,
+            unread_count=unread_count,
+        )
+        for chat, counterpart, profile, last_message, last_message_at, last_message_sender_id, unread_count
+        in session.exec(query).all()
+    ]
 
 
 # ==================================================================
 # 3. Obtener el detalle completo de un chat
 # ==================================================================
-def get_chat_detail(session: Session, chat_id: int, requesting_user_id: int) -> ChatDetailRead:
+def _get_participant_chat(session: Session, chat_id: int, requesting_user_id: int) -> Chat:
     chat = session.get(Chat, chat_id)
     if not chat:
         raise ChatNotFoundException()
 
     if chat.initiator_id != requesting_user_id and chat.receiver_id != requesting_user_id:
         raise PermissionError("No tenés permiso para ver este chat")
+    return chat
+
+
+def _display_names_query(chat: Chat):
+    # Nombres visibles de ambos participantes en una sola consulta (los mensajes siempre son de ellos)
+    return (
+        select(User.id, User.email, UserProfiles.username)
+        .outerjoin(UserProfiles, UserProfiles.user_id == User.id)  # type: ignore
+        .where(User.id.in_([chat.initiator_id, chat.receiver_id]))  # type: ignore
+    )
+
 
-    # Mensajes ordenados por fecha ascendente
-    messages_raw = session.exec(
-        select(ChatMessage)
+def _display_names(session: Session, chat: Chat) -> dict[int, str]:
+    return {user_id: username or email for user_id, email, username in session.exec(_display_names_query(chat)).all()}
+
+
+def get_chat_detail_validators(session: Session, chat_id: int, requesting_user_id: int) -> tuple:
+    """
+    Todo lo que puede cambiar el detalle de un chat, sin cargar mensajes: la fila del chat,
+    el último id y la cantidad de mensajes (son append-only), el título del post y los
+    nombres visibles. Sirve para el ETag de GET /chats/{chat_id} (ver utils/conditional).
+    """
+    chat = _get_participant_chat(session, chat_id, requesting_user_id)
+    last_message_id, message_count = session.exec(
+        select(func.max(ChatMessage.id), func.count(ChatMessage.id))  # type: ignore
         .where(ChatMessage.chat_id == chat_id)
-        .order_by(asc(ChatMessage.created_at))  # ← importado correctamente
-    ).all()
+    ).one()
+    post_title = session.exec(select(Post.title).where(Post.id == chat.post_id)).first()
+    return (
+        chat.model_dump(mode="json"),
+        last_message_id,
+        message_count,
+        post_title,
+        sorted(_display_names(session, chat).items()),
+    )
+
+
+def get_chat_detail(
+    session: Session,
+    chat_id: int,
+    requesting_user_id: int,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    limit: int = 100,
+) -> ChatDetailRead:
+    """
+    Devuelve el chat con una página de mensajes en orden ascendente:
+    - after_id: mensajes posteriores a ese id (lo nuevo desde el último poll)
+    - before_id: mensajes anteriores a ese id (scroll hacia atrás)
+    - sin cursor: los últimos `limit` mensajes
+    has_more indica si quedan mensajes en la dirección pedida.
+    """
+    if after_id is not None and before_id is not None:
+        raise ValueError("Usá after_id o before_id, no ambos")
+
+    chat = _get_participant_chat(session, chat_id, requesting_user_id)
+
+    # Paginación keyset sobre (created_at, id), resuelta con idx_chat_sent (chat_id, created_at)
+    forward = after_id is not None
+    sort_keys = [(ChatMessage.created_at, not forward), (ChatMessage.id, not forward)]
+    query = select(ChatMessage).where(ChatMessage.chat_id == chat_id)
+
+    anchor_id = after_id if forward else before_id
+    if anchor_id is not None:
+        anchor_created_at = session.exec(
+            select(ChatMessage.created_at).where(
+                ChatMessage.id == anchor_id, ChatMessage.chat_id == chat_id
+            )
+        ).first()
+        if anchor_created_at is None:
+            raise InvalidCursorException("El mensaje de referencia no pertenece a este chat")
+        query = query.where(keyset_condition(sort_keys, [anchor_created_at, anchor_id]))
+
+    query = query.order_by(*[key.desc() if descending else key.asc() for key, descending in sort_keys])
+    messages_raw = list(session.exec(query.limit(limit + 1)).all())
+    has_more = len(messages_raw) > limit
+    messages_raw = messages_raw[:limit]
+    if not forward:
+        messages_raw.reverse()
+
+    display_names = _display_names(session, chat)
 
-    # Convertir a ChatMessageRead (para que salga el sender_username)
     messages = [
         ChatMessageRead(
             id=msg.id, # type: ignore
@@ -128,40 +246,25 @@ def get_chat_detail(session: Session, chat_id: int, requesting_user_id: int) ->
             sender_id=msg.sender_id,
             message=msg.message,
             created_at=msg.created_at,
-            sender_username=get_display_name(msg.sender)
+            sender_username=display_names.get(msg.sender_id, "Usuario desconocido")
         )
         for msg in messages_raw
     ]
 
-    # Perfiles de usuario
-    initiator_profile = session.get(UserProfiles, chat.initiator_id)
-    
-    receiver_profile = session.get(UserProfiles, chat.receiver_id)
     return ChatDetailRead(
         **chat.model_dump(),
         post_title=chat.post.title if chat.post else None,
-        initiator_username = (
-        getattr(initiator_profile, "username", None) or 
-        getattr(chat.initiator, "email", "Usuario desconocido")
-        ), 
-        receiver_username=(
-        getattr(receiver_profile, "username", None) or 
-        getattr(chat.receiver, "email", "Usuario desconocido")
-        ),
-        messages=messages  # ← ahora es List[ChatMessageRead]
+        initiator_username=display_names.get(chat.initiator_id, "Usuario desconocido"),
+        receiver_username=display_names.get(chat.receiver_id, "Usuario desconocido"),
+        messages=messages,
+        has_more=has_more,
     )
 
 
 # ==================================================================
 # 4. Enviar un mensaje
 # ==================================================================
-def send_message(
-    session: Session,
-    chat_id: int,
-    sender_user_id: int,
-    message_text: str
-) -> ChatMessage:
-    chat = session.get(Chat, chat_id)
+def _add_message(session: Session | AsyncSession, chat: Chat | None, sender_user_id: int, message_text: str) -> ChatMessage:
     if not chat:
         raise ChatNotFoundException()
     if not chat.is_active:
@@ -170,7 +273,7 @@ def send_message(
         raise PermissionError("No participás en este chat")
 
     new_message = ChatMessage(
-        chat_id=chat_id,
+        chat_id=chat.id,  # type: ignore
         sender_id=sender_user_id,
         message=message_text.strip()
     )
@@ -179,9 +282,182 @@ def send_message(
 
     session.add(new_message)
     session.add(chat)
+    return new_message
+
+
+def _recipient_id(chat: Chat, sender_user_id: int) -> int:
+    return chat.receiver_id if chat.initiator_id == sender_user_id else chat.initiator_id
+
+
+def _enqueue_message_push(session: Session | AsyncSession, new_message: ChatMessage) -> None:
+    # Push al otro participante: se confirma junto con el mensaje y lo envía outbox_worker
+    outbox_service.enqueue(session, outbox_service.CHAT_MESSAGE, {  # type: ignore[arg-type]
+        "chat_id": new_message.chat_id,
+        "sender_id": new_message.sender_id,
+        "message_preview": new_message.message[:100],
+    })
+
+
+def _publish_message(chat: Chat, new_message: ChatMessage, display_names: dict[int, str]) -> ChatMessageRead:
+    # Mismo sender_username que GET /chats/{chat_id}
+    message_read = ChatMessageRead.model_validate(new_message).model_copy(update={
+        "sender_username": display_names.get(new_message.sender_id, "Usuario desconocido"),
+    })
+
+    # Entrega inmediata a los sockets abiertos de ambos participantes (ver /chats/ws)
+    event = {"type": "chat_message", "message": message_read.model_dump(mode="json")}
+    for user_id in (chat.initiator_id, chat.receiver_id):
+        broker.publish_threadsafe(user_channel(user_id), event)
+    return message_read
+
+
+def send_message(
+    session: Session,
+    chat_id: int,
+    sender_user_id: int,
+    message_text: str
+) -> ChatMessageRead:
+    chat = session.get(Chat, chat_id)
+    new_message = _add_message(session, chat, sender_user_id, message_text)
+    session.flush()
+    assert chat is not None
+
+    # Contadores de lectura: el destinatario suma uno, el remitente ya leyó todo
+    recipient_id = _recipient_id(chat, sender_user_id)
+    _upsert_cursor(session, chat_id, recipient_id, _unread_increment(chat_id, recipient_id))
+    _upsert_cursor(session, chat_id, sender_user_id, _read_cursor_update(chat_id, sender_user_id, new_message.id))
+    _enqueue_message_push(session, new_message)
     session.commit()
     session.refresh(new_message)
-    return new_message
+    return _publish_message(chat, new_message, _display_names(session, chat))
+
+
+async def send_message_async(
+    session: AsyncSession,
+    chat_id: int,
+    sender_user_id: int,
+    message_text: str
+) -> ChatMessageRead:
+    # Mismo flujo que send_message sobre el driver async (DATABASE_ASYNC): cada espera a la BD
+    # libera el event loop
+    chat = await session.get(Chat, chat_id)
+    new_message = _add_message(session, chat, sender_user_id, message_text)
+    await session.flush()
+    assert chat is not None
+
+    recipient_id = _recipient_id(chat, sender_user_id)
+    await _upsert_cursor_async(session, chat_id, recipient_id, _unread_increment(chat_id, recipient_id))
+    await _upsert_cursor_async(session, chat_id, sender_user_id, _read_cursor_update(chat_id, sender_user_id, new_message.id))
+    _enqueue_message_push(session, new_message)
+    await session.commit()
+    await session.refresh(new_message)
+    display_names = {
+        user_id: username or email
+        for user_id, email, username in (await session.exec(_display_names_query(chat))).all()
+    }
+    return _publish_message(chat, new_message, display_names)
+
+
+# Cursores de lectura. Cada cambio es un UPDATE atómico; si el chat no tiene la fila
+# (creado antes de la migración y sin backfill) se crea vacía y se repite el UPDATE.
+# Si el otro participante la creó entre medio, el INSERT choca y alcanza con repetirlo.
+def _unread_increment(chat_id: int, user_id: int):
+    # Dos mensajes simultáneos no pisan el contador
+    return (
+        update(ChatReadCursor)
+        .where(ChatReadCursor.chat_id == chat_id, ChatReadCursor.user_id == user_id)  # type: ignore
+        .values(unread_count=ChatReadCursor.unread_count + 1)
+    )
+
+
+def _read_cursor_update(chat_id: int, user_id: int, last_read_message_id: int | None):
+    # El conteo va dentro del UPDATE: un mensaje confirmado mientras tanto queda contado
+    # en vez de pisado con un valor viejo
+    unread = (
+        select(func.count(ChatMessage.id))  # type: ignore
+        .where(
+            ChatMessage.chat_id == chat_id,
+            ChatMessage.id > (last_read_message_id or 0),  # type: ignore
+            ChatMessage.sender_id != user_id,
+        )
+        .scalar_subquery()
+    )
+    return (
+        update(ChatReadCursor)
+        .where(ChatReadCursor.chat_id == chat_id, ChatReadCursor.user_id == user_id)  # type: ignore
+        .values(last_read_message_id=last_read_message_id, unread_count=unread)
+    )
+
+
+def _upsert_cursor(session: Session, chat_id: int, user_id: int, statement) -> None:
+    if session.exec(statement).rowcount:  # type: ignore
+        return
+    try:
+        with session.begin_nested():
+            session.add(ChatReadCursor(chat_id=chat_id, user_id=user_id))
+    except IntegrityError:
+        pass
+    session.exec(statement)  # type: ignore
+
+
+async def _upsert_cursor_async(session: AsyncSession, chat_id: int, user_id: int, statement) -> None:
+    if (await session.exec(statement)).rowcount:  # type: ignore
+        return
+    try:
+        async with session.begin_nested():
+            session.add(ChatReadCursor(chat_id=chat_id, user_id=user_id))
+    except IntegrityError:
+        pass
+    await session.exec(statement)  # type: ignore
+
+
+def mark_chat_read(
+    session: Session,
+    chat_id: int,
+    user_id: int,
+    message_id: int | None = None
+) -> ChatReadState:
+    """
+    Marca el chat como leído hasta message_id (o hasta el último mensaje).
+    unread_count queda con los mensajes del otro participante posteriores a ese punto.
+    """
+    chat = session.get(Chat, chat_id)
+    if not chat:
+        raise ChatNotFoundException()
+    if chat.initiator_id != user_id and chat.receiver_id != user_id:
+        raise PermissionError("No participás en este chat")
+
+    latest_id = session.exec(
+        select(func.max(ChatMessage.id)).where(ChatMessage.chat_id == chat_id)
+    ).one()
+
+    if message_id is None or (latest_id is not None and message_id >= latest_id):
+        last_read = latest_id
+    else:
+        exists = session.exec(
+            select(ChatMessage.id).where(ChatMessage.id == message_id, ChatMessage.chat_id == chat_id)
+        ).first()
+        if exists is None:
+            raise ValueError("El mensaje no pertenece a este chat")
+        last_read = message_id
+
+    _upsert_cursor(session, chat_id, user_id, _read_cursor_update(chat_id, user_id, last_read))
+    unread = session.exec(
+        select(ChatReadCursor.unread_count)
+        .where(ChatReadCursor.chat_id == chat_id, ChatReadCursor.user_id == user_id)
+    ).one()
+    session.commit()
+    return ChatReadState(chat_id=chat_id, last_read_message_id=last_read, unread_count=unread)
+
+
+def count_unread_chats(session: Session, user_id: int) -> int:
+    # idx_read_cursor_unread (user_id, unread_count)
+    return session.exec(
+        select(func.count()).select_from(ChatReadCursor).where(
+            ChatReadCursor.user_id == user_id,
+            ChatReadCursor.unread_count > 0,
+        )
+    ).one()
 
 
 # ==================================================================
@@ -194,7 +470,8 @@ def resolve_chat(
     completed: bool,
     resolution_note: str | None = None
 ) -> Chat:
-    chat = session.get(Chat, chat_id)
+    # FOR UPDATE: dos cierres simultáneos del mismo chat no pueden sumar dos ayudas
+    chat = session.get(Chat, chat_id, with_for_update=True)
     if not chat:
         raise ChatNotFoundException()
     if not chat.is_active:
@@ -209,10 +486,16 @@ def resolve_chat(
 
     if completed:
         if chat.post.post_type_id == 2: # type: ignore
-            initiator = session.get(User, chat.initiator_id)
-            if initiator:
-                initiator.help_count = (initiator.help_count or 0) + 1
-                session.add(initiator)
+            # Incremento atómico en la BD y lectura del valor resultante (la fila queda
+            # bloqueada hasta el commit), así los buckets del ranking no se desfasan
+            incremented = session.exec(  # type: ignore
+                update(User)
+                .where(User.id == chat.initiator_id)  # type: ignore
+                .values(help_count=func.coalesce(User.help_count, 0) + 1)
+            )
+            if incremented.rowcount:
+                new_help_count = session.exec(select(User.help_count).where(User.id == chat.initiator_id)).one()
+                leaderboard_service.record_help_count_change(session, new_help_count - 1, new_help_count)
 
         post = session.get(Post, chat.post_id)
         if post:
@@ -222,4 +505,6 @@ def resolve_chat(
     session.add(chat)
     session.commit()
     session.refresh(chat)
+    if completed:
+        post_cache.invalidate_post(chat.post_id, chat.post.category if chat.post else None)
     return chat
\ No newline at end of file
@@ -0,0 +1,94 @@
+import logging
+
+from sqlalchemy import inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, desc, func, select, delete
+
+from models import User, HelpCountBucket
+from models.user.user import UserProfiles
+from schemas.user_schemas import LeaderboardEntry
+
+logger = logging.getLogger(__name__)
+
+
+def _users_above(session: Session, help_count: int) -> int:
+    # Suma sobre los buckets con más ayudas: tantas filas como valores distintos de help_count
+    return session.exec(
+        select(func.coalesce(func.sum(HelpCountBucket.users), 0))
+        .where(HelpCountBucket.help_count > help_count)
+    ).one()
+
+
+def _add_to_bucket(session: Session, help_count: int, delta: int) -> None:
+    if help_count <= 0:
+        return
+    statement = (
+        update(HelpCountBucket)
+        .where(HelpCountBucket.help_count == help_count)  # type: ignore
+        .values(users=HelpCountBucket.users + delta)
+    )
+    if session.exec(statement).rowcount or delta < 0:  # type: ignore
+        return
+    try:
+        with session.begin_nested():
+            session.add(HelpCountBucket(help_count=help_count, users=delta))
+    except IntegrityError:
+        # Otra transacción creó el bucket entre el UPDATE y el INSERT
+        session.exec(statement)  # type: ignore
+
+
+def record_help_count_change(session: Session, old_help_count: int, new_help_count: int) -> None:
+    """Actualiza los buckets en la transacción del llamador (ver chat_service.resolve_chat)."""
+    if old_help_count == new_help_count:
+        return
+    _add_to_bucket(session, old_help_count, -1)
+    _add_to_bucket(session, new_help_count, 1)
+
+
+def get_rank(session: Session, user_id: int) -> int:
+    help_count = session.exec(select(User.help_count).where(User.id == user_id)).one()
+    return _users_above(session, help_count) + 1
+
+
+def get_top(session: Session, limit: int = 10) -> list[LeaderboardEntry]:
+    # idx users.help_count: ORDER BY ... LIMIT sin recorrer toda la tabla
+    rows = session.exec(
+        select(User.id, User.email, UserProfiles.username, User.help_count)
+        .outerjoin(UserProfiles, UserProfiles.user_id == User.id)  # type: ignore
+        .where(User.help_count > 0)
+        .order_by(desc(User.help_count), User.id)
+        .limit(limit)
+    ).all()
+
+    entries: list[LeaderboardEntry] = []
+    for position, (user_id, email, username, help_count) in enumerate(rows, start=1):
+        # Empates: mismo puesto que el anterior; si no, el puesto es la posición en la lista
+        rank = entries[-1].rank if entries and entries[-1].help_count == help_count else position
+        entries.append(LeaderboardEntry(
+            user_id=user_id, username=username or email, help_count=help_count, rank=rank
+        ))
+    return entries
+
+
+def rebuild(session: Session) -> None:
+    """Recalcula los buckets desde users (arranque con tabla vacía o corrección manual)."""
+    session.exec(delete(HelpCountBucket))  # type: ignore
+    for help_count, users in session.exec(
+        select(User.help_count, func.count(User.id)).where(User.help_count > 0).group_by(User.help_count)
+    ).all():
+        session.add(HelpCountBucket(help_count=help_count, users=users))
+    session.commit()
+
+
+def rebuild_if_empty(session: Session) -> None:
+    # Bases existentes: la tabla se crea con migrations/2026-10-18_outbox_read_cursors_leaderboard.sql.
+    # Sin ella la app arranca igual; solo fallan ranking y leaderboard.
+    if not inspect(session.get_bind()).has_table(HelpCountBucket.__tablename__):
+        logger.warning("help_count_buckets does not exist; skipping leaderboard rebuild (see migrations/)")
+        return
+    if session.exec(select(HelpCountBucket.help_count).limit(1)).first() is not None:
+        return
+    try:
+        rebuild(session)
+    except IntegrityError:
+        session.rollback()  # otro worker lo reconstruyó al mismo tiempo
@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from sqlmodel import Session, or_, select, update
+
+from core.config import settings
+from models.notification.outbox import NotificationOutbox
+
+NEW_POST = "new_post"
+CHAT_MESSAGE = "chat_message"
+
+
+class OutboxJob(NamedTuple):
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+
+
+def enqueue(session: Session, kind: str, payload: dict) -> None:
+    """Agrega la notificación a la sesión; se confirma con el commit del llamador."""
+    session.add(NotificationOutbox(kind=kind, payload=json.dumps(payload)))
+
+
+def claim_batch(session: Session, batch_size: int) -> list[OutboxJob]:
+    """
+    Toma hasta batch_size notificaciones pendientes y las reserva por OUTBOX_LEASE_SECONDS.
+    Si el worker muere antes de confirmarlas, vuelven a estar disponibles al vencer la
+    reserva (entrega at-least-once). SKIP LOCKED permite varios workers en paralelo.
+    """
+    now = datetime.now(timezone.utc)
+    rows = session.exec(
+        select(NotificationOutbox)
+        .where(
+            NotificationOutbox.processed_at == None,  # noqa: E711
+            NotificationOutbox.available_at <= now,
+            or_(NotificationOutbox.locked_until == None, NotificationOutbox.locked_until < now),  # noqa: E711
+        )
+        .order_by(NotificationOutbox.id)  # type: ignore
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    jobs = []
+    for row in rows:
+        row.locked_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        row.attempts += 1
+        jobs.append(OutboxJob(id=row.id, kind=row.kind, payload=json.loads(row.payload), attempts=row.attempts))  # type: ignore
+
+    session.commit()
+    return jobs
+
+
+def mark_processed(session: Session, job_ids: list[int]) -> None:
+    if not job_ids:
+        return
+    session.exec(  # type: ignore
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(job_ids))  # type: ignore
+        .values(processed_at=datetime.now(timezone.utc), locked_until=None)
+    )
+    session.commit()
+
+
+def mark_failed(session: Session, job: OutboxJob, error: str) -> None:
+    """Reprograma el envío con backoff exponencial; tras OUTBOX_MAX_ATTEMPTS se descarta."""
+    now = datetime.now(timezone.utc)
+    values: dict = {"locked_until": None, "last_error": error[:500]}
+    if job.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        values["processed_at"] = now
+    else:
+        values["available_at"] = now + timedelta(seconds=2 ** job.attempts)
+
+    session.exec(  # type: ignore
+        update(NotificationOutbox).where(NotificationOutbox.id == job.id).values(**values)  # type: ignore
+    )
+    session.commit()
@@ -1,39 +1,132 @@
 from datetime import datetime, timezone
 from sqlmodel import Session, desc, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from exceptions.exceptions import PostNotFoundException
-from models import Chat, Like, Post, PostMultimedia, User, RoleEnum
-from schemas import PostCreate, PostPatch, PostRead, PostFilters
+from models import Chat, Like, Post, PostMultimedia, User, UserProfiles, RoleEnum
+from schemas import PostCreate, PostPatch, PostRead, PostFilters, PostFeedRead
 from exceptions import NotOwnerError
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import selectinload, joinedload
+from pydantic import TypeAdapter
+from services import outbox_service
+from core import post_cache
+from utils.pagination import decode_cursor, encode_cursor, keyset_condition
+from utils.search import keyword_condition, keyword_relevance
+from utils.geo import bounding_box, distance_m
 
 
-def _resolve_username(post: Post) -> str:
+def _likes_count_expr():
+    # Subconsulta correlacionada: cuenta los likes del post usando el índice de likes.post_id
+    # sin construir objetos Like (un post viral puede tener miles).
     return (
-        getattr(getattr(getattr(post, "user", None), "user_info", None), "username", None)
-        or getattr(getattr(post, "user", None), "email", "Usuario eliminado")
+        select(func.count(Like.id))  # type: ignore
+        .where(Like.post_id == Post.id)
+        .correlate(Post)
+        .scalar_subquery()
+        .label("likes_count")
     )
 
 
-def create_post(session: Session, payload: PostCreate, user_id: int, file_url: str | None):
+# Proyección del feed: solo las columnas que usa PostRead, sin instanciar Post/User/UserProfiles.
+# username = UserProfiles.username, o el email si el usuario no tiene perfil.
+def _post_columns(likes_count=None) -> list:
+    return [
+        Post.id, Post.user_id, Post.title, Post.message, Post.category, Post.post_type_id,
+        Post.latitude, Post.longitude, Post.location_text, Post.is_active,
+        Post.created_at, Post.updated_at, Post.deleted_at,
+        func.coalesce(UserProfiles.username, User.email, "Usuario eliminado").label("username"),
+        likes_count if likes_count is not None else _likes_count_expr(),
+    ]
+
+
+def _select_post_rows(*extra_columns, likes_count=None):
+    # likes_count: la misma expresión usada en ORDER BY, para que se ordene por la etiqueta
+    return (
+        select(*_post_columns(likes_count), *extra_columns)
+        .join(User, User.id == Post.user_id)  # type: ignore
+        .outerjoin(UserProfiles, UserProfiles.user_id == User.id)  # type: ignore
+    )
+
+
+_MULTIMEDIA_COLUMNS = (
+    PostMultimedia.post_id, PostMultimedia.id, PostMultimedia.url, PostMultimedia.thumb_url,
+    PostMultimedia.medium_url, PostMultimedia.full_url, PostMultimedia.created_at, PostMultimedia.updated_at,
+)
+
+
+def _multimedia_query(post_ids: list[int]):
+    # Una sola consulta (post_id IN ...) para toda la página
+    return (
+        select(*_MULTIMEDIA_COLUMNS)
+        .where(PostMultimedia.post_id.in_(post_ids))  # type: ignore
+        .order_by(PostMultimedia.post_id, PostMultimedia.id)
+    )
+
+
+def _group_multimedia(post_ids: list[int], rows) -> dict[int, list[dict]]:
+    grouped: dict[int, list[dict]] = {post_id: [] for post_id in post_ids}
+    for row in rows:
+        media = row._asdict()
+        grouped[media.pop("post_id")].append(media)
+    return grouped
+
+
+def _multimedia_by_post(session: Session, post_ids: list[int]) -> dict[int, list[dict]]:
+    rows = session.exec(_multimedia_query(post_ids)).all() if post_ids else []
+    return _group_multimedia(post_ids, rows)
+
+
+# Validar la lista entera en una llamada al core de pydantic sale mucho más barato que
+# model_validate(from_attributes) + model_copy por post
+_post_reads_adapter = TypeAdapter(list[PostRead])
+
+
+def _build_post_reads(session: Session, rows) -> list[PostRead]:
+    """rows: filas de _select_post_rows (columnas extra, como distance_m, se ignoran)."""
+    return _post_reads(rows, _multimedia_by_post(session, [row.id for row in rows]))
+
+
+def _post_reads(rows, multimedia: dict[int, list[dict]]) -> list[PostRead]:
+    return _post_reads_adapter.validate_python([
+        {
+            **row._mapping,
+            "city_name": row.location_text or "Sin ubicación",
+            "multimedia": multimedia[row.id],
+        }
+        for row in rows
+    ])
+
+
+def _get_post_read(session: Session, post_id: int) -> PostRead | None:
+    row = session.exec(_select_post_rows().where(Post.id == post_id)).first()
+    return _build_post_reads(session, [row])[0] if row else None
+
+
+def create_post(session: Session, payload: PostCreate, user_id: int, file_url: str | None, variants: dict | None = None):
     post_data = payload.model_dump(exclude_unset=True)
     post = Post(user_id=user_id, **post_data)
     session.add(post)
-    session.commit()
-    session.refresh(post)
+    session.flush()  # asigna post.id sin cerrar la transacción
 
     if file_url:
-        session.add(PostMultimedia(post_id=post.id, url=file_url))  # type: ignore
-        session.commit()
-        session.refresh(post)
-
-    validated = PostRead.model_validate(post)
-    validated = validated.model_copy(update={
-        "city_name": post.location_text or "Sin ubicación",
-        "username": _resolve_username(post),
+        session.add(PostMultimedia(post_id=post.id, url=file_url, **(variants or {})))  # type: ignore
+
+    # La notificación a suscriptores se confirma en el mismo commit que el post
+    outbox_service.enqueue(session, outbox_service.NEW_POST, {
+        "post_id": post.id,
+        "post_type_id": post.post_type_id,
+        "category": post.category,
+        "post_author_id": user_id,
+        "post_title": post.title,
+        "post_lat": post.latitude,
+        "post_lon": post.longitude,
     })
-    return validated
+
+    post_id, category = post.id, post.category
+    session.commit()
+    post_cache.invalidate_post(post_id, category)
+
+    return _get_post_read(session, post_id)  # type: ignore
 
 
 def is_liked_by_user(session: Session, post_id: int, user_id: int) -> bool:
@@ -44,21 +137,16 @@ def is_liked_by_user(session: Session, post_id: int, user_id: int) -> bool:
 
 
 def get_posts_by_user(session: Session, user_id: int) -> list[PostRead]:
-    posts = session.exec(
-        select(Post).where(Post.user_id == user_id).order_by(desc(Post.created_at))
+    rows = session.exec(
+        _select_post_rows()
+        .where(Post.user_id == user_id)
+        .order_by(desc(Post.created_at))
     ).all()
-    result = []
-    for post in posts:
-        validated = PostRead.model_validate(post)
-        validated = validated.model_copy(update={
-            "city_name": post.location_text or "Sin ubicación",
-            "username": _resolve_username(post),
-        })
-        result.append(validated)
-    return result
-
-
-def get_posts(session: Session, filters: PostFilters, user: User) -> list[PostRead]:
+    return _build_post_reads(session, rows)
+
+
+def _feed_query(dialect_name: str, filters: PostFilters) -> tuple:
+    """Consulta de una página del feed y el orden efectivo; la comparten get_posts y get_posts_async."""
     conditions = []
 
     if filters.show_only_active is True:
@@ -76,87 +164,111 @@ def get_posts(session: Session, filters: PostFilters, user: User) -> list[PostRe
         conditions.append(Post.post_type_id == filters.post_type_id)
 
     if filters.keyword:
-        kw = f"%{filters.keyword}%"
-        conditions.append(
-            (Post.title.ilike(kw)) | (Post.message.ilike(kw))  # type: ignore
-        )
-
-    # Filtro geográfico por radio usando ST_Distance_Sphere (MySQL 5.7+)
-    # Solo se aplica a posts que tengan coordenadas cargadas.
-    # ST_Distance_Sphere devuelve distancia en metros; radius_km * 1000 = metros.
+        conditions.append(keyword_condition(dialect_name, filters.keyword))
+
+    # Filtro geográfico por radio: primero un rectángulo lat/lon que puede resolverse
+    # por rango sobre idx_coordinates, y solo para esos candidatos la distancia exacta
+    # (ST_Distance_Sphere en MySQL, ver utils/geo.distance_m). Posts sin coordenadas quedan afuera.
     if filters.lat is not None and filters.lon is not None:
         radius_m = filters.radius_km * 1000
-        distance_expr = func.ST_Distance_Sphere(
-            func.POINT(filters.lon, filters.lat),
-            func.POINT(Post.longitude, Post.latitude),
-        )
-        conditions.append(Post.latitude.isnot(None))   # type: ignore
-        conditions.append(Post.longitude.isnot(None))  # type: ignore
-        conditions.append(distance_expr <= radius_m)
-
-    query = (
-        select(Post)
-        .distinct(Post.id)  # type: ignore
-        .options(
-            joinedload(Post.user).joinedload(User.user_info),  # type: ignore
-            selectinload(Post.multimedia),  # type: ignore
-            selectinload(Post.likes),  # type: ignore
-        )
-        .join(User, User.id == Post.user_id)  # type: ignore
-        .outerjoin(Like, Like.post_id == Post.id)  # type: ignore
-    )
-
-    if conditions:
-        query = query.where(*conditions)
+        box = bounding_box(filters.lat, filters.lon, radius_m)
+        conditions.append(Post.latitude.between(box.min_lat, box.max_lat))  # type: ignore
+        if box.min_lon is not None:
+            conditions.append(Post.longitude.between(box.min_lon, box.max_lon))  # type: ignore
+        else:
+            conditions.append(Post.longitude.isnot(None))  # type: ignore
+        conditions.append(distance_m(filters.lat, filters.lon, Post.latitude, Post.longitude) <= radius_m)
 
     # most_liked=True is the legacy param; sort_by takes precedence when set
     effective_sort = 'most_liked' if filters.most_liked else filters.sort_by
-    
+    if effective_sort == 'closest' and (filters.lat is None or filters.lon is None):
+        effective_sort = 'newest'
+
+    # Clave de orden completa (siempre termina en Post.id) para poder paginar por cursor
+    likes_count = _likes_count_expr()
+    extra_columns = []
     if effective_sort == 'most_liked':
-        query = (
-            query.group_by(Post.id)  # <-- ¡ESTO EVITA EL ERROR 500 EN MYSQL!
-            .order_by(desc(func.count(Like.id)))
-        )
-    elif effective_sort == 'closest' and filters.lat is not None and filters.lon is not None:
-        dist_sort = func.ST_Distance_Sphere(
-            func.POINT(filters.lon, filters.lat),
-            func.POINT(Post.longitude, Post.latitude),
-        )
-        query = query.order_by(dist_sort.asc())  # type: ignore
+        sort_keys = [(likes_count, True), (Post.created_at, True), (Post.id, True)]
+        cursor_parsers = [int, datetime.fromisoformat, int]
+    elif effective_sort == 'closest':
+        # El prefiltro por rectángulo ya acotó los candidatos: solo se ordenan esos
+        distance = distance_m(filters.lat, filters.lon, Post.latitude, Post.longitude).label("distance_m")
+        extra_columns.append(distance)
+        sort_keys = [(distance, False), (Post.id, False)]
+        cursor_parsers = [float, int]
     else:
-        # Si elegimos ordenar por los más nuevos, agrupamos también por las dudas
-        # ya que la query tiene un join con likes que podría duplicar filas sin group_by
-        query = query.group_by(Post.id).order_by(Post.created_at.desc())  # type: ignore
+        sort_keys = [(Post.created_at, True), (Post.id, True)]
+        cursor_parsers = [datetime.fromisoformat, int]
+
+    if filters.cursor:
+        after = decode_cursor(filters.cursor, effective_sort, cursor_parsers)
+        conditions.append(keyset_condition(sort_keys, after))
+
+    query = _select_post_rows(*extra_columns, likes_count=likes_count)
+
+    if conditions:
+        query = query.where(*conditions)
+
+    query = query.order_by(*[key.desc() if descending else key.asc() for key, descending in sort_keys])
 
-    posts = session.exec(query.offset(filters.skip).limit(filters.limit)).all()
+    # Con cursor no hace falta offset: la condición keyset ya salta las páginas anteriores
+    if not filters.cursor:
+        query = query.offset(filters.skip)
 
-    result = []
-    for post in posts:
-        validated = PostRead.model_validate(post)
-        validated = validated.model_copy(update={
-            "likes_count": len(post.likes) if post.likes else 0,
-            "city_name": post.location_text or "Sin ubicación",
-            "username": _resolve_username(post),
-        })
-        result.append(validated)
-    return result
+    # Se pide una fila de más para saber si hay otra página sin adivinar por el tamaño
+    return query.limit(filters.limit + 1), effective_sort
+
+
+def _feed_page(rows, filters: PostFilters, effective_sort: str) -> tuple[list, bool, str | None]:
+    has_more = len(rows) > filters.limit
+    rows = rows[:filters.limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        if effective_sort == 'most_liked':
+            next_cursor = encode_cursor(effective_sort, [last.likes_count, last.created_at, last.id])
+        elif effective_sort == 'closest':
+            next_cursor = encode_cursor(effective_sort, [last.distance_m, last.id])
+        else:
+            next_cursor = encode_cursor(effective_sort, [last.created_at, last.id])
+
+    return rows, has_more, next_cursor
+
+
+def get_posts(session: Session, filters: PostFilters, user: User) -> PostFeedRead:
+    query, effective_sort = _feed_query(session.get_bind().dialect.name, filters)
+    rows, has_more, next_cursor = _feed_page(session.exec(query).all(), filters, effective_sort)
+    return PostFeedRead(
+        posts=_build_post_reads(session, rows),
+        limit_reached=not has_more,
+        next_cursor=next_cursor,
+    )
+
+
+async def get_posts_async(session: AsyncSession, filters: PostFilters, user: User) -> PostFeedRead:
+    # Misma consulta que get_posts sobre el driver async (DATABASE_ASYNC): cada espera a la BD
+    # libera el event loop
+    query, effective_sort = _feed_query(session.bind.dialect.name, filters)  # type: ignore[union-attr]
+    rows, has_more, next_cursor = _feed_page((await session.exec(query)).all(), filters, effective_sort)
+    post_ids = [row.id for row in rows]
+    media_rows = (await session.exec(_multimedia_query(post_ids))).all() if post_ids else []
+    return PostFeedRead(
+        posts=_post_reads(rows, _group_multimedia(post_ids, media_rows)),
+        limit_reached=not has_more,
+        next_cursor=next_cursor,
+    )
 
 
 def get_post_by_id(session: Session, post_id: int) -> PostRead:
-    post = session.get(Post, post_id)
+    post = _get_post_read(session, post_id)
     if not post:
         raise PostNotFoundException
 
-    validated = PostRead.model_validate(post)
-    validated = validated.model_copy(update={
-        "likes_count": len(post.likes),
-        "city_name": post.location_text or "Sin ubicación",
-        "username": _resolve_username(post),
-    })
-    return validated
+    return post
 
 
-def patch_post(session: Session, post_id: int, payload: PostPatch, user_id: int, file_url: str | None = None):
+def patch_post(session: Session, post_id: int, payload: PostPatch, user_id: int, file_url: str | None = None, variants: dict | None = None):
     payload_data = payload.model_dump(exclude={"multimedia"}, exclude_unset=True)
 
     post = session.get(Post, post_id)
@@ -166,17 +278,23 @@ def patch_post(session: Session, post_id: int, payload: PostPatch, user_id: int,
     if post.user_id != user_id:
         raise NotOwnerError("No puedes editar este post porque no eres el propietario")
 
+    previous_category = post.category
     for key, value in payload_data.items():
         setattr(post, key, value)
 
     if file_url and len(post.multimedia) > 0:
-        post.multimedia[0].url = file_url
+        media = post.multimedia[0]
+        media.url = file_url
+        # Las variantes del archivo anterior ya no corresponden (p. ej. si ahora es un mp4)
+        for field in ("thumb_url", "medium_url", "full_url"):
+            setattr(media, field, (variants or {}).get(field))
     elif file_url:
-        post.multimedia.append(PostMultimedia(post_id=post_id, url=file_url))
+        post.multimedia.append(PostMultimedia(post_id=post_id, url=file_url, **(variants or {})))
 
     post.updated_at = datetime.now(timezone.utc)
     session.commit()
     session.refresh(post)
+    post_cache.invalidate_post(post_id, previous_category, post.category)
 
     return {"detail": "Post editado exitosamente", "post": post}
 
@@ -205,6 +323,7 @@ def delete_post(session: Session, post_id: int, user: User):
 
     session.commit()
     session.refresh(post)
+    post_cache.invalidate_post(post_id, post.category)
     return {"detail": "post deleted succesfully"}
 
 
@@ -236,6 +355,7 @@ def like_post(session: Session, post_id: int, user_id: int):
             _give_like(session, post_id, user_id)
             detail = "like given"
         session.commit()
+        post_cache.invalidate_post(post_id, post.category)  # likes_count del feed y del detalle
         return {"detail": detail}
     except SQLAlchemyError as e:
         session.rollback()
@@ -246,14 +366,13 @@ def search_post(session: Session, keyword: str, skip: int = 0, limit: int = 10)
     if not keyword:
         return []
 
-    posts = session.exec(
-        select(Post)
-        .where(
-            Post.title.ilike(f"%{keyword}%") |  # type: ignore
-            Post.message.ilike(f"%{keyword}%")  # type: ignore
-        )
-        .offset(skip)
-        .limit(limit)
-    ).all()
+    dialect_name = session.get_bind().dialect.name
+    query = _select_post_rows().where(keyword_condition(dialect_name, keyword))
+
+    relevance = keyword_relevance(dialect_name, keyword)
+    if relevance is not None:
+        query = query.order_by(relevance.desc(), Post.created_at.desc())  # type: ignore
+
+    rows = session.exec(query.offset(skip).limit(limit)).all()
 
-    return [PostRead.model_validate(p) for p in posts]
+    return _build_post_reads(session, rows)
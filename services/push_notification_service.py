@@ -1,36 +1,113 @@
 from __future__ import annotations
-import math
+import asyncio
 import logging
 import httpx
+import numpy as np
+from anyio import to_thread
+
+from core.config import settings
+from exceptions.exceptions import PushDeliveryError
+from utils.geo import bounding_box, haversine_m_many
 
 logger = logging.getLogger(__name__)
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
 _EXPO_HEADERS = {
     "Accept": "application/json",
     "Accept-Encoding": "gzip, deflate",
     "Content-Type": "application/json",
 }
+_EXPO_CHUNK_SIZE = 100
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Shared client: keeps connections to Expo alive across notifications.
+# Created lazily on the running event loop and closed from the app lifespan.
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=_EXPO_HEADERS,
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=settings.PUSH_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.PUSH_MAX_CONCURRENCY,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 def _is_valid_expo_token(token: str) -> bool:
     return token.startswith("ExponentPushToken[") or token.startswith("ExpoPushToken[")
 
 
-def _send_raw(messages: list[dict]) -> None:
-    """POST up to 100 messages to the Expo Push API in a single request."""
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return settings.PUSH_RETRY_BACKOFF_SECONDS * 2 ** attempt
+
+
+def _unregistered_tokens(messages: list[dict], tickets: list[dict]) -> list[str]:
+    # Expo returns one ticket per message, in the same order
+    return [
+        message["to"]
+        for message, ticket in zip(messages, tickets)
+        if ticket.get("status") == "error"
+        and (ticket.get("details") or {}).get("error") == "DeviceNotRegistered"
+    ]
+
+
+async def _send_raw(messages: list[dict]) -> list[str]:
+    """
+    POST up to 100 messages to the Expo Push API in a single request, retrying
+    with exponential backoff on 429/5xx and network errors.
+    Returns the tokens Expo reported as DeviceNotRegistered; raises PushDeliveryError
+    when the batch could not be handed to Expo, so the outbox reschedules it.
+    """
+    client = _get_client()
+    response: httpx.Response | None = None
+    for attempt in range(settings.PUSH_MAX_RETRIES + 1):
+        try:
+            response = await client.post(settings.EXPO_PUSH_URL, json=messages)
+            if response.status_code not in _RETRYABLE_STATUS:
+                break
+            error: object = f"HTTP {response.status_code}"
+        except httpx.TransportError as exc:
+            response, error = None, exc
+
+        if attempt == settings.PUSH_MAX_RETRIES:
+            raise PushDeliveryError(f"Expo push request failed after {attempt + 1} attempts: {error}")
+        await asyncio.sleep(_retry_delay(attempt, response))
+
     try:
-        httpx.post(
-            EXPO_PUSH_URL,
-            json=messages if len(messages) > 1 else messages[0],
-            headers=_EXPO_HEADERS,
-            timeout=10.0,
-        ).raise_for_status()
+        response.raise_for_status()  # type: ignore[union-attr]
+        tickets = response.json().get("data", [])  # type: ignore[union-attr]
     except Exception as exc:
-        logger.error("Expo push request failed: %s", exc)
+        raise PushDeliveryError(f"Expo push request failed: {exc}") from exc
+    return _unregistered_tokens(messages, tickets)
+
 
+def _remove_push_tokens(tokens: list[str]) -> None:
+    from core.database import engine
+    from sqlmodel import Session, delete
+    from models.notification.push_token import UserPushToken
 
-def send_push(
+    with Session(engine) as session:
+        session.exec(delete(UserPushToken).where(UserPushToken.token.in_(tokens)))  # type: ignore
+        session.commit()
+    logger.info("Removed %d unregistered Expo push tokens", len(tokens))
+
+
+async def send_push(
     token: str,
     title: str,
     body: str,
@@ -39,10 +116,15 @@ def send_push(
     if not _is_valid_expo_token(token):
         logger.warning("Skipping invalid Expo push token: %.40s", token)
         return
-    _send_raw([{"to": token, "title": title, "body": body, "sound": "default", "data": data or {}}])
+    await send_push_bulk([token], title, body, data)
 
 
-def send_push_bulk(tokens: list[str], title: str, body: str, data: dict | None = None) -> None:
+async def send_push_bulk(tokens: list[str], title: str, body: str, data: dict | None = None) -> None:
+    """
+    Send chunks of 100 messages concurrently (at most PUSH_MAX_CONCURRENCY in flight).
+    Raises PushDeliveryError if any chunk failed, after cleaning up the tokens the
+    other chunks reported; a retry re-sends the chunks that did go through.
+    """
     valid = [t for t in tokens if _is_valid_expo_token(t)]
     if not valid:
         return
@@ -50,30 +132,32 @@ def send_push_bulk(tokens: list[str], title: str, body: str, data: dict | None =
         {"to": t, "title": title, "body": body, "sound": "default", "data": data or {}}
         for t in valid
     ]
-    for i in range(0, len(messages), 100):
-        _send_raw(messages[i : i + 100])
+    semaphore = asyncio.Semaphore(settings.PUSH_MAX_CONCURRENCY)
+
+    async def deliver(chunk: list[dict]) -> list[str]:
+        async with semaphore:
+            return await _send_raw(chunk)
+
+    results = await asyncio.gather(*(
+        deliver(messages[i : i + _EXPO_CHUNK_SIZE])
+        for i in range(0, len(messages), _EXPO_CHUNK_SIZE)
+    ), return_exceptions=True)
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    unregistered = [token for result in results if not isinstance(result, BaseException) for token in result]
+    if unregistered:
+        await to_thread.run_sync(_remove_push_tokens, unregistered)
+    if failures:
+        raise failures[0]
 
 
 # ---------------------------------------------------------------------------
 # Background task helpers — each opens its own DB session so they can run
-# safely after the HTTP response has already been sent.
+# safely after the HTTP response has already been sent. DB work runs in a
+# worker thread; delivery runs on the event loop.
 # ---------------------------------------------------------------------------
 
-def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    R = 6_371_000.0
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
-def notify_chat_recipient(
-    chat_id: int,
-    sender_id: int,
-    message_preview: str,
-) -> None:
-    """Send a push notification to the other participant of a chat."""
+def _load_chat_recipient(chat_id: int, sender_id: int) -> tuple[str, str] | None:
     from core.database import engine
     from sqlmodel import Session
     from models.chat.chat import Chat
@@ -83,12 +167,12 @@ def notify_chat_recipient(
     with Session(engine) as session:
         chat = session.get(Chat, chat_id)
         if not chat or not chat.is_active:
-            return
+            return None
 
         recipient_id = chat.receiver_id if chat.initiator_id == sender_id else chat.initiator_id
         token_row = session.get(UserPushToken, recipient_id)
         if not token_row:
-            return
+            return None
 
         sender_profile = session.get(UserProfiles, sender_id)
         sender_name = getattr(sender_profile, "username", None)
@@ -96,15 +180,86 @@ def notify_chat_recipient(
             sender = session.get(User, sender_id)
             sender_name = getattr(sender, "email", "Usuario").split("@")[0]
 
-        send_push(
-            token=token_row.token,
-            title=sender_name,
-            body=message_preview[:100],
-            data={"type": "chat_message", "chat_id": chat_id},
+        return token_row.token, sender_name
+
+
+async def notify_chat_recipient(
+    chat_id: int,
+    sender_id: int,
+    message_preview: str,
+) -> None:
+    """Send a push notification to the other participant of a chat."""
+    recipient = await to_thread.run_sync(_load_chat_recipient, chat_id, sender_id)
+    if recipient is None:
+        return
+
+    token, sender_name = recipient
+    await send_push(
+        token=token,
+        title=sender_name,
+        body=message_preview[:100],
+        data={"type": "chat_message", "chat_id": chat_id},
+    )
+
+
+def _load_subscriber_tokens(
+    post_type_id: int,
+    category: str,
+    post_author_id: int,
+    post_lat: float | None,
+    post_lon: float | None,
+    radius_m: float,
+) -> list[str]:
+    from core.database import engine
+    from sqlmodel import Session, select, or_
+    from models.notification.subscription import NotificationSubscription
+    from models.notification.push_token import UserPushToken
+
+    # Suscripciones y tokens en una sola consulta (idx_sub_type_category + PK de user_push_tokens)
+    query = (
+        select(UserPushToken.token, UserPushToken.latitude, UserPushToken.longitude)
+        .join(NotificationSubscription, NotificationSubscription.user_id == UserPushToken.user_id)  # type: ignore
+        .where(
+            NotificationSubscription.post_type_id == post_type_id,
+            NotificationSubscription.category == category,
+            NotificationSubscription.user_id != post_author_id,
         )
+    )
 
+    has_location = post_lat is not None and post_lon is not None
+    if has_location:
+        # Descarta en SQL a quienes están claramente fuera del radio; los que no tienen
+        # ubicación registrada se notifican igual.
+        box = bounding_box(post_lat, post_lon, radius_m)  # type: ignore[arg-type]
+        in_box = UserPushToken.latitude.between(box.min_lat, box.max_lat)  # type: ignore
+        if box.min_lon is not None:
+            in_box = in_box & UserPushToken.longitude.between(box.min_lon, box.max_lon)  # type: ignore
+        query = query.where(or_(
+            UserPushToken.latitude.is_(None),  # type: ignore
+            UserPushToken.longitude.is_(None),  # type: ignore
+            in_box,
+        ))
 
-def notify_post_subscribers(
+    with Session(engine) as session:
+        rows = session.exec(query).all()
+
+    if not has_location:
+        return [token for token, _, _ in rows]
+
+    tokens = [token for token, lat, lon in rows if lat is None or lon is None]
+    located = [(token, lat, lon) for token, lat, lon in rows if lat is not None and lon is not None]
+    if located:
+        distances = haversine_m_many(
+            post_lat,  # type: ignore[arg-type]
+            post_lon,  # type: ignore[arg-type]
+            np.fromiter((lat for _, lat, _ in located), dtype=np.float64, count=len(located)),
+            np.fromiter((lon for _, _, lon in located), dtype=np.float64, count=len(located)),
+        )
+        tokens.extend(token for (token, _, _), distance in zip(located, distances) if distance <= radius_m)
+    return tokens
+
+
+async def notify_post_subscribers(
     post_id: int,
     post_type_id: int,
     category: str,
@@ -120,45 +275,16 @@ def notify_post_subscribers(
     location in user_push_tokens). Users with no stored location are notified
     regardless of distance.
     """
-    from core.database import engine
-    from sqlmodel import Session, select
-    from models.notification.subscription import NotificationSubscription
-    from models.notification.push_token import UserPushToken
+    tokens = await to_thread.run_sync(
+        _load_subscriber_tokens, post_type_id, category, post_author_id, post_lat, post_lon, radius_m
+    )
+    if not tokens:
+        return
 
-    with Session(engine) as session:
-        subscriber_ids = session.exec(
-            select(NotificationSubscription.user_id).where(
-                NotificationSubscription.post_type_id == post_type_id,
-                NotificationSubscription.category == category,
-                NotificationSubscription.user_id != post_author_id,
-            )
-        ).all()
-
-        if not subscriber_ids:
-            return
-
-        token_rows: list[UserPushToken] = session.exec(
-            select(UserPushToken).where(UserPushToken.user_id.in_(subscriber_ids))  # type: ignore
-        ).all()
-
-        tokens: list[str] = []
-        for row in token_rows:
-            if (
-                post_lat is None
-                or post_lon is None
-                or row.latitude is None
-                or row.longitude is None
-                or _haversine_m(post_lat, post_lon, row.latitude, row.longitude) <= radius_m
-            ):
-                tokens.append(row.token)
-
-        if not tokens:
-            return
-
-        type_label = "Oferta" if post_type_id == 1 else "Necesidad"
-        send_push_bulk(
-            tokens=tokens,
-            title=f"Nueva {type_label} de {category}",
-            body=post_title,
-            data={"type": "new_post", "post_id": post_id, "post_type_id": post_type_id},
-        )
+    type_label = "Oferta" if post_type_id == 1 else "Necesidad"
+    await send_push_bulk(
+        tokens=tokens,
+        title=f"Nueva {type_label} de {category}",
+        body=post_title,
+        data={"type": "new_post", "post_id": post_id, "post_type_id": post_type_id},
+    )
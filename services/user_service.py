@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, ValidationError
 from sqlmodel import Session, func, select
 from sqlalchemy.orm import joinedload
@@ -9,71 +10,124 @@ from models.user.user import UserProfiles
 from models import StatusUserEnum
 from schemas import UserRead, UserPatch
 
-from services.auth_service import encrypt_password, terminate_active_session
+from services.auth_service import terminate_active_session
+from core import auth_cache
+from core.password_hashing import hash_password_async
+from services import leaderboard_service
 
 from dependencies.auth_dependencies import get_current_user
 
 from exceptions.exceptions import UserNotFoundException
 
 # services/user_service.py
+import csv
+import io
+import tempfile
+from collections.abc import Iterator
 from datetime import date, datetime, time, timezone
-from io import BytesIO
-import pandas as pd
 from fastapi import HTTPException, status
+from openpyxl import Workbook
+from sqlalchemy.engine import Engine
 from sqlmodel import select
 from sqlalchemy.orm import joinedload
 
 from models.user.user import User
 from models.enums import RoleEnum, StatusUserEnum
-from core.database import SessionDep
 
 
-def export_users_excel_service(date_from: date, date_to: date, session: SessionDep) -> BytesIO:
+# Exportación de usuarios: se lee con cursor del lado del servidor y se escribe por filas,
+# así la memoria no depende de la cantidad de usuarios.
+EXPORT_BATCH_SIZE = 1000
+_EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_COLUMNS = [
+    "ID", "Email", "Nombre", "Apellido", "Username", "Rol", "Estado",
+    "Ayudas dadas", "Registrado", "Última actualización",
+]
+
+
+def _export_range(date_from: date, date_to: date):
     # Convertir fechas a datetime con rango completo del día (UTC)
     start_dt = datetime.combine(date_from, time.min, tzinfo=timezone.utc)
     end_dt = datetime.combine(date_to, time.max, tzinfo=timezone.utc)
+    return User.created_at >= start_dt, User.created_at <= end_dt
 
-    users = session.exec(
-        select(User)
-        .options(joinedload(User.user_info))
-        .where(User.created_at >= start_dt, User.created_at <= end_dt)
-        .order_by(User.created_at)
-    ).all()
 
-    if not users:
+def ensure_users_to_export(session: Session, date_from: date, date_to: date) -> None:
+    # Se valida antes de empezar a enviar: con el stream iniciado ya no se puede responder 404
+    if session.exec(select(User.id).where(*_export_range(date_from, date_to)).limit(1)).first() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No se encontraron usuarios en ese rango de fechas"
         )
 
-    data = []
-    for user in users:
-        profile = user.user_info
-        data.append({
-            "ID": user.id,
-            "Email": user.email,
-            "Nombre": profile.first_name if profile else None,
-            "Apellido": profile.last_name if profile else None,
-            "Username": profile.username if profile else None,
-            "Rol": ("Administrador" if user.role_id == RoleEnum.ADMIN.value
-                    else "Moderador" if user.role_id == RoleEnum.MODERATOR.value
-                    else "Usuario"),
-            "Estado": ("Activo" if user.status_id == StatusUserEnum.ACTIVE.value
-                       else "Baneado" if user.status_id == StatusUserEnum.BANNED.value
-                       else "Eliminado"),
-            "Ayudas dadas": user.help_count,
-            "Registrado": user.created_at.strftime("%d/%m/%Y %H:%M"),
-            "Última actualización": user.updated_at.strftime("%d/%m/%Y %H:%M") if user.updated_at else "—",
-        })
-
-    df = pd.DataFrame(data)
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Usuarios")
-
-    output.seek(0)
-    return output
+
+def _iter_export_rows(engine: Engine, date_from: date, date_to: date) -> Iterator[list]:
+    """
+    Filas de la exportación. Abre su propia sesión porque se consume mientras se envía
+    la respuesta, cuando la sesión del request ya puede estar cerrada.
+    """
+    query = (
+        select(
+            User.id, User.email, UserProfiles.first_name, UserProfiles.last_name, UserProfiles.username,
+            User.role_id, User.status_id, User.help_count, User.created_at, User.updated_at,
+        )
+        .outerjoin(UserProfiles, UserProfiles.user_id == User.id)  # type: ignore
+        .where(*_export_range(date_from, date_to))
+        .order_by(User.created_at)
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+    with Session(engine) as session:
+        for (user_id, email, first_name, last_name, username,
+             role_id, status_id, help_count, created_at, updated_at) in session.exec(query):
+            yield [
+                user_id,
+                email,
+                first_name,
+                last_name,
+                username,
+                ("Administrador" if role_id == RoleEnum.ADMIN.value
+                 else "Moderador" if role_id == RoleEnum.MODERATOR.value
+                 else "Usuario"),
+                ("Activo" if status_id == StatusUserEnum.ACTIVE.value
+                 else "Baneado" if status_id == StatusUserEnum.BANNED.value
+                 else "Eliminado"),
+                help_count,
+                created_at.strftime("%d/%m/%Y %H:%M"),
+                updated_at.strftime("%d/%m/%Y %H:%M") if updated_at else "—",
+            ]
+
+
+def stream_users_csv(engine: Engine, date_from: date, date_to: date) -> Iterator[bytes]:
+    """CSV (UTF-8 con BOM para Excel); los bytes salen a medida que se leen las filas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+    for row in _iter_export_rows(engine, date_from, date_to):
+        writer.writerow(row)
+        if buffer.tell() >= _EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_users_xlsx(engine: Engine, date_from: date, date_to: date) -> Iterator[bytes]:
+    """
+    XLSX con openpyxl en modo write-only: las filas se vuelcan a disco y no quedan en
+    memoria. El formato zip recién se puede enviar al terminar de escribirlo.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Usuarios")
+    sheet.append(EXPORT_COLUMNS)
+    for row in _iter_export_rows(engine, date_from, date_to):
+        sheet.append(row)
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while chunk := tmp.read(_EXPORT_CHUNK_BYTES):
+            yield chunk
 
 class EmailCheck(BaseModel):
     email: EmailStr
@@ -84,6 +138,7 @@ def _mark_user_as_deleted(user: User, session: Session) -> dict[str, str]:
     user.deleted_at = datetime.now(timezone.utc)
     
     session.commit()
+    auth_cache.evict_user(user.id) # type: ignore
     return {"detail": "Usuario eliminado exitosamente"}
 
 def count_all_users(session: Session):
@@ -96,7 +151,14 @@ def get_user_by_role(session:Session, role:str):
 
 
 
-def patch_self(user_id: int, session: Session, user_data: UserPatch) -> UserRead:
+async def patch_self(user_id: int, session: Session, user_data: UserPatch) -> UserRead:
+    # Argon2 en el pool acotado de core.password_hashing; la BD en el threadpool
+    #TODO: separate password change with another endpoint that sends a verification code
+    password_hash = await hash_password_async(user_data.password) if user_data.password else None
+    return await run_in_threadpool(_apply_patch, user_id, session, user_data, password_hash)
+
+
+def _apply_patch(user_id: int, session: Session, user_data: UserPatch, password_hash: str | None) -> UserRead:
     user = session.get(User, user_id) 
     
     if not user:
@@ -107,9 +169,8 @@ def patch_self(user_id: int, session: Session, user_data: UserPatch) -> UserRead
     for key, value in update_data.items():
         if key in ["password", "email"]:
             if key == "password":
-                #TODO: separate password change with another endpoint that sends a verification code
-                value = encrypt_password(value)
-                setattr(user, "password_hash", value)
+                if password_hash:
+                    setattr(user, "password_hash", password_hash)
                 continue
             elif key == "email":
                 if session.exec(select(User).where(User.email == value, User.id != user_id)).first():
@@ -126,6 +187,7 @@ def patch_self(user_id: int, session: Session, user_data: UserPatch) -> UserRead
 
     user.updated_at = datetime.now(timezone.utc)
     session.commit()
+    auth_cache.evict_user(user_id)
     session.refresh(user) 
 
     return UserRead.model_validate(user)
@@ -140,15 +202,8 @@ def delete_self(user_id: int, session: Session) -> dict[str, str]:
     return _mark_user_as_deleted(user, session)
 
 def get_user_rank(session: Session, user_id: int):
-    subq = (
-        select(
-            User.id,
-            func.row_number().over(order_by=User.help_count.desc()).label("rank")
-        ).subquery()
-    )
-    stmt = select(subq.c.rank).where(subq.c.id == user_id)
-    position = session.exec(stmt).one()
-    return position
+    # Puesto con empates compartidos, desde los buckets de leaderboard_service
+    return leaderboard_service.get_rank(session, user_id)
     
 
 def get_all_users(session: Session, user: User) -> list[UserRead]:
@@ -173,6 +228,7 @@ def patch_user(user_id: int, session: Session, role_id: enums.RoleEnum) -> dict[
         raise UserNotFoundException(f"User with id {user_id} not found")
     user.role_id = role_id
     session.commit()
+    auth_cache.evict_user(user_id)
     return {"detail": "rol de usuario actualizado exitosamente"}
     
 def delete_user_by_admin(user_id: int, session: Session) -> dict[str, str]:
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# La configuración se lee al importar core.config: el entorno de prueba va antes que la app
+_tmp = tempfile.mkdtemp(prefix="petlink-tests-")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("MEDIA_STORAGE_BACKEND", "local")
+os.environ.setdefault("MEDIA_LOCAL_DIR", os.path.join(_tmp, "media"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from core import auth_cache, post_cache
+from core.config import settings
+from core.database import engine
+from models import (
+    AgreementStatusEnum, PostType, PostTypeEnum, Role, RoleEnum, StatusAgreement, StatusUser,
+    StatusUserEnum, User,
+)
+from services import auth_service
+
+PASSWORD = "password123"
+
+
+@pytest.fixture
+def db():
+    """Base vacía con los catálogos y dos usuarios: admin (id 1) y común (id 2)."""
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    auth_cache.clear()
+    post_cache.clear()
+    with Session(engine) as session:
+        for role in RoleEnum:
+            session.add(Role(id=role, name=role.name.lower()))
+        for user_status in StatusUserEnum:
+            session.add(StatusUser(id=user_status, name=user_status.name.lower()))
+        for post_type in PostTypeEnum:
+            session.add(PostType(id=post_type, name=post_type.name.lower()))
+        for agreement_status in AgreementStatusEnum:
+            session.add(StatusAgreement(id=agreement_status, name=agreement_status.name.lower()))
+        password_hash = auth_service.encrypt_password(PASSWORD)
+        session.add(User(email="admin@example.com", password_hash=password_hash, role_id=RoleEnum.ADMIN))
+        session.add(User(email="user@example.com", password_hash=password_hash))
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def client(db):
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def chat(client):
+    """Chat abierto sobre un post del admin: (chat_id, headers del admin, headers del usuario)."""
+    admin = auth_headers(client, "admin@example.com")
+    user = auth_headers(client, "user@example.com")
+    post = client.post("/posts/", data={"post_data": json.dumps({
+        "title": "Perro perdido", "message": "Collar rojo", "category": "perros", "post_type_id": 1,
+    })}, headers=admin)
+    chat_id = client.post("/chats/", json={"post_id": post.json()["id"]}, headers=user).json()["id"]
+    return chat_id, admin, user
+
+
+def auth_headers(client: TestClient, email: str) -> dict:
+    response = client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class MockExpo:
+    """
+    Servidor HTTP local con la forma de la Expo Push API. `responses` es una cola de
+    (status, body) que se consume por request; vacía, responde 200 con un ticket "ok" por
+    mensaje (o DeviceNotRegistered si el token contiene "dead").
+    """
+
+    def __init__(self):
+        self.calls: list[list[dict]] = []
+        self.responses: list[tuple[int, dict | None]] = []
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                messages = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                mock.calls.append(messages)
+                status, body = mock.responses.pop(0) if mock.responses else (200, None)
+                if body is None and status == 200:
+                    body = {"data": [
+                        {"status": "error", "details": {"error": "DeviceNotRegistered"}}
+                        if "dead" in message["to"] else {"status": "ok", "id": "ticket"}
+                        for message in messages
+                    ]}
+                payload = json.dumps(body or {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/--/api/v2/push/send"
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def mock_expo(monkeypatch):
+    expo = MockExpo()
+    monkeypatch.setattr(settings, "EXPO_PUSH_URL", expo.url)
+    monkeypatch.setattr(settings, "PUSH_RETRY_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "PUSH_MAX_RETRIES", 2)
+    yield expo
+    expo.close()
+
+
+def run_async(coroutine_function, *args, **kwargs):
+    """asyncio.run cerrando el cliente httpx compartido (queda atado al loop que lo creó)."""
+    import asyncio
+    from services import push_notification_service
+
+    async def runner():
+        try:
+            return await coroutine_function(*args, **kwargs)
+        finally:
+            await push_notification_service.close_client()
+
+    return asyncio.run(runner())
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core import auth_cache, database, post_cache
+from core.config import settings
+from dependencies import auth_dependencies
+from models import ChatReadCursor, Like, Post, PostMultimedia, TokensBlacklist, User
+from schemas import PostFilters
+from services import chat_service, post_service
+from tests.conftest import auth_headers
+
+# Los servicios async se prueban contra la misma base que los sync, con aiosqlite
+
+
+def _run_with_async_session(function, *args):
+    async def runner():
+        async_engine = database._create_async_engine(database._async_url(settings.DATABASE_URL))
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                return await function(session, *args)
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(runner())
+
+
+@pytest.fixture
+def posts(db):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with Session(db) as session:
+        for i in range(7):
+            session.add(Post(
+                user_id=1 + i % 2, title=f"Post {i}", message="...", category="perros" if i % 3 else "gatos",
+                post_type_id=1, created_at=base + timedelta(hours=i // 2),  # empates de created_at
+            ))
+        session.commit()
+        session.add(PostMultimedia(post_id=3, url="https://example.com/a.jpg"))
+        session.add(Like(post_id=2, user_id=1))
+        session.add(Like(post_id=5, user_id=2))
+        session.commit()
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"limit": 3},
+    {"sort_by": "most_liked", "limit": 2},
+    {"category": "perros"},
+    {"user_id": 2, "skip": 1},
+])
+def test_async_feed_matches_the_sync_feed(posts, db, params):
+    filters = PostFilters(**params)
+    with Session(db) as session:
+        expected = post_service.get_posts(session, filters, None)  # type: ignore[arg-type]
+    assert _run_with_async_session(post_service.get_posts_async, filters, None) == expected
+
+    if expected.next_cursor:
+        page_two = filters.model_copy(update={"cursor": expected.next_cursor})
+        with Session(db) as session:
+            expected_two = post_service.get_posts(session, page_two, None)  # type: ignore[arg-type]
+        assert _run_with_async_session(post_service.get_posts_async, page_two, None) == expected_two
+
+
+def test_async_send_message_updates_cursors_and_returns_the_detail(client, chat, db):
+    chat_id, admin, user = chat
+    sent = _run_with_async_session(chat_service.send_message_async, chat_id, 2, "  Desde el loop  ")
+
+    assert sent.message == "Desde el loop" and sent.sender_username == "user@example.com"
+    assert client.get(f"/chats/{chat_id}", headers=admin).json()["messages"][-1] == sent.model_dump(mode="json")
+    with Session(db) as session:
+        cursors = {c.user_id: c for c in session.exec(select(ChatReadCursor)).all()}
+    assert cursors[1].unread_count == 1
+    assert cursors[2].unread_count == 0 and cursors[2].last_read_message_id == sent.id
+
+
+def test_async_auth_applies_the_same_checks(client, db):
+    token = auth_headers(client, "user@example.com")["Authorization"].split()[1]
+
+    user = _run_with_async_session(auth_dependencies.get_current_user_async, token)
+    assert isinstance(user, User) and user.id == 2
+
+    jti = auth_dependencies._decode_token(token)["jti"]
+    with Session(db) as session:
+        session.add(TokensBlacklist(jti=jti, user_id=2, expires_at=datetime.now(timezone.utc)))
+        session.commit()
+    auth_cache.clear()
+    with pytest.raises(HTTPException) as error:
+        _run_with_async_session(auth_dependencies.get_current_user_async, token)
+    assert error.value.status_code == 401
+
+
+def test_async_auth_releases_its_connection_before_the_handler(client, db):
+    token = auth_headers(client, "user@example.com")["Authorization"].split()[1]
+    auth_cache.clear()
+
+    async def authenticate(session):
+        user = await auth_dependencies.get_current_user_async(session, token)
+        return user.email, session.in_transaction()
+
+    # Con la conexión tomada, la sesión de lectura del feed pedía otra y el pool se agotaba con carga
+    assert _run_with_async_session(authenticate) == ("user@example.com", False)
+
+
+def test_async_read_session_routes_writers_to_the_primary(monkeypatch, db):
+    primary, replica = object(), object()
+    monkeypatch.setattr(database, "replica_engine", object())  # hay réplica sync
+    monkeypatch.setattr(database, "async_engine", primary)
+    monkeypatch.setattr(database, "async_replica_engine", replica)
+    database._recent_writers.clear()
+
+    assert asyncio.run(database.async_read_engine_for(1)) is replica
+    database._recent_writers[1] = True
+    assert asyncio.run(database.async_read_engine_for(1)) is primary
+
+
+class _RecordingRedis:
+    """Cliente Redis en memoria que anota en qué hilo corre cada llamada."""
+
+    def __init__(self):
+        self.data: dict = {}
+        self.threads: set[str] = set()
+
+    def _record(self):
+        self.threads.add(threading.current_thread().name)
+
+    def get(self, key):
+        self._record()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._record()
+        self.data[key] = value
+
+
+def test_async_feed_cache_keeps_redis_off_the_event_loop(monkeypatch, posts):
+    backend = post_cache.RedisBackend("redis://unused")
+    fake = _RecordingRedis()
+    backend._redis = fake  # type: ignore[assignment]
+    monkeypatch.setattr(post_cache, "_backend", backend)
+
+    async def compute():
+        return post_service.PostFeedRead(posts=[], limit_reached=True)
+
+    async def scenario():
+        loop_thread = threading.current_thread().name
+        first = await post_cache.cached_feed_async(PostFilters(), compute)
+        second = await post_cache.cached_feed_async(PostFilters(), compute)
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(scenario())
+    assert first == second
+    assert fake.threads and loop_thread not in fake.threads
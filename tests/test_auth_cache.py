@@ -0,0 +1,51 @@
+import time
+
+from sqlmodel import Session
+
+from core import auth_cache
+from models import User
+from tests.conftest import auth_headers
+
+
+def test_cached_user_does_not_shadow_fresh_reads(client, db):
+    headers = auth_headers(client, "user@example.com")
+    assert client.get("/users/me", headers=headers).json()["help_count"] == 0  # llena la cache
+
+    with Session(db) as session:
+        user = session.get(User, 2)
+        user.help_count = 1  # type: ignore[union-attr]
+        session.commit()
+
+    response = client.get("/users/me", headers=headers)
+    assert auth_cache.stats()["hits"] >= 1
+    assert response.json()["help_count"] == 1
+
+
+class _SharedRevocations:
+    """Misma interfaz que RedisRevocations, en memoria (simula otro worker revocando)."""
+
+    def __init__(self):
+        self.tokens: set[str] = set()
+        self.users: dict[int, float] = {}
+
+    def revoke_token(self, jti):
+        self.tokens.add(jti)
+
+    def revoke_user(self, user_id):
+        self.users[user_id] = time.time()
+
+    def is_revoked(self, jti, user_id, validated_at):
+        return jti in self.tokens or self.users.get(user_id, 0) >= validated_at
+
+
+def test_revocation_from_another_worker_skips_the_cache(monkeypatch, client):
+    shared = _SharedRevocations()
+    monkeypatch.setattr(auth_cache, "_revocations", shared)
+    headers = auth_headers(client, "user@example.com")
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+    # Otro worker cambia el rol: su desalojo local no llega acá, la marca compartida sí
+    shared.revoke_user(2)
+    misses = auth_cache.stats()["misses"]
+    assert client.get("/users/me", headers=headers).status_code == 200
+    assert auth_cache.stats()["misses"] == misses + 1
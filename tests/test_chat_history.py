@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlmodel import Session, select
+
+from models import ChatMessage
+
+
+@pytest.fixture
+def history(db, chat):
+    """Diez mensajes con created_at repetido de a tres: el orden dentro del empate es el id."""
+    chat_id, admin, user = chat
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with Session(db) as session:
+        for i in range(10):
+            session.add(ChatMessage(
+                chat_id=chat_id, sender_id=1 + i % 2, message=f"Mensaje {i}",
+                created_at=base + timedelta(minutes=i // 3),
+            ))
+        session.commit()
+        ids = list(session.exec(
+            select(ChatMessage.id).where(ChatMessage.chat_id == chat_id)
+            .order_by(ChatMessage.created_at, ChatMessage.id)  # type: ignore
+        ).all())
+    return chat_id, user, ids
+
+
+def _page(client, chat_id, headers, **params) -> tuple[list[int], bool]:
+    response = client.get(f"/chats/{chat_id}", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return [message["id"] for message in body["messages"]], body["has_more"]
+
+
+def test_latest_page_then_scroll_back_with_before_id(client, history):
+    chat_id, user, ids = history
+    page, has_more = _page(client, chat_id, user, limit=4)
+    assert page == ids[-4:] and has_more
+
+    seen = page
+    while has_more:
+        page, has_more = _page(client, chat_id, user, limit=4, before_id=seen[0])
+        seen = page + seen
+    assert seen == ids
+
+
+def test_after_id_returns_only_newer_messages(client, history):
+    chat_id, user, ids = history
+    seen, has_more = _page(client, chat_id, user, limit=3, after_id=ids[1])
+    assert seen == ids[2:5] and has_more
+
+    while has_more:
+        page, has_more = _page(client, chat_id, user, limit=3, after_id=seen[-1])
+        seen += page
+    assert seen == ids[2:]
+    assert _page(client, chat_id, user, after_id=ids[-1]) == ([], False)
+
+
+def test_invalid_cursors_are_rejected(client, history):
+    chat_id, user, ids = history
+    both = client.get(f"/chats/{chat_id}", params={"after_id": ids[0], "before_id": ids[-1]}, headers=user)
+    assert both.status_code == 400
+    foreign = client.get(f"/chats/{chat_id}", params={"after_id": ids[-1] + 100}, headers=user)
+    assert foreign.status_code == 400
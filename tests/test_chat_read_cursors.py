@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from sqlmodel import Session, delete, select
+
+from models import ChatMessage, ChatReadCursor
+from services import chat_service
+
+
+def _unread(client, chat_id: int, headers: dict) -> int:
+    inbox = client.get("/chats/me", headers=headers).json()
+    return next(item["unread_count"] for item in inbox if item["id"] == chat_id)
+
+
+def test_unread_count_after_send_and_mark_read(client, chat):
+    chat_id, admin, user = chat
+    first = client.post(f"/chats/{chat_id}/messages", json={"message": "Hola"}, headers=user).json()
+    client.post(f"/chats/{chat_id}/messages", json={"message": "¿Sigue perdido?"}, headers=user)
+
+    assert _unread(client, chat_id, admin) == 2
+    assert _unread(client, chat_id, user) == 0
+    assert client.get("/chats/unread-count", headers=admin).json() == {"unread_chats": 1}
+
+    partial = client.post(f"/chats/{chat_id}/read", json={"message_id": first["id"]}, headers=admin).json()
+    assert partial == {"chat_id": chat_id, "last_read_message_id": first["id"], "unread_count": 1}
+
+    client.post(f"/chats/{chat_id}/read", headers=admin)
+    assert _unread(client, chat_id, admin) == 0
+    assert client.get("/chats/unread-count", headers=admin).json() == {"unread_chats": 0}
+
+
+def test_first_messages_on_a_chat_without_cursors(db, client, chat):
+    chat_id, admin, user = chat
+    with Session(db) as session:
+        session.exec(delete(ChatReadCursor))  # type: ignore
+        session.commit()
+
+    # Chat previo a la migración: el primer mensaje crea las filas que faltan
+    client.post(f"/chats/{chat_id}/messages", json={"message": "Hola"}, headers=user)
+    assert _unread(client, chat_id, admin) == 1
+
+    with Session(db) as session:
+        session.exec(delete(ChatReadCursor))  # type: ignore
+        session.commit()
+        session.add(ChatReadCursor(chat_id=chat_id, user_id=1, unread_count=1))
+        session.commit()
+
+    with Session(db) as session:
+        real_exec = session.exec
+        skipped = []
+
+        def exec_as_if_cursor_missing(statement, *args, **kwargs):
+            # El UPDATE corre "antes" de que el otro participante inserte la fila
+            if not skipped:
+                skipped.append(statement)
+                return SimpleNamespace(rowcount=0)
+            return real_exec(statement, *args, **kwargs)
+
+        session.exec = exec_as_if_cursor_missing  # type: ignore[method-assign]
+        chat_service._upsert_cursor(session, chat_id, 1, chat_service._unread_increment(chat_id, 1))
+        session.commit()
+
+    with Session(db) as session:
+        assert session.get(ChatReadCursor, (chat_id, 1)).unread_count == 2  # type: ignore[union-attr]
+
+
+def test_message_committed_during_mark_read_stays_unread(db, client, chat):
+    chat_id, admin, user = chat
+    client.post(f"/chats/{chat_id}/messages", json={"message": "Hola"}, headers=user)
+
+    with Session(db) as session:
+        real_exec = session.exec
+        state = {"latest_read": False, "injected": False}
+
+        def exec_with_concurrent_message(statement, *args, **kwargs):
+            if state["latest_read"] and not state["injected"]:
+                # Otro request confirma un mensaje después de leer el último id y antes de mover el cursor
+                state["injected"] = True
+                with Session(db) as other:
+                    chat_service.send_message(other, chat_id, 2, "Otro más")
+            state["latest_read"] = state["latest_read"] or "max" in str(statement).lower()
+            return real_exec(statement, *args, **kwargs)
+
+        session.exec = exec_with_concurrent_message  # type: ignore[method-assign]
+        read_state = chat_service.mark_chat_read(session, chat_id, 1)
+
+    assert state["injected"]
+    assert read_state.unread_count == 1
+    with Session(db) as session:
+        latest = session.exec(select(ChatMessage.id).order_by(ChatMessage.id.desc())).first()  # type: ignore
+        assert read_state.last_read_message_id == latest - 1  # type: ignore[operator]
+    assert _unread(client, chat_id, admin) == 1
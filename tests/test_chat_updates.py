@@ -0,0 +1,23 @@
+def _token(headers: dict) -> str:
+    return headers["Authorization"].split()[1]
+
+
+def test_socket_event_matches_chat_detail(client, chat):
+    chat_id, admin, user = chat
+    with client.websocket_connect(f"/chats/ws?token={_token(admin)}") as socket:
+        sent = client.post(f"/chats/{chat_id}/messages", json={"message": "Lo vi en la plaza"}, headers=user)
+        event = socket.receive_json()
+
+    detail = client.get(f"/chats/{chat_id}", headers=admin).json()["messages"][-1]
+    assert event["type"] == "chat_message"
+    assert event["message"]["sender_username"] == "user@example.com"
+    assert event["message"] == sent.json() == detail
+
+
+def test_binary_frames_do_not_close_the_socket(client, chat):
+    chat_id, admin, user = chat
+    with client.websocket_connect(f"/chats/ws?token={_token(admin)}") as socket:
+        socket.send_bytes(b"\x00\x01")
+        socket.send_text("ping")
+        client.post(f"/chats/{chat_id}/messages", json={"message": "Sigue abierto"}, headers=user)
+        assert socket.receive_json()["message"]["message"] == "Sigue abierto"
@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+from datetime import date, datetime, timezone
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from models import Post, User
+from tests.conftest import auth_headers
+
+
+def _asgi_get(app, path: str, query: str, headers: dict) -> list[dict]:
+    """GET directo por ASGI: devuelve cada mensaje enviado, para ver el cuerpo chunk por chunk."""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("testclient", 50000), "server": ("testserver", 80),
+    }
+    messages: list[dict] = []
+    requested = False
+
+    async def receive():
+        # Como un server real: el request una vez y después espera (nunca se desconecta)
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_gzip_round_trip_matches_the_identity_body(client, db):
+    with Session(db) as session:
+        for i in range(30):
+            session.add(Post(user_id=1, title=f"Perro perdido {i}", message="Collar rojo", category="perros", post_type_id=1))
+        session.commit()
+    headers = auth_headers(client, "user@example.com")
+
+    plain = client.get("/posts/", params={"limit": 30}, headers={**headers, "Accept-Encoding": "identity"})
+    compressed = client.get("/posts/", params={"limit": 30}, headers={**headers, "Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert compressed.content == plain.content  # httpx ya lo descomprimió
+    assert compressed.headers["ETag"] == plain.headers["ETag"]
+
+
+def test_small_bodies_are_sent_as_is(client):
+    headers = {**auth_headers(client, "user@example.com"), "Accept-Encoding": "gzip"}
+    response = client.get("/users/me", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.content) < 1024
+    assert "content-encoding" not in response.headers
+
+
+def test_csv_export_stays_streamed_when_compressed(client, db):
+    import main
+
+    now = datetime.now(timezone.utc)
+    with Session(db) as session:
+        session.execute(insert(User), [
+            {"email": f"vecino{i}@example.com", "password_hash": "-", "role_id": 3, "status_id": 1,
+             "help_count": i % 7, "created_at": now}
+            for i in range(5000)
+        ])
+        session.commit()
+    headers = auth_headers(client, "admin@example.com")
+    today = date.today().isoformat()
+    query = f"format=csv&date_from={today}&date_to={today}"
+
+    messages = _asgi_get(main.app, "/users/export/excel", query, {**headers, "Accept-Encoding": "gzip"})
+    start, chunks = messages[0], [m for m in messages if m["type"] == "http.response.body"]
+    response_headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    assert response_headers["content-encoding"] == "gzip"
+    assert "content-length" not in response_headers
+
+    # Varios chunks comprimidos en camino, no un único cuerpo juntado al final
+    assert len(chunks) > 1
+    assert all(chunk["more_body"] for chunk in chunks[:-1]) and not chunks[-1]["more_body"]
+
+    plain = client.get("/users/export/excel", params={"format": "csv", "date_from": today, "date_to": today},
+                       headers={**headers, "Accept-Encoding": "identity"})
+    csv_body = gzip.decompress(b"".join(chunk["body"] for chunk in chunks))
+    assert csv_body == plain.content
+    assert csv_body.decode("utf-8-sig").count("\n") == 5003  # encabezado + 2 usuarios del fixture + 5000
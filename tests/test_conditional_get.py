@@ -0,0 +1,64 @@
+from tests.conftest import auth_headers
+
+
+def _revalidate(client, url: str, headers: dict, **params):
+    """GET inicial y el mismo GET con If-None-Match: devuelve (ETag, respuesta condicional)."""
+    first = client.get(url, params=params, headers=headers)
+    assert first.status_code == 200, first.text
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"') and first.headers["Cache-Control"] == "private, no-cache"
+    return etag, client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+
+
+def _assert_not_modified(response, etag: str) -> None:
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_feed_and_post_detail_answer_304_until_a_write(client, chat):
+    _, _, user = chat
+    etags = {}
+    for url in ("/posts/", "/posts/1"):
+        etags[url], repeated = _revalidate(client, url, user)
+        _assert_not_modified(repeated, etags[url])
+
+    assert client.post("/posts/1/like", headers=user).status_code == 200
+
+    for url, etag in etags.items():
+        response = client.get(url, headers={**user, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    assert response.json()["likes_count"] == 1
+
+
+def test_chat_detail_validator_tracks_messages_names_and_paging(client, chat):
+    chat_id, admin, user = chat
+    url = f"/chats/{chat_id}"
+    etag, repeated = _revalidate(client, url, user)
+    _assert_not_modified(repeated, etag)
+
+    # Otro tamaño de página es otra respuesta
+    assert client.get(url, params={"limit": 5}, headers={**user, "If-None-Match": etag}).status_code == 200
+
+    client.post(f"{url}/messages", json={"message": "Hola"}, headers=admin)
+    after_message = client.get(url, headers={**user, "If-None-Match": etag})
+    assert after_message.status_code == 200
+    assert after_message.json()["messages"][-1]["message"] == "Hola"
+
+    etag = after_message.headers["ETag"]
+    assert client.patch("/users/me", json={"username": "refugio"}, headers=admin).status_code == 200
+    renamed = client.get(url, headers={**user, "If-None-Match": etag})
+    assert renamed.status_code == 200
+    assert renamed.json()["receiver_username"] == "refugio"
+
+
+def test_users_me_answers_304_until_the_profile_changes(client, db):
+    headers = auth_headers(client, "user@example.com")
+    etag, repeated = _revalidate(client, "/users/me", headers)
+    _assert_not_modified(repeated, etag)
+
+    client.patch("/users/me", json={"first_name": "Ana"}, headers=headers)
+    response = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlmodel import Session
+
+from models import Like, Post
+from tests.conftest import auth_headers
+
+# Tres posts por created_at y likes repetidos: los empates se resuelven por id, sin saltos ni duplicados
+CLOSEST = {"sort_by": "closest", "lat": -34.6, "lon": -58.4, "radius_km": 50}
+
+
+@pytest.fixture
+def tied_posts(db):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with Session(db) as session:
+        for i in range(9):
+            session.add(Post(
+                user_id=1, title=f"Post {i}", message="...", category="perros", post_type_id=1,
+                created_at=base + timedelta(hours=i // 3),
+                latitude=-34.6 + (i % 3) * 0.01, longitude=-58.4,  # tres distancias repetidas
+            ))
+        session.commit()
+        for post_id in (1, 2, 4, 5, 7, 8):
+            session.add(Like(post_id=post_id, user_id=1))
+        for post_id in (4, 5):
+            session.add(Like(post_id=post_id, user_id=2))
+        session.commit()
+
+
+def _walk(client, headers, params: dict, limit: int) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        page = client.get("/posts/", params={**params, "limit": limit, "cursor": cursor}, headers=headers).json()
+        ids += [post["id"] for post in page["posts"]]
+        assert page["limit_reached"] == (page["next_cursor"] is None)  # última página
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("params", [{}, {"sort_by": "most_liked"}, CLOSEST])
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_cursor_pages_have_no_gaps_or_duplicates_on_ties(client, tied_posts, params, limit):
+    headers = auth_headers(client, "user@example.com")
+    expected = [post["id"] for post in client.get("/posts/", params={**params, "limit": 50}, headers=headers).json()["posts"]]
+
+    assert len(expected) == 9
+    assert _walk(client, headers, params, limit) == expected
+
+
+def test_cursor_from_another_sort_is_rejected(client, tied_posts):
+    headers = auth_headers(client, "user@example.com")
+    cursor = client.get("/posts/", params={"limit": 2}, headers=headers).json()["next_cursor"]
+
+    response = client.get("/posts/", params={"sort_by": "most_liked", "cursor": cursor}, headers=headers)
+    assert response.status_code == 400
+    assert client.get("/posts/", params={"cursor": "no-es-un-cursor"}, headers=headers).status_code == 400
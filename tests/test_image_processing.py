@@ -0,0 +1,63 @@
+import asyncio
+import io
+import tempfile
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+
+from utils import image_processing, media_storage
+
+
+def _upload(image: Image.Image, filename: str, fmt: str) -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    image.save(spool, fmt)
+    spool.seek(0)
+    return UploadFile(spool, filename=filename)  # type: ignore[arg-type]
+
+
+def _build(upload: UploadFile) -> dict[str, str]:
+    async def build():
+        try:
+            return await image_processing.build_image_variants(upload)
+        finally:
+            image_processing.shutdown_pool()
+
+    return asyncio.run(build())
+
+
+@pytest.fixture
+def local_storage(monkeypatch, tmp_path):
+    monkeypatch.setattr(media_storage, "_storage", media_storage.LocalStorage(str(tmp_path), "http://testserver/media"))
+    return tmp_path
+
+
+def test_builds_webp_variants_from_the_spooled_upload(monkeypatch, local_storage, tmp_path_factory):
+    upload = _upload(Image.new("RGB", (4000, 3000), "orange"), "perro.jpg", "JPEG")
+    scratch = tmp_path_factory.mktemp("scratch")
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+
+    urls = _build(upload)
+
+    assert set(urls) == {"thumb_url", "medium_url", "full_url"}
+    for key, max_side in (("thumb_url", 320), ("medium_url", 960), ("full_url", 1920)):
+        with Image.open(local_storage / urls[key].rsplit("/", 1)[1]) as variant:
+            assert variant.format == "WEBP"
+            assert max(variant.size) == max_side
+    assert upload.file.tell() == 0  # el original se sube después desde el mismo spool
+    assert list(scratch.iterdir()) == []  # el temporal con nombre se borra
+
+
+def test_images_over_the_pixel_cap_get_no_variants(monkeypatch, local_storage):
+    monkeypatch.setattr(image_processing, "MAX_IMAGE_PIXELS", 100 * 100)
+    upload = _upload(Image.new("RGB", (200, 200)), "grande.png", "PNG")
+
+    assert _build(upload) == {}
+    assert list(local_storage.iterdir()) == []
+
+
+def test_non_images_are_skipped(local_storage):
+    upload = UploadFile(io.BytesIO(b"\0" * 1024), filename="video.mp4")
+
+    assert _build(upload) == {}
+
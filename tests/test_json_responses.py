@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.routing import APIRoute, serialize_response
+
+import main
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def listed(client, chat):
+    """Un dato en cada listado: post, chat con mensaje, reporte y un ayudante en el ranking."""
+    chat_id, admin, user = chat
+    client.post(f"/chats/{chat_id}/messages", json={"message": "¿Sigue perdido?"}, headers=user)
+    client.post("/reports/", json={"post_id": 1, "reason": "Spam"}, headers=user)
+
+    # Resolver una necesidad suma help_count a quien ayudó (y cierra ese post, no el reportado)
+    need = client.post("/posts/", data={"post_data": json.dumps({
+        "title": "Perro para pasear", "message": "Dos veces por semana", "category": "perros", "post_type_id": 2,
+    })}, headers=admin).json()["id"]
+    need_chat = client.post("/chats/", json={"post_id": need}, headers=user).json()["id"]
+    response = client.patch(f"/chats/{need_chat}/resolve", json={"completed": True}, headers=admin)
+    assert response.status_code == 200, response.text
+    return admin
+
+
+def _response_field(path: str):
+    route = next(r for r in main.app.routes if isinstance(r, APIRoute) and r.path == path and "GET" in r.methods)
+    return route.response_field
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/users/", {}),
+    ("/reports/", {}),
+    ("/chats/me", {}),
+    ("/users/leaderboard", {}),
+    ("/posts/search", {"keyword": "Perro"}),
+    ("/posts/user/{user_id}", {}),
+])
+def test_pydantic_json_response_matches_the_response_model(client, listed, path, params):
+    url = path.format(user_id=1)
+    response = client.get(url, params=params, headers=listed)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body
+
+    # Lo que FastAPI devolvería validando contra response_model: mismo JSON, sin campos de más
+    expected = asyncio.run(serialize_response(field=_response_field(path), response_content=body))
+    assert body == expected
+
+
+def test_users_list_never_exposes_password_hashes(client, listed):
+    users = client.get("/users/", headers=listed).json()
+    assert {user["email"] for user in users} == {"admin@example.com", "user@example.com"}
+    assert all("password_hash" not in user for user in users)
+    assert client.get("/users/", headers=auth_headers(client, "user@example.com")).status_code == 403
@@ -0,0 +1,100 @@
+import asyncio
+import tempfile
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import UploadFile
+
+from utils import catbox_service, media_storage
+
+UPLOADS = 20
+FILE_SIZE = 10 * 1024 * 1024  # MAX_FILE_SIZE de post_controller
+# Leer cada archivo entero serían 200 MB; por bloques alcanza con unos pocos MB por subida
+PEAK_LIMIT = 64 * 1024 * 1024
+
+
+def _upload_files() -> list[UploadFile]:
+    files = []
+    block = b"\0" * (1024 * 1024)
+    for i in range(UPLOADS):
+        spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)  # como el de Starlette
+        for _ in range(FILE_SIZE // len(block)):
+            spool.write(block)
+        spool.seek(0)
+        files.append(UploadFile(spool, filename=f"video{i}.mp4", headers={"content-type": "video/mp4"}))  # type: ignore[arg-type]
+    return files
+
+
+def _peak_during_uploads(files: list[UploadFile]) -> tuple[list[str], int]:
+    async def upload_all():
+        try:
+            return await asyncio.gather(*(media_storage.upload_media(file) for file in files))
+        finally:
+            await media_storage.close_storage()
+
+    tracemalloc.start()
+    try:
+        urls = asyncio.run(upload_all())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return urls, peak
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    def use(backend: media_storage.MediaStorage):
+        monkeypatch.setattr(media_storage, "_storage", backend)
+    return use
+
+
+def test_storage_backends_must_implement_save():
+    with pytest.raises(TypeError):
+        media_storage.MediaStorage()  # type: ignore[abstract]
+
+
+def test_local_storage_peak_memory_under_concurrent_uploads(storage, tmp_path):
+    storage(media_storage.LocalStorage(str(tmp_path), "http://testserver/media"))
+    files = _upload_files()
+
+    urls, peak = _peak_during_uploads(files)
+
+    assert len(set(urls)) == UPLOADS
+    assert all((tmp_path / url.rsplit("/", 1)[1]).stat().st_size == FILE_SIZE for url in urls)
+    assert peak < PEAK_LIMIT, f"peak {peak / 2**20:.1f} MB"
+
+
+class _DiscardingCatbox(BaseHTTPRequestHandler):
+    """Catbox falso: consume el multipart de a bloques y devuelve una URL."""
+
+    def do_POST(self):
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+        body = f"https://files.catbox.moe/{threading.get_ident()}.mp4".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_catbox_storage_peak_memory_under_concurrent_uploads(storage, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DiscardingCatbox)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    monkeypatch.setattr(catbox_service, "CATBOX_API", f"http://127.0.0.1:{server.server_port}/user/api.php")
+    storage(media_storage.CatboxStorage())
+    files = _upload_files()
+
+    try:
+        urls, peak = _peak_during_uploads(files)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(urls) == UPLOADS
+    assert peak < PEAK_LIMIT, f"peak {peak / 2**20:.1f} MB"
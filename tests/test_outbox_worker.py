@@ -0,0 +1,69 @@
+import outbox_worker
+import pytest
+from sqlmodel import Session, select
+
+from core.config import settings
+from models import NotificationOutbox, NotificationSubscription, UserPushToken
+from services import outbox_service
+from tests.conftest import run_async
+
+
+@pytest.fixture
+def pending_job(db):
+    """Un post nuevo de la categoría "perros" con un suscriptor (usuario 2) por notificar."""
+    with Session(db) as session:
+        session.add(UserPushToken(user_id=2, token="ExponentPushToken[user]"))
+        session.add(NotificationSubscription(user_id=2, post_type_id=1, category="perros"))
+        outbox_service.enqueue(session, outbox_service.NEW_POST, {
+            "post_id": 1, "post_type_id": 1, "category": "perros", "post_author_id": 1,
+            "post_title": "Perro perdido", "post_lat": None, "post_lon": None,
+        })
+        session.commit()
+    return db
+
+
+def _outbox_row(engine) -> NotificationOutbox:
+    with Session(engine) as session:
+        return session.exec(select(NotificationOutbox)).one()
+
+
+def test_failed_delivery_is_rescheduled(mock_expo, pending_job):
+    mock_expo.responses = [(503, None)] * (settings.PUSH_MAX_RETRIES + 1)
+
+    assert run_async(outbox_worker.run_once) == 1
+
+    row = _outbox_row(pending_job)
+    assert len(mock_expo.calls) == settings.PUSH_MAX_RETRIES + 1
+    assert row.processed_at is None
+    assert row.attempts == 1
+    assert "HTTP 503" in (row.last_error or "")
+    # Con backoff: no vuelve a tomarse enseguida
+    assert run_async(outbox_worker.run_once) == 0
+
+
+def test_delivery_succeeds_after_reschedule(mock_expo, pending_job):
+    mock_expo.responses = [(503, None)] * (settings.PUSH_MAX_RETRIES + 1)
+    run_async(outbox_worker.run_once)
+
+    with Session(pending_job) as session:
+        row = session.exec(select(NotificationOutbox)).one()
+        row.available_at = row.created_at  # vence el backoff
+        session.commit()
+
+    assert run_async(outbox_worker.run_once) == 1
+    row = _outbox_row(pending_job)
+    assert row.processed_at is not None
+    assert row.attempts == 2
+    assert mock_expo.calls[-1][0]["to"] == "ExponentPushToken[user]"
+
+
+def test_unreachable_expo_gives_up_after_max_attempts(monkeypatch, mock_expo, pending_job):
+    mock_expo.close()  # puerto cerrado: error de transporte en cada intento
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 1)
+
+    run_async(outbox_worker.run_once)
+
+    row = _outbox_row(pending_job)
+    assert row.processed_at is not None
+    assert row.attempts == 1
+    assert row.last_error
@@ -0,0 +1,22 @@
+import threading
+
+from core import password_hashing
+from tests.conftest import auth_headers
+
+
+def test_password_change_hashes_on_the_bounded_executor(monkeypatch, client):
+    threads = []
+    real_hash = password_hashing.password_hash.hash
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return real_hash(password)
+
+    monkeypatch.setattr(password_hashing.password_hash, "hash", recording_hash)
+    headers = auth_headers(client, "user@example.com")
+    response = client.patch("/users/me", json={"password": "otra-clave-segura"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert len(threads) == 1 and threads[0].startswith("password-hash")
+    login = client.post("/auth/login", data={"username": "user@example.com", "password": "otra-clave-segura"})
+    assert login.status_code == 200
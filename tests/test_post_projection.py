@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from sqlmodel import Session
+
+from models import Like, Post, PostMultimedia, UserProfiles
+from schemas import PostRead
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def projected_posts(db):
+    """Post del admin (con perfil, ubicación, dos imágenes y dos likes) y post del usuario sin nada de eso."""
+    with Session(db) as session:
+        session.add(UserProfiles(user_id=1, username="refugio"))
+        session.add(Post(
+            user_id=1, title="Gata encontrada", message="Tricolor", category="gatos", post_type_id=1,
+            latitude=-34.45, longitude=-58.91, location_text="Pilar, Buenos Aires",
+        ))
+        session.add(Post(user_id=2, title="Busco a Toby", message="Collar rojo", category="perros", post_type_id=2))
+        session.commit()
+        session.add(PostMultimedia(post_id=1, url="https://example.com/1.jpg", thumb_url="https://example.com/1_thumb.webp"))
+        session.add(PostMultimedia(post_id=1, url="https://example.com/2.jpg"))
+        session.add(Like(post_id=1, user_id=1))
+        session.add(Like(post_id=1, user_id=2))
+        session.commit()
+
+
+def _orm_post_read(db, post_id: int) -> dict:
+    # Armado con el modelo ORM completo, como antes de la proyección
+    with Session(db) as session:
+        post = session.get(Post, post_id)
+        profile = post.user.user_info  # type: ignore[union-attr]
+        return PostRead.model_validate(post).model_copy(update={
+            "likes_count": len(post.likes),  # type: ignore[union-attr]
+            "city_name": post.location_text or "Sin ubicación",  # type: ignore[union-attr]
+            "username": (profile.username if profile else None) or post.user.email,  # type: ignore[union-attr]
+        }).model_dump(mode="json")
+
+
+def test_projection_matches_the_orm_models_on_every_endpoint(client, db, projected_posts):
+    headers = auth_headers(client, "user@example.com")
+    expected = {post_id: _orm_post_read(db, post_id) for post_id in (1, 2)}
+
+    assert expected[1]["username"] == "refugio" and expected[1]["likes_count"] == 2
+    assert len(expected[1]["multimedia"]) == 2
+    assert expected[2]["username"] == "user@example.com" and expected[2]["city_name"] == "Sin ubicación"
+
+    feed = client.get("/posts/", headers=headers).json()["posts"]
+    assert {post["id"]: post for post in feed} == expected
+    for post_id in (1, 2):
+        assert client.get(f"/posts/{post_id}", headers=headers).json() == expected[post_id]
+    assert client.get("/posts/user/1", headers=headers).json() == [expected[1]]
+    assert client.get("/posts/search", params={"keyword": "Toby"}, headers=headers).json() == [expected[2]]
+
+
+def test_create_response_uses_the_projection(client, db):
+    headers = auth_headers(client, "admin@example.com")
+    response = client.post("/posts/", data={"post_data": json.dumps({
+        "title": "Perro perdido", "message": "Collar rojo", "category": "perros", "post_type_id": 1,
+    })}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json() == _orm_post_read(db, response.json()["id"])
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import redis.asyncio
+
+from core.pubsub import RedisBroker
+
+
+class _FakePubSub:
+    def __init__(self, events):
+        self._events = events
+
+    async def psubscribe(self, pattern):
+        pass
+
+    async def listen(self):
+        for event in self._events:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+        await asyncio.Event().wait()  # conexión abierta sin más mensajes
+
+    async def aclose(self):
+        pass
+
+
+class _FakeRedis:
+    """Cada pubsub() es una conexión nueva; la primera se corta al primer mensaje."""
+
+    def __init__(self, connections):
+        self.connections = list(connections)
+        self.subscriptions = 0
+
+    def pubsub(self):
+        self.subscriptions += 1
+        return _FakePubSub(self.connections.pop(0))
+
+    async def aclose(self):
+        pass
+
+
+def _message(channel: str, data: dict) -> dict:
+    return {"type": "pmessage", "channel": f"petlink:{channel}".encode(), "data": json.dumps(data)}
+
+
+def test_reader_reconnects_after_the_connection_drops(monkeypatch, caplog):
+    fake = _FakeRedis([
+        [{"type": "psubscribe"}, ConnectionError("Connection closed by server.")],
+        [_message("user:1", {"n": 1})],
+    ])
+    monkeypatch.setattr(redis.asyncio, "from_url", lambda url: fake)
+    monkeypatch.setattr(RedisBroker, "RECONNECT_MIN_SECONDS", 0.01)
+
+    async def scenario():
+        broker = RedisBroker("redis://test")
+        async with broker.subscribe("user:1") as queue:
+            await broker.start()
+            try:
+                return await asyncio.wait_for(queue.get(), timeout=2)
+            finally:
+                await broker.stop()
+
+    assert asyncio.run(scenario()) == {"n": 1}
+    assert fake.subscriptions == 2
+    assert "Redis pub/sub reader failed" in caplog.text
@@ -0,0 +1,89 @@
+import pytest
+from sqlmodel import Session, select
+
+from core.config import settings
+from exceptions.exceptions import PushDeliveryError
+from models import UserPushToken
+from services import push_notification_service
+from tests.conftest import run_async
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retries_retryable_statuses(mock_expo, status):
+    mock_expo.responses = [(status, None), (status, None)]
+
+    run_async(push_notification_service.send_push, "ExponentPushToken[a]", "Hola", "Mensaje")
+
+    assert len(mock_expo.calls) == 3
+    assert mock_expo.calls[-1] == [{
+        "to": "ExponentPushToken[a]", "title": "Hola", "body": "Mensaje", "sound": "default", "data": {},
+    }]
+
+
+def test_client_errors_are_not_retried(mock_expo):
+    mock_expo.responses = [(400, {"errors": [{"code": "VALIDATION_ERROR"}]})]
+
+    with pytest.raises(PushDeliveryError):
+        run_async(push_notification_service.send_push, "ExponentPushToken[a]", "Hola", "Mensaje")
+    assert len(mock_expo.calls) == 1
+
+
+def test_raises_when_retries_are_exhausted(mock_expo):
+    mock_expo.responses = [(503, None)] * (settings.PUSH_MAX_RETRIES + 1)
+
+    with pytest.raises(PushDeliveryError, match="HTTP 503"):
+        run_async(push_notification_service.send_push, "ExponentPushToken[a]", "Hola", "Mensaje")
+    assert len(mock_expo.calls) == settings.PUSH_MAX_RETRIES + 1
+
+
+def test_raises_on_transport_error(mock_expo):
+    mock_expo.close()
+
+    with pytest.raises(PushDeliveryError):
+        run_async(push_notification_service.send_push, "ExponentPushToken[a]", "Hola", "Mensaje")
+
+
+def test_raises_on_malformed_response(mock_expo):
+    mock_expo.responses = [(200, ["no", "es", "un", "objeto"])]
+
+    with pytest.raises(PushDeliveryError):
+        run_async(push_notification_service.send_push, "ExponentPushToken[a]", "Hola", "Mensaje")
+
+
+def test_device_not_registered_tokens_are_removed(mock_expo, db):
+    with Session(db) as session:
+        session.add(UserPushToken(user_id=1, token="ExponentPushToken[alive]"))
+        session.add(UserPushToken(user_id=2, token="ExponentPushToken[dead]"))
+        session.commit()
+
+    run_async(
+        push_notification_service.send_push_bulk,
+        ["ExponentPushToken[alive]", "ExponentPushToken[dead]"], "Nuevo post", "Perro perdido",
+    )
+
+    with Session(db) as session:
+        assert session.exec(select(UserPushToken.token)).all() == ["ExponentPushToken[alive]"]
+
+
+def test_bulk_sends_chunks_of_100_and_skips_invalid_tokens(mock_expo):
+    tokens = [f"ExponentPushToken[{i}]" for i in range(250)] + ["not-a-token"]
+
+    run_async(push_notification_service.send_push_bulk, tokens, "Nuevo post", "Perro perdido")
+
+    assert sorted(len(call) for call in mock_expo.calls) == [50, 100, 100]
+
+
+def test_failed_chunk_still_cleans_up_and_propagates(monkeypatch, mock_expo, db):
+    monkeypatch.setattr(settings, "PUSH_MAX_CONCURRENCY", 1)  # chunks en orden
+    with Session(db) as session:
+        session.add(UserPushToken(user_id=2, token="ExponentPushToken[dead]"))
+        session.commit()
+    # Un chunk responde bien (con el token dado de baja); el otro falla en todos los intentos
+    mock_expo.responses = [(200, None)] + [(503, None)] * (settings.PUSH_MAX_RETRIES + 1)
+    tokens = ["ExponentPushToken[dead]"] + [f"ExponentPushToken[{i}]" for i in range(100)]
+
+    with pytest.raises(PushDeliveryError):
+        run_async(push_notification_service.send_push_bulk, tokens, "Nuevo post", "Perro perdido")
+
+    with Session(db) as session:
+        assert session.exec(select(UserPushToken)).all() == []
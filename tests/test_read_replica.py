@@ -0,0 +1,63 @@
+from sqlmodel import Session, create_engine
+
+from core import database
+from models import User
+
+
+class _SharedWriters:
+    """Misma interfaz que RedisRecentWriters, en memoria (simula el Redis que ven todos los workers)."""
+
+    def __init__(self):
+        self.users: set[int] = set()
+
+    def mark(self, user_id):
+        self.users.add(user_id)
+
+    def is_recent(self, user_id):
+        return user_id in self.users
+
+
+class _BrokenWriters:
+    def mark(self, user_id):
+        raise ConnectionError("redis caído")
+
+    def is_recent(self, user_id):
+        raise ConnectionError("redis caído")
+
+
+def _write_as(user_id: int) -> None:
+    with Session(database.engine) as session:
+        session.info["user_id"] = user_id
+        user = session.get(User, user_id)
+        user.help_count += 1  # type: ignore[union-attr]
+        session.commit()
+
+
+def _with_replica(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "replica_engine", create_engine(f"sqlite:///{tmp_path / 'replica.db'}"))
+    database._recent_writers.clear()
+
+
+def test_write_on_another_worker_keeps_reads_on_primary(monkeypatch, tmp_path, db):
+    _with_replica(monkeypatch, tmp_path)
+    shared = _SharedWriters()
+    monkeypatch.setattr(database, "_shared_writers", shared)
+
+    _write_as(2)
+    assert shared.users == {2}
+
+    # Otro worker: no tiene la marca local, solo la compartida
+    database._recent_writers.clear()
+    assert database.read_engine_for(2) is database.engine
+    assert database.read_engine_for(1) is database.replica_engine
+
+
+def test_shared_store_failure_reads_from_primary(monkeypatch, tmp_path, db):
+    _with_replica(monkeypatch, tmp_path)
+    monkeypatch.setattr(database, "_shared_writers", _BrokenWriters())
+
+    _write_as(2)  # la marca local se registra aunque Redis falle
+    assert database.read_engine_for(2) is database.engine
+
+    database._recent_writers.clear()
+    assert database.read_engine_for(1) is database.engine
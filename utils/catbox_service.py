@@ -1,18 +1,35 @@
+from typing import BinaryIO
+
 import httpx
-from fastapi import UploadFile
 
 CATBOX_API = "https://catbox.moe/user/api.php"
 LITTLEBOX_API = "https://litterbox.catbox.moe/resources/internals/api.php"
 
-async def upload_to_catbox(file: UploadFile) -> str:
-    file_content = await file.read()
+# Cliente compartido (pool de conexiones); se cierra desde el lifespan de la app
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0))
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            CATBOX_API,
-            files={"fileToUpload": (file.filename, file_content)},
-            data={"reqtype": "fileupload"}
-        )
+async def upload_to_catbox(fileobj: BinaryIO, filename: str, content_type: str | None = None) -> str:
+    # httpx arma el multipart leyendo el archivo de a bloques: nunca se carga entero en memoria
+    response = await _get_client().post(
+        CATBOX_API,
+        files={"fileToUpload": (filename, fileobj, content_type)},
+        data={"reqtype": "fileupload"}
+    )
 
     if response.status_code == 200:
         return response.text.strip()
@@ -0,0 +1,59 @@
+import hashlib
+
+from fastapi import Request, Response
+
+# GET condicionales (If-None-Match -> 304) para las pantallas que el cliente móvil
+# vuelve a pedir en cada foco. Los ETag son débiles: el mismo contenido puede viajar
+# comprimido o no, así que solo se garantiza equivalencia semántica.
+
+# El cliente puede guardar la respuesta pero tiene que revalidarla siempre
+_CACHE_CONTROL = "private, no-cache"
+
+
+def _weak(digest: str) -> str:
+    return f'W/"{digest}"'
+
+
+def etag_for_body(body: bytes) -> str:
+    """ETag de una respuesta ya serializada (p. ej. la que devuelve core.post_cache)."""
+    return _weak(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def etag_for(*validators) -> str:
+    """ETag a partir de valores baratos (updated_at, max(id), parámetros) sin armar la respuesta."""
+    return _weak(hashlib.blake2b(repr(validators).encode(), digest_size=16).hexdigest())
+
+
+def _opaque_tag(tag: str) -> str:
+    # Comparación débil: W/"x" y "x" son el mismo validador
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_fresh(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    expected = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == expected for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+
+
+def json_response(request: Request, body: bytes) -> Response:
+    """200 con el JSON y su ETag, o 304 sin cuerpo si el cliente ya lo tiene."""
+    etag = etag_for_body(body)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    response = Response(content=body, media_type="application/json")
+    set_etag(response, etag)
+    return response
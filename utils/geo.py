@@ -0,0 +1,86 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+EARTH_RADIUS_M = 6_371_000.0
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlam = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return EARTH_RADIUS_M * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_m_many(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Distancia en metros desde (lat, lon) a cada punto de (lats, lons), vectorizada con NumPy."""
+    phi1 = np.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlam = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class BoundingBox(NamedTuple):
+    min_lat: float
+    max_lat: float
+    # None cuando el radio cruza un polo o el antimeridiano: se filtra solo por latitud
+    min_lon: float | None
+    max_lon: float | None
+
+
+def bounding_box(lat: float, lon: float, radius_m: float) -> BoundingBox:
+    """
+    Rectángulo lat/lon que contiene el círculo de radio radius_m alrededor de (lat, lon).
+    Sirve como prefiltro por rango sobre idx_coordinates antes de calcular la distancia exacta.
+    """
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat, max_lat = lat - dlat, lat + dlat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return BoundingBox(max(min_lat, -90.0), min(max_lat, 90.0), None, None)
+
+    dlon = math.degrees(radius_m / (EARTH_RADIUS_M * math.cos(math.radians(lat))))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180 or max_lon > 180:
+        return BoundingBox(min_lat, max_lat, None, None)
+
+    return BoundingBox(min_lat, max_lat, min_lon, max_lon)
+
+
+class distance_m(FunctionElement):
+    """
+    Distancia en metros entre (lat1, lon1) y (lat2, lon2) como expresión SQL.
+    MySQL: ST_Distance_Sphere. Otros motores: función haversine_m registrada
+    en cada conexión (ver register_sqlite_functions).
+    """
+    type = Float()
+    name = "distance_m"
+    inherit_cache = True
+
+
+@compiles(distance_m)
+def _compile_distance_m(element, compiler, **kw):
+    return "haversine_m(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(distance_m, "mysql")
+def _compile_distance_m_mysql(element, compiler, **kw):
+    lat1, lon1, lat2, lon2 = [compiler.process(arg, **kw) for arg in element.clauses]
+    return f"ST_Distance_Sphere(POINT({lon1}, {lat1}), POINT({lon2}, {lat2}))"
+
+
+def _haversine_m_nullable(lat1, lon1, lat2, lon2):
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return haversine_m(lat1, lon1, lat2, lon2)
+
+
+def register_sqlite_functions(dbapi_connection, connection_record) -> None:
+    dbapi_connection.create_function("haversine_m", 4, _haversine_m_nullable, deterministic=True)
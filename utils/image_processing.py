@@ -0,0 +1,107 @@
+import asyncio
+import io
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from anyio import to_thread
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+
+from core.config import settings
+from utils.media_storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png"}
+
+# Variantes generadas para cada imagen: nombre -> lado mayor en px
+VARIANT_SIZES = {"thumb": 320, "medium": 960, "full": 1920}
+_WEBP_QUALITY = 80
+# Tope de píxeles a decodificar (40 MP): un png de 10 MB puede descomprimirse a varios GB
+MAX_IMAGE_PIXELS = 40_000_000
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def render_variants(path: str) -> dict[str, bytes]:
+    """
+    Redimensiona la imagen a cada tamaño de VARIANT_SIZES y la codifica en WebP. Corre en
+    el pool de procesos y lee el archivo desde disco: al proceso solo viaja la ruta.
+    """
+    with Image.open(path) as original:
+        if original.width * original.height > MAX_IMAGE_PIXELS:
+            raise ValueError(f"Imagen demasiado grande: {original.width}x{original.height}")
+        # JPEG: decodifica directo a una escala reducida (>= la variante más grande)
+        largest = max(VARIANT_SIZES.values())
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        variants = {}
+        for name, max_side in VARIANT_SIZES.items():
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side))  # nunca agranda, conserva proporción
+            output = io.BytesIO()
+            variant.save(output, "WEBP", quality=_WEBP_QUALITY, method=4)
+            variants[name] = output.getvalue()
+    return variants
+
+
+# El redimensionado es CPU puro: se hace en procesos aparte para no frenar el event loop
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESS_WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _spool_to_disk(fileobj, suffix: str) -> str:
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as destination:
+        shutil.copyfileobj(fileobj, destination, _COPY_CHUNK_SIZE)
+    fileobj.seek(0)
+    return destination.name
+
+
+async def build_image_variants(file: UploadFile) -> dict[str, str]:
+    """
+    Genera y sube las variantes thumb/medium/full de una imagen.
+    Devuelve {"thumb_url": ..., "medium_url": ..., "full_url": ...}, o {} si el
+    archivo no es una imagen o no se pudo procesar (se usa solo el original).
+    """
+    filename = file.filename or ""
+    stem, ext = os.path.splitext(filename)
+    if ext.lstrip(".").lower() not in IMAGE_EXTENSIONS:
+        return {}
+
+    # El spool de UploadFile no tiene nombre: se copia por bloques a un temporal con nombre
+    path = await to_thread.run_sync(_spool_to_disk, file.file, ext)
+    try:
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(_get_pool(), render_variants, path)
+    except Exception as exc:
+        logger.warning("No se pudieron generar variantes de %s: %s", filename, exc)
+        return {}
+    finally:
+        os.unlink(path)
+
+    storage = get_storage()
+    urls = await asyncio.gather(*(
+        storage.save(io.BytesIO(content), f"{stem}_{name}.webp", "image/webp")
+        for name, content in rendered.items()
+    ))
+    return {f"{name}_url": url for name, url in zip(rendered, urls)}
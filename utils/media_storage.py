@@ -0,0 +1,109 @@
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+
+from anyio import to_thread
+from fastapi import UploadFile
+
+from core.config import settings
+from utils import catbox_service
+
+# Destino de los archivos subidos (MEDIA_STORAGE_BACKEND): "catbox", "local" o "s3".
+# Todos los backends leen el archivo de a bloques desde el spool de UploadFile.
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class MediaStorage(ABC):
+    @abstractmethod
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str | None = None) -> str:
+        """Guarda el archivo y devuelve su URL pública."""
+
+    async def aclose(self) -> None:
+        pass
+
+
+class CatboxStorage(MediaStorage):
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str | None = None) -> str:
+        return await catbox_service.upload_to_catbox(fileobj, filename, content_type)
+
+    async def aclose(self) -> None:
+        await catbox_service.close_client()
+
+
+class LocalStorage(MediaStorage):
+    def __init__(self, directory: str, public_base_url: str):
+        self.directory = directory
+        self.public_base_url = public_base_url.rstrip("/")
+        os.makedirs(directory, exist_ok=True)
+
+    def _write(self, fileobj: BinaryIO, name: str) -> None:
+        with open(os.path.join(self.directory, name), "wb") as destination:
+            shutil.copyfileobj(fileobj, destination, _CHUNK_SIZE)
+
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str | None = None) -> str:
+        name = _unique_name(filename)
+        await to_thread.run_sync(self._write, fileobj, name)
+        return f"{self.public_base_url}/{name}"
+
+
+class S3Storage(MediaStorage):
+    def __init__(self, bucket: str, public_base_url: str):
+        import boto3
+
+        self.bucket = bucket
+        self.public_base_url = public_base_url.rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+
+    def _upload(self, fileobj: BinaryIO, key: str, content_type: str | None) -> None:
+        # upload_fileobj sube en partes (multipart upload) leyendo el archivo por bloques
+        extra_args = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(fileobj, self.bucket, key, ExtraArgs=extra_args)
+
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str | None = None) -> str:
+        key = _unique_name(filename)
+        await to_thread.run_sync(self._upload, fileobj, key, content_type)
+        return f"{self.public_base_url}/{key}"
+
+
+def _unique_name(filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    return f"{uuid.uuid4().hex}{ext}"
+
+
+_storage: MediaStorage | None = None
+
+
+def get_storage() -> MediaStorage:
+    global _storage
+    if _storage is None:
+        backend = settings.MEDIA_STORAGE_BACKEND
+        if backend == "catbox":
+            _storage = CatboxStorage()
+        elif backend == "local":
+            _storage = LocalStorage(settings.MEDIA_LOCAL_DIR, settings.MEDIA_PUBLIC_BASE_URL)
+        elif backend == "s3":
+            if not settings.S3_BUCKET:
+                raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 requiere S3_BUCKET")
+            _storage = S3Storage(settings.S3_BUCKET, settings.MEDIA_PUBLIC_BASE_URL)
+        else:
+            raise RuntimeError(f"MEDIA_STORAGE_BACKEND desconocido: {backend}")
+    return _storage
+
+
+async def upload_media(file: UploadFile) -> str:
+    file.file.seek(0)
+    return await get_storage().save(file.file, file.filename or "archivo", file.content_type)
+
+
+async def close_storage() -> None:
+    if _storage is not None:
+        await _storage.aclose()
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import and_, or_
+
+from exceptions.exceptions import InvalidCursorException
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    raw = json.dumps(
+        {"s": sort, "k": list(values)},
+        default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v),
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, parsers: Sequence[Callable[[Any], Any]]) -> list[Any]:
+    """
+    Devuelve los valores de la clave de orden guardados en el cursor,
+    convertidos con `parsers` (uno por columna de la clave).
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if data["s"] != sort or len(data["k"]) != len(parsers):
+            raise ValueError("cursor de otro orden")
+        return [parse(value) for parse, value in zip(parsers, data["k"])]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorException("Cursor inválido") from e
+
+
+def keyset_condition(sort_keys: Sequence[tuple[Any, bool]], values: Sequence[Any]):
+    """
+    Condición "después de `values`" para una clave de orden compuesta.
+    sort_keys: pares (expresión, descendente). Para (a DESC, b DESC) genera
+    a < :a OR (a = :a AND b < :b), que MySQL resuelve como rango sobre el índice.
+    """
+    clauses = []
+    for i, (expr, descending) in enumerate(sort_keys):
+        previous = [key == value for (key, _), value in zip(sort_keys[:i], values[:i])]
+        clauses.append(and_(*previous, expr < values[i] if descending else expr > values[i]))
+    return or_(*clauses)
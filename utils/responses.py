@@ -0,0 +1,18 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    Serializa con pydantic-core (Rust) directamente desde los modelos. Devolverla desde
+    un endpoint saltea la revalidación contra response_model y el jsonable_encoder de
+    FastAPI; response_model sigue sirviendo para la documentación.
+
+    El contenido tiene que ser ya el schema de salida (PostRead, UserRead, ...): un modelo
+    de tabla se serializaría con todas sus columnas, contraseña incluida.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
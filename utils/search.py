@@ -0,0 +1,55 @@
+import re
+
+from sqlalchemy.dialects.mysql import match
+
+from core.config import settings
+from models import Post
+
+# Búsqueda por palabra clave sobre title + message.
+# En MySQL usa el índice FULLTEXT ft_title_message (MATCH ... AGAINST en modo booleano,
+# con la collation de la columna, que ya ignora acentos y mayúsculas).
+# En otros motores (SQLite en desarrollo/tests) cae a ILIKE '%kw%'.
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# innodb_ft_min_token_size por defecto: los tokens más cortos no están en el índice
+_MIN_TOKEN_LEN = 3
+
+# Stopwords por defecto de InnoDB (>= 3 letras). Si una palabra obligatoria (+palabra)
+# es stopword la búsqueda no devuelve nada, así que se descartan antes de armar la consulta.
+_INNODB_STOPWORDS = {
+    "about", "are", "com", "for", "from", "how", "that", "the", "this",
+    "was", "what", "when", "where", "who", "will", "with", "und", "www",
+}
+
+
+def _boolean_query(keyword: str) -> str | None:
+    tokens = [
+        token for token in _TOKEN_RE.findall(keyword.lower())
+        if len(token) >= _MIN_TOKEN_LEN and token not in _INNODB_STOPWORDS
+    ]
+    # Todas las palabras son obligatorias y se buscan por prefijo: "perr" encuentra "perro"
+    return " ".join(f"+{token}*" for token in tokens) if tokens else None
+
+
+def _fulltext_match(dialect_name: str, keyword: str):
+    if not settings.FULLTEXT_SEARCH or dialect_name != "mysql":
+        return None
+    against = _boolean_query(keyword)
+    if against is None:
+        return None
+    return match(Post.title, Post.message, against=against).in_boolean_mode()  # type: ignore
+
+
+def keyword_condition(dialect_name: str, keyword: str):
+    fulltext = _fulltext_match(dialect_name, keyword)
+    if fulltext is not None:
+        return fulltext
+
+    kw = f"%{keyword}%"
+    return (Post.title.ilike(kw)) | (Post.message.ilike(kw))  # type: ignore
+
+
+def keyword_relevance(dialect_name: str, keyword: str):
+    """Puntaje de relevancia para ordenar resultados, o None si el motor no lo soporta."""
+    return _fulltext_match(dialect_name, keyword)